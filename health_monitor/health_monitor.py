@@ -4,17 +4,21 @@ Health Monitor - Sistema de monitoramento de saúde para Fedora Workstation
 Coleta métricas do sistema e gera relatórios em JSON
 """
 
+import argparse
 import json
 import os
+import queue
+import signal
 import sys
+import threading
 from datetime import datetime
 from pathlib import Path
-from typing import Dict, Any
+from typing import Dict, Any, Optional
 
 # Adicionar o diretório modules ao path
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
-from modules import disk, memory, cpu, system, network, logs, alerts
+from modules import disk, disk_io, memory, cpu, system, network, logs, alerts, collector, scheduler, history, output, exporter, alert_engine, state
 
 
 def load_config(config_path: str = "config.json") -> Dict[str, Any]:
@@ -42,74 +46,40 @@ def load_config(config_path: str = "config.json") -> Dict[str, Any]:
         sys.exit(1)
 
 
-def collect_all_metrics(config: Dict[str, Any]) -> Dict[str, Any]:
-    """Coleta todas as métricas do sistema"""
+# Coletores disponíveis: (nome, rótulo, função)
+COLLECTORS = [
+    ("disk", "💾 Disco", disk.collect_disk_metrics),
+    ("disk_io", "📀 I/O de Disco", disk_io.collect_disk_io_metrics),
+    ("memory", "🧠 Memória", memory.collect_memory_metrics),
+    ("cpu", "⚡ CPU", cpu.collect_cpu_metrics),
+    ("system", "🖥️  Sistema", system.collect_system_metrics),
+    ("network", "🌐 Rede", network.collect_network_metrics),
+    ("logs", "📋 Logs", logs.collect_log_metrics),
+]
+
+
+def collect_all_metrics(config: Dict[str, Any], stats: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """Coleta todas as métricas do sistema, executando os coletores em paralelo"""
     print("📊 Coletando métricas do sistema...")
     
-    metrics = {}
-    
-    # Coletar métricas de disco
-    print("  💾 Disco...")
-    try:
-        metrics["disk"] = disk.collect_disk_metrics(config)
-    except Exception as e:
-        print(f"    ⚠️  Erro: {e}")
-        metrics["disk"] = {"error": str(e)}
-    
-    # Coletar métricas de memória
-    print("  🧠 Memória...")
-    try:
-        metrics["memory"] = memory.collect_memory_metrics(config)
-    except Exception as e:
-        print(f"    ⚠️  Erro: {e}")
-        metrics["memory"] = {"error": str(e)}
-    
-    # Coletar métricas de CPU
-    print("  ⚡ CPU...")
-    try:
-        metrics["cpu"] = cpu.collect_cpu_metrics(config)
-    except Exception as e:
-        print(f"    ⚠️  Erro: {e}")
-        metrics["cpu"] = {"error": str(e)}
-    
-    # Coletar métricas do sistema
-    print("  🖥️  Sistema...")
-    try:
-        metrics["system"] = system.collect_system_metrics(config)
-    except Exception as e:
-        print(f"    ⚠️  Erro: {e}")
-        metrics["system"] = {"error": str(e)}
-    
-    # Coletar métricas de rede
-    print("  🌐 Rede...")
-    try:
-        metrics["network"] = network.collect_network_metrics(config)
-    except Exception as e:
-        print(f"    ⚠️  Erro: {e}")
-        metrics["network"] = {"error": str(e)}
-    
-    # Coletar logs
-    print("  📋 Logs...")
-    try:
-        metrics["logs"] = logs.collect_log_metrics(config)
-    except Exception as e:
-        print(f"    ⚠️  Erro: {e}")
-        metrics["logs"] = {"error": str(e)}
-    
-    return metrics
+    return collector.run_collectors(COLLECTORS, config, stats)
 
 
-def generate_report(config: Dict[str, Any]) -> Dict[str, Any]:
-    """Gera relatório completo do sistema"""
-    # Timestamp do relatório
-    timestamp = datetime.now()
-    
-    # Coletar métricas
-    metrics = collect_all_metrics(config)
+def build_report(metrics: Dict[str, Any], config: Dict[str, Any],
+                 collection_stats: Dict[str, Any], timestamp: datetime,
+                 quiet: bool = False,
+                 engine: Optional[alert_engine.AlertEngine] = None) -> Dict[str, Any]:
+    """Monta o relatório a partir de métricas já coletadas.
     
+    Com `engine`, os alertas passam pelo motor com estado e os eventos entram em 'alert_events'.
+    """
     # Gerar alertas
-    print("🚨 Gerando alertas...")
+    if not quiet:
+        print("🚨 Gerando alertas...")
     system_alerts = alerts.generate_alerts(metrics, config)
+    events = None
+    if engine is not None:
+        system_alerts, events = engine.evaluate(metrics, system_alerts, timestamp.timestamp())
     
     # Montar relatório completo
     report = {
@@ -118,6 +88,7 @@ def generate_report(config: Dict[str, Any]) -> Dict[str, Any]:
         "hostname": metrics.get("system", {}).get("info", {}).get("hostname", "unknown"),
         "metrics": metrics,
         "alerts": system_alerts,
+        "collection": collection_stats,
         "summary": {
             "total_alerts": len(system_alerts),
             "critical_alerts": sum(1 for a in system_alerts if a.get("severity") == "critical"),
@@ -127,12 +98,36 @@ def generate_report(config: Dict[str, Any]) -> Dict[str, Any]:
             )
         }
     }
+    if events is not None:
+        report["alert_events"] = events
+    return report
+
+
+def create_alert_engine(config: Dict[str, Any]) -> Optional[alert_engine.AlertEngine]:
+    """Cria o motor de alertas com o estado salvo, se habilitado em 'alerting'"""
+    if not config.get("alerting", {}).get("enabled", False):
+        return None
+    return alert_engine.AlertEngine(alert_engine.build_rules(config), state.load_state(config, "alerts"))
+
+
+def generate_report(config: Dict[str, Any]) -> Dict[str, Any]:
+    """Gera relatório completo do sistema"""
+    # Timestamp do relatório
+    timestamp = datetime.now()
     
+    # Coletar métricas
+    collection_stats = {}
+    metrics = collect_all_metrics(config, collection_stats)
+    
+    engine = create_alert_engine(config)
+    report = build_report(metrics, config, collection_stats, timestamp, engine=engine)
+    if engine is not None:
+        state.save_state(config, "alerts", engine.state)
     return report
 
 
 def save_report(report: Dict[str, Any], config: Dict[str, Any]) -> str:
-    """Salva relatório em arquivo JSON"""
+    """Salva relatório no formato configurado (json, ndjson, json.gz, json.zst ou msgpack)"""
     # Usar caminho relativo ao projeto se não especificado
     script_dir = Path(__file__).parent
     project_root = script_dir.parent
@@ -143,18 +138,28 @@ def save_report(report: Dict[str, Any], config: Dict[str, Any]) -> str:
     # Criar diretório se não existir
     output_dir.mkdir(parents=True, exist_ok=True)
     
-    # Nome do arquivo com timestamp
-    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-    filename = f"health_{timestamp}.json"
-    filepath = output_dir / filename
-    
-    # Salvar JSON
-    with open(filepath, 'w', encoding='utf-8') as f:
-        json.dump(report, f, indent=2, ensure_ascii=False)
+    filepath = output.write_report(
+        report,
+        output_dir,
+        config.get("output_format", "json"),
+        index=config.get("output_index", True)
+    )
     
     return str(filepath)
 
 
+def store_history(report: Dict[str, Any], config: Dict[str, Any]) -> Optional[int]:
+    """Grava as métricas do relatório no histórico, se habilitado"""
+    if not config.get("history", {}).get("enabled", False):
+        return None
+    
+    try:
+        return history.store_report(report, config)
+    except Exception as e:
+        print(f"⚠️  Erro ao gravar histórico: {e}")
+        return None
+
+
 def print_summary(report: Dict[str, Any]):
     """Imprime resumo do relatório"""
     print("\n" + "="*60)
@@ -209,14 +214,171 @@ def print_summary(report: Dict[str, Any]):
     print("\n" + "="*60)
 
 
+def run_daemon(config: Dict[str, Any], write_reports: bool = True,
+               metrics_exporter: Optional[exporter.MetricsExporter] = None):
+    """Executa o monitor continuamente, coletando cada módulo em seu próprio intervalo.
+    
+    Com `metrics_exporter`, o snapshot servido via HTTP é atualizado após cada coleta.
+    """
+    daemon_config = config.get("daemon", {})
+    default_interval = daemon_config.get("interval_seconds", 60)
+    collector_intervals = daemon_config.get("collector_intervals", {})
+    
+    intervals = {
+        name: collector_intervals.get(name, default_interval)
+        for name, _, _ in COLLECTORS
+    }
+    intervals["report"] = daemon_config.get("report_interval_seconds", default_interval)
+    tasks = scheduler.IntervalScheduler(intervals)
+    
+    # Resultados entregues pelos coletores em segundo plano; None acorda o laço no SIGTERM
+    results = queue.Queue()
+    
+    # Encerrar de forma limpa com SIGTERM (systemd)
+    stop = threading.Event()
+    
+    def _on_sigterm(signum, frame):
+        stop.set()
+        results.put(None)
+    
+    signal.signal(signal.SIGTERM, _on_sigterm)
+    
+    if write_reports:
+        print(f"🔁 Modo daemon: relatório a cada {intervals['report']}s")
+    else:
+        print("🔁 Coleta contínua para o exportador (sem gravar relatórios)")
+    for name, _, _ in COLLECTORS:
+        print(f"   • {name}: a cada {intervals[name]}s")
+    
+    # Os módulos e os contadores do psutil permanecem carregados entre os ciclos
+    metrics = {}
+    collection_stats = {"mode": "daemon", "collectors": {}}
+    
+    # O motor de alertas fica em memória; o estado é salvo a cada relatório
+    engine = create_alert_engine(config)
+    pending_events = []
+    
+    # Coletores disparados que ainda não entregaram resultado
+    in_flight = set()
+    finished = []
+    report_pending = False
+    
+    while not stop.is_set():
+        due = tasks.due()
+        report = None
+        
+        # Coletores lentos (SMART, logs) rodam em segundo plano e não atrasam os rápidos;
+        # um coletor ainda em andamento não é disparado de novo
+        due_collectors = [c for c in COLLECTORS if c[0] in due and c[0] not in in_flight]
+        if due_collectors:
+            in_flight.update(name for name, _, _ in due_collectors)
+            collector.start_collectors(due_collectors, config, results)
+        
+        # Incorporar tudo o que terminou desde a última iteração
+        while True:
+            try:
+                finished.append(results.get_nowait())
+            except queue.Empty:
+                break
+        
+        tick_stats = {"collectors": {}}
+        for item in finished:
+            if item is None:
+                continue
+            name, value, stats = item
+            in_flight.discard(name)
+            metrics[name] = value
+            tick_stats["collectors"][name] = stats
+        finished = []
+        
+        if tick_stats["collectors"]:
+            collection_stats["collectors"].update(tick_stats["collectors"])
+            
+            # Cada coleta é avaliada uma única vez; o relatório é reaproveitado no mesmo ciclo
+            if engine is not None or metrics_exporter:
+                report = build_report(metrics, config, collection_stats, datetime.now(), quiet=True, engine=engine)
+            if metrics_exporter:
+                metrics_exporter.record_collection(tick_stats)
+                metrics_exporter.update(report)
+        
+        # O relatório usa o último resultado de cada coletor; só espera os que nunca entregaram
+        if "report" in due and write_reports:
+            report_pending = True
+        write_now = report_pending and not (in_flight - metrics.keys())
+        
+        if write_now and report is None:
+            report = build_report(metrics, config, collection_stats, datetime.now(), quiet=True, engine=engine)
+        
+        if engine is not None and report is not None:
+            for event in report["alert_events"]:
+                icon = "🔔" if event["event"] == "fired" else "✅"
+                print(f"{icon} [{event['event']}] {event['severity']}: {event['message']}")
+            pending_events.extend(report["alert_events"])
+        
+        if write_now:
+            report_pending = False
+            if engine is not None:
+                # Eventos acumulados desde o último relatório gravado
+                report["alert_events"] = pending_events
+                pending_events = []
+                state.save_state(config, "alerts", engine.state)
+            filepath = save_report(report, config)
+            store_history(report, config)
+            summary = report["summary"]
+            print(f"[{report['timestamp']}] {summary['health_status']} - "
+                  f"{summary['total_alerts']} alerta(s) - {filepath}")
+        
+        # Acordar na próxima tarefa agendada ou quando um coletor terminar
+        try:
+            finished.append(results.get(timeout=tasks.seconds_until_next()))
+        except queue.Empty:
+            pass
+    
+    if engine is not None:
+        state.save_state(config, "alerts", engine.state)
+    print("\n👋 Daemon encerrado")
+
+
 def main():
     """Função principal"""
+    parser = argparse.ArgumentParser(description="Health Monitor - coleta de métricas do sistema")
+    parser.add_argument("--daemon", action="store_true",
+                        help="executa continuamente, coletando em intervalos configuráveis")
+    parser.add_argument("--serve", action="store_true",
+                        help="expõe as métricas em formato Prometheus/OpenMetrics via HTTP (/metrics)")
+    parser.add_argument("--port", type=int, help="porta do exportador (padrão: exporter.port do config.json)")
+    args = parser.parse_args()
+    
     print("🏥 Health Monitor - Iniciando monitoramento...")
     print()
     
     # Carregar configuração
     config = load_config()
     
+    if args.serve:
+        exporter_config = config.get("exporter", {})
+        host = exporter_config.get("host", "127.0.0.1")
+        port = args.port or exporter_config.get("port", 9877)
+        metrics_exporter = exporter.MetricsExporter()
+        server = exporter.start_server(metrics_exporter, host, port)
+        print(f"📡 Exportador de métricas em http://{host}:{port}/metrics")
+        try:
+            run_daemon(config, write_reports=args.daemon, metrics_exporter=metrics_exporter)
+        except KeyboardInterrupt:
+            print("\n\n⚠️  Monitoramento interrompido pelo usuário")
+            sys.exit(130)
+        finally:
+            server.shutdown()
+        sys.exit(0)
+    
+    if args.daemon:
+        try:
+            run_daemon(config)
+        except KeyboardInterrupt:
+            print("\n\n⚠️  Monitoramento interrompido pelo usuário")
+            sys.exit(130)
+        sys.exit(0)
+    
     try:
         # Gerar relatório
         report = generate_report(config)
@@ -226,6 +388,10 @@ def main():
         filepath = save_report(report, config)
         print(f"✅ Relatório salvo em: {filepath}")
         
+        stored = store_history(report, config)
+        if stored:
+            print(f"📈 {stored} métricas gravadas no histórico")
+        
         # Imprimir resumo
         print_summary(report)
         
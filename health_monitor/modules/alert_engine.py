@@ -0,0 +1,544 @@
+"""
+Motor de alertas com estado: histerese, duração mínima (for), deduplicação e eventos de resolução
+"""
+import hashlib
+import operator
+import time
+from typing import Dict, List, Any, Optional, Tuple
+
+from modules import rule_expr
+
+
+SEVERITY_RANK = {None: 0, "warning": 1, "critical": 2}
+
+_OPERATORS = {">": operator.gt, ">=": operator.ge, "<": operator.lt, "<=": operator.le}
+
+# Regras derivadas de config["thresholds"], equivalentes às verificações de alerts.py
+# (chave do threshold crítico, padrão, chave do threshold de aviso, padrão)
+THRESHOLD_RULES = [
+    {
+        "name": "disk_usage",
+        "category": "disk",
+        "source": "disk.partitions[*]",
+        "field": "percent_used",
+        "key": "mountpoint",
+        "thresholds": ("disk_usage_critical", 90, "disk_usage_warning", 80),
+        "hysteresis": 2.0,
+        "messages": {
+            "critical": "Uso crítico de disco em {mountpoint}: {value}%",
+            "warning": "Uso alto de disco em {mountpoint}: {value}%"
+        }
+    },
+    {
+        "name": "disk_io_util",
+        "category": "disk_io",
+        "source": "disk_io.devices[*]",
+        "field": "util_percent",
+        "key": "device",
+        "thresholds": ("disk_io_util_critical", 95, "disk_io_util_warning", 80),
+        "hysteresis": 5.0,
+        "messages": {
+            "critical": "Disco {device} saturado: {value}% de utilização",
+            "warning": "Utilização alta de I/O em {device}: {value}%"
+        }
+    },
+    {
+        "name": "disk_io_await",
+        "category": "disk_io",
+        "source": "disk_io.devices[*]",
+        "field": "await_ms",
+        "key": "device",
+        "thresholds": ("disk_io_await_critical", 200, "disk_io_await_warning", 50),
+        "hysteresis": 10.0,
+        "messages": {
+            "critical": "Latência crítica de I/O em {device}: {value} ms",
+            "warning": "Latência alta de I/O em {device}: {value} ms"
+        }
+    },
+    {
+        "name": "ram_usage",
+        "category": "memory",
+        "source": "memory.ram",
+        "field": "percent_used",
+        "thresholds": ("memory_usage_critical", 95, "memory_usage_warning", 80),
+        "hysteresis": 2.0,
+        "messages": {
+            "critical": "Uso crítico de RAM: {value}%",
+            "warning": "Uso alto de RAM: {value}%"
+        }
+    },
+    {
+        "name": "swap_usage",
+        "category": "memory",
+        "source": "memory.swap",
+        "field": "percent_used",
+        "thresholds": ("swap_usage_critical", 80, "swap_usage_warning", 50),
+        "hysteresis": 2.0,
+        "messages": {
+            "critical": "Uso crítico de Swap: {value}%",
+            "warning": "Uso alto de Swap: {value}%"
+        }
+    },
+    {
+        "name": "swap_out_rate",
+        "category": "memory",
+        "source": "memory.swap.rates",
+        "field": "swap_out_mb_per_sec",
+        "thresholds": ("swap_out_rate_critical", 50.0, "swap_out_rate_warning", 5.0),
+        "hysteresis": 1.0,
+        "messages": {
+            "critical": "Swap-out crítico: {value} MB/s",
+            "warning": "Swap-out elevado: {value} MB/s"
+        }
+    },
+    {
+        "name": "cpu_load",
+        "category": "cpu",
+        "source": "cpu.load_average",
+        "field": "normalized_5min",
+        "thresholds": ("cpu_load_critical", 4.0, "cpu_load_warning", 2.0),
+        "hysteresis": 0.2,
+        "messages": {
+            "critical": "Carga crítica da CPU (5min): {value}",
+            "warning": "Carga alta da CPU (5min): {value}"
+        }
+    },
+    {
+        "name": "cpu_temp",
+        "category": "cpu",
+        "source": "cpu.temperature.*[*]",
+        "field": "current",
+        "key": "label",
+        "key_as": "sensor",
+        "thresholds": ("cpu_temp_critical", 85, "cpu_temp_warning", 70),
+        "hysteresis": 3.0,
+        "messages": {
+            "critical": "Temperatura crítica da CPU: {value}°C",
+            "warning": "Temperatura alta da CPU: {value}°C"
+        }
+    },
+    {
+        "name": "network_error_rate",
+        "category": "network",
+        "source": "network.interfaces[*].rates",
+        "field": "errors_per_sec",
+        "key_as": "interface",
+        "thresholds": ("network_error_rate_critical", 10.0, "network_error_rate_warning", 1.0),
+        "hysteresis": 0.5,
+        "messages": {
+            "critical": "Taxa crítica de erros na interface {instance}: {value} erros/s",
+            "warning": "Taxa alta de erros na interface {instance}: {value} erros/s"
+        }
+    }
+]
+
+
+def fingerprint(*parts: Any) -> str:
+    """Identificador estável de um alerta"""
+    return hashlib.sha1("|".join(str(p) for p in parts).encode("utf-8")).hexdigest()[:16]
+
+
+class Rule:
+    """Regra de limiar com níveis de severidade, histerese e duração mínima"""
+
+    def __init__(self, spec: Dict[str, Any]):
+        self._init_common(spec, spec["source"])
+        self.field = spec["field"]
+        self.compare = _OPERATORS[spec.get("op", ">=")]
+
+        # Níveis do mais severo para o menos severo: (severidade, disparo, liberação)
+        levels = [(lvl["severity"], lvl["fire"], lvl.get("clear", lvl["fire"])) for lvl in spec["levels"]]
+        self.levels = sorted(levels, key=lambda lvl: SEVERITY_RANK[lvl[0]], reverse=True)
+
+    def _init_common(self, spec: Dict[str, Any], source: str):
+        self.name = spec["name"]
+        self.source = source
+        self.category = spec.get("category", source.split(".")[0])
+        # Categorias lidas pela regra; sem coleta nova em nenhuma delas, a regra não muda
+        self.roots = [source.split(".")[0]]
+        self.key = spec.get("key")
+        self.key_as = spec.get("key_as", self.key)
+        self.for_samples = int(spec.get("for_samples", 1))
+        self.for_seconds = float(spec.get("for_seconds", 0))
+        self.messages = spec.get("messages") or {}
+        self.default_message = spec.get("message", "{rule}: {value}")
+
+    def prepare(self, metrics: Dict[str, Any]) -> None:
+        """Preparação por avaliação (regras de limiar não precisam de nenhuma)"""
+
+    def sample(self, obj: Any) -> Optional[Tuple[Any, Any]]:
+        """(valor exibido, entrada de target_level) para um item, ou None se não se aplica"""
+        if not isinstance(obj, dict):
+            return None
+        value = obj.get(self.field)
+        if isinstance(value, bool) or not isinstance(value, (int, float)):
+            return None
+        return value, value
+
+    def target_level(self, value: float, current: Optional[str]) -> Optional[str]:
+        """Nível que o valor atinge; níveis já ativos usam o limite de liberação (histerese)"""
+        for severity, fire, clear in self.levels:
+            limit = clear if SEVERITY_RANK[current] >= SEVERITY_RANK[severity] else fire
+            if self.compare(value, limit):
+                return severity
+        return None
+
+    def threshold(self, severity: str) -> Optional[float]:
+        return next(fire for sev, fire, _ in self.levels if sev == severity)
+
+    def message(self, severity: str, value: Any, instance_value: Any) -> str:
+        template = self.messages.get(severity, self.default_message)
+        fields = {"value": value, "rule": self.name, "severity": severity, "instance": instance_value}
+        if self.key:
+            fields[self.key] = instance_value
+        return template.format(**fields)
+
+
+class ExpressionRule(Rule):
+    """Regra declarativa: cada nível é uma expressão (rule_expr) avaliada por item da origem.
+
+    Um nível ativo permanece ativo até sua expressão `clear` valer (histerese);
+    sem `clear`, é liberado assim que a expressão de disparo deixa de valer.
+    """
+
+    def __init__(self, spec: Dict[str, Any]):
+        levels = spec.get("levels") or [
+            {"severity": spec.get("severity", "warning"), "expr": spec["expr"], "clear": spec.get("clear")}
+        ]
+        first = rule_expr.compile_expression(levels[0]["expr"])
+        if not first.source and not first.roots:
+            raise ValueError(f"Expressão de regra sem métrica: {levels[0]['expr']!r}")
+        # Sem caminho iterado, o item avaliado é a categoria da primeira métrica citada
+        source = first.source or first.roots[0]
+        self._init_common(spec, source)
+
+        compiled = []
+        for lvl in levels:
+            fire = rule_expr.compile_expression(lvl["expr"], source)
+            clear = rule_expr.compile_expression(lvl["clear"], source) if lvl.get("clear") else None
+            compiled.append((lvl["severity"], fire, clear))
+        self.levels = sorted(compiled, key=lambda lvl: SEVERITY_RANK[lvl[0]], reverse=True)
+
+        # Valor exibido: expressão 'value' ou o primeiro campo/métrica citado na regra
+        if spec.get("value"):
+            value_text = spec["value"]
+        elif first.fields and first.source:
+            value_text = ".".join(first.fields[0]) or first.source
+        else:
+            value_text = ".".join(first.scalar_paths[0]) if first.scalar_paths else None
+        self.value = rule_expr.compile_expression(value_text, source) if value_text else None
+
+        expressions = [expr for _, fire, clear in self.levels for expr in (fire, clear) if expr]
+        if self.value:
+            expressions.append(self.value)
+        self._expressions = expressions
+        self.roots = sorted({root for expr in expressions for root in expr.roots} | {source.split(".")[0]})
+        self._scalars: Dict[int, Tuple[Any, ...]] = {}
+
+    def prepare(self, metrics: Dict[str, Any]) -> None:
+        """Resolve os valores escalares das expressões uma vez por avaliação"""
+        self._scalars = {id(expr): expr.scalars(metrics) for expr in self._expressions}
+
+    def sample(self, obj: Any) -> Optional[Tuple[Any, Any]]:
+        scalars = self._scalars
+        match = [
+            [fire.matches(obj, scalars[id(fire)]), clear.matches(obj, scalars[id(clear)]) if clear else None]
+            for _, fire, clear in self.levels
+        ]
+        value = self.value.compute(obj, scalars[id(self.value)]) if self.value else None
+        return value, match
+
+    def target_level(self, match: List[List[Optional[bool]]], current: Optional[str]) -> Optional[str]:
+        for (severity, _, clear), (fired, cleared) in zip(self.levels, match):
+            if clear is not None and SEVERITY_RANK[current] >= SEVERITY_RANK[severity]:
+                active = not cleared
+            else:
+                active = fired
+            if active:
+                return severity
+        return None
+
+    def threshold(self, severity: str) -> Optional[float]:
+        return None
+
+
+def is_expression_rule(spec: Dict[str, Any]) -> bool:
+    """Regra declarativa (com 'expr') em vez de origem/campo/limiares"""
+    return "expr" in spec or any("expr" in lvl for lvl in spec.get("levels", []))
+
+
+def build_rules(config: Dict[str, Any]) -> List[Rule]:
+    """Monta as regras a partir dos thresholds e do bloco 'alerting' da configuração"""
+    return build_threshold_rules(config) + build_custom_rules(config)
+
+
+def build_threshold_rules(config: Dict[str, Any], names: Optional[Tuple[str, ...]] = None) -> List[Rule]:
+    """Regras de THRESHOLD_RULES (todas ou só as de `names`) com os limites da configuração"""
+    thresholds = config.get("thresholds", {})
+    alerting = config.get("alerting", {})
+    hysteresis = alerting.get("hysteresis", {})
+    for_samples = alerting.get("for_samples", {})
+    for_seconds = alerting.get("for_seconds", {})
+
+    rules = []
+    for base in THRESHOLD_RULES:
+        if names is not None and base["name"] not in names:
+            continue
+        critical_key, critical_default, warning_key, warning_default = base["thresholds"]
+        margin = hysteresis.get(base["name"], base["hysteresis"])
+        critical = thresholds.get(critical_key, critical_default)
+        warning = thresholds.get(warning_key, warning_default)
+
+        spec = dict(base)
+        spec["levels"] = [
+            {"severity": "critical", "fire": critical, "clear": critical - margin},
+            {"severity": "warning", "fire": warning, "clear": warning - margin}
+        ]
+        spec["for_samples"] = for_samples.get(base["name"], 1)
+        spec["for_seconds"] = for_seconds.get(base["name"], 0)
+        rules.append(Rule(spec))
+
+    return rules
+
+
+def build_custom_rules(config: Dict[str, Any]) -> List[Rule]:
+    """Regras declaradas em alerting.rules (de limiar ou por expressão)"""
+    return [
+        ExpressionRule(spec) if is_expression_rule(spec) else Rule(spec)
+        for spec in config.get("alerting", {}).get("rules", [])
+    ]
+
+
+class AlertEngine:
+    """Avalia as regras mantendo o estado de cada instância entre as execuções.
+
+    O estado (`self.state`) é serializável em JSON e pode ser persistido com o módulo state.
+    """
+
+    def __init__(self, rules: List[Rule], state: Optional[Dict[str, Any]] = None):
+        self.rules = rules
+        self.state = state if state else {}
+        self.state.setdefault("instances", {})
+        self.state.setdefault("passthrough", {})
+
+        # Índice: origem -> regras, para percorrer cada origem uma única vez
+        self.index: Dict[str, List[Rule]] = {}
+        for rule in rules:
+            self.index.setdefault(rule.source, []).append(rule)
+        self._tokens = {source: rule_expr.parse_source(source) for source in self.index}
+        self._roots = {source: sorted({root for rule in rules for root in rule.roots})
+                       for source, rules in self.index.items()}
+        self._rules_by_name = {rule.name: rule for rule in rules}
+
+        # Instâncias de regras removidas da configuração são descartadas
+        instances = self.state["instances"]
+        for fp in [fp for fp, entry in instances.items() if entry.get("rule") not in self._rules_by_name]:
+            del instances[fp]
+
+        # Fingerprints por regra, para não varrer todas as instâncias a cada avaliação
+        self._fps_by_rule: Dict[str, set] = {rule.name: set() for rule in rules}
+        for fp, entry in instances.items():
+            self._fps_by_rule[entry["rule"]].add(fp)
+
+        # Último objeto avaliado por categoria (apenas em memória); a referência
+        # mantém o objeto vivo, então a comparação por identidade é segura
+        self._seen: Dict[str, Any] = {}
+
+    def _transition(self, rule: Rule, fp: str, entry: Dict[str, Any], match: Any,
+                    now: float, new_sample: bool, events: List[Dict[str, Any]]) -> None:
+        """Aplica histerese e duração mínima, registrando eventos nas mudanças de nível"""
+        current = entry.get("level")
+        target = rule.target_level(match, current)
+        value = entry.get("value")
+
+        if target == current:
+            entry["pending"] = None
+            return
+
+        if SEVERITY_RANK[target] > SEVERITY_RANK[current]:
+            # Agravamento só após N amostras e/ou T segundos seguidos na condição
+            if entry.get("pending") != target:
+                entry["pending"] = target
+                entry["pending_since"] = now
+                entry["pending_count"] = 0
+            if new_sample:
+                entry["pending_count"] += 1
+            if entry["pending_count"] < rule.for_samples or now - entry["pending_since"] < rule.for_seconds:
+                return
+
+        # Atenuação e resolução são imediatas (a histerese já evita oscilação)
+        entry["pending"] = None
+        entry["level"] = target
+        if current is None:
+            entry["since"] = now
+
+        event = {
+            "event": "resolved" if target is None else "fired",
+            "fingerprint": fp,
+            "rule": rule.name,
+            "category": rule.category,
+            "severity": target or current,
+            "previous_severity": current,
+            "value": value,
+            "timestamp": now
+        }
+        event["message"] = rule.message(event["severity"], value, entry.get("instance"))
+        events.append(event)
+
+    def _evaluate_rules(self, metrics: Dict[str, Any], now: float, events: List[Dict[str, Any]]) -> None:
+        instances = self.state["instances"]
+        current = {}
+
+        for source, rules in self.index.items():
+            tokens = self._tokens[source]
+            category = metrics.get(tokens[0])
+            if not isinstance(category, dict) or "error" in category:
+                continue
+
+            roots = self._roots[source]
+            for root in roots:
+                current[root] = metrics.get(root)
+            if all(self._seen.get(root) is current[root] for root in roots):
+                # Sem coleta nova: só avançar condições por tempo pendentes
+                for rule in rules:
+                    if not rule.for_seconds:
+                        continue
+                    for fp in self._fps_by_rule[rule.name]:
+                        entry = instances[fp]
+                        if entry.get("pending"):
+                            self._transition(rule, fp, entry, entry.get("match", entry["value"]),
+                                             now, False, events)
+                continue
+
+            for rule in rules:
+                rule.prepare(metrics)
+
+            seen = set()
+            for instance, obj in rule_expr.resolve_source(metrics, tokens):
+                for rule in rules:
+                    sample = rule.sample(obj)
+                    if sample is None:
+                        continue
+                    value, match = sample
+                    fp = fingerprint(rule.name, instance)
+                    seen.add(fp)
+                    entry = instances.get(fp)
+                    if entry is None:
+                        entry = instances[fp] = {
+                            "rule": rule.name,
+                            "instance": obj.get(rule.key, instance) if rule.key and isinstance(obj, dict) else instance,
+                            "level": None
+                        }
+                        self._fps_by_rule[rule.name].add(fp)
+                    elif (entry.get("value") == value and entry.get("match", value) == match
+                          and not entry.get("pending")):
+                        # Entrada inalterada e estável: o resultado seria o mesmo
+                        continue
+                    entry["value"] = value
+                    if match is not value:
+                        entry["match"] = match
+                    self._transition(rule, fp, entry, match, now, True, events)
+
+            # Instâncias que desapareceram (ex.: partição desmontada) são resolvidas
+            for rule in rules:
+                gone = self._fps_by_rule[rule.name] - seen
+                if not gone:
+                    continue
+                self._fps_by_rule[rule.name] -= gone
+                for fp in gone:
+                    entry = instances.pop(fp)
+                    if not entry.get("level"):
+                        continue
+                    events.append({
+                        "event": "resolved",
+                        "fingerprint": fp,
+                        "rule": rule.name,
+                        "category": rule.category,
+                        "severity": entry["level"],
+                        "previous_severity": entry["level"],
+                        "value": entry.get("value"),
+                        "timestamp": now,
+                        "message": rule.message(entry["level"], entry.get("value"), entry.get("instance"))
+                    })
+
+        self._seen.update(current)
+
+    def _evaluate_passthrough(self, stateless: List[Dict[str, Any]], now: float,
+                              events: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Deduplica alertas sem limiar (SMART, serviços, conectividade) pelo fingerprint"""
+        previous = self.state["passthrough"]
+        current = {}
+        active = []
+
+        for alert in stateless:
+            # A mensagem é só conteúdo: pode trazer contagens que mudam sem mudar o alerta
+            identity = [alert.get(k) for k in ("mountpoint", "device", "host", "service", "interface")]
+            fp = fingerprint(alert.get("category"), *identity)
+            since = previous.get(fp, {}).get("since")
+            if since is None:
+                since = now
+                events.append({
+                    "event": "fired",
+                    "fingerprint": fp,
+                    "category": alert.get("category"),
+                    "severity": alert.get("severity"),
+                    "previous_severity": None,
+                    "timestamp": now,
+                    "message": alert.get("message")
+                })
+            current[fp] = {"since": since, "severity": alert.get("severity"),
+                           "category": alert.get("category"), "message": alert.get("message")}
+            active.append(dict(alert, fingerprint=fp, since=since))
+
+        for fp, entry in previous.items():
+            if fp not in current:
+                events.append({
+                    "event": "resolved",
+                    "fingerprint": fp,
+                    "category": entry.get("category"),
+                    "severity": entry.get("severity"),
+                    "previous_severity": entry.get("severity"),
+                    "timestamp": now,
+                    "message": entry.get("message")
+                })
+
+        self.state["passthrough"] = current
+        return active
+
+    def active_alerts(self) -> List[Dict[str, Any]]:
+        """Alertas de limiar ativos, no mesmo formato de alerts.py"""
+        active = []
+        for fp, entry in self.state["instances"].items():
+            level = entry.get("level")
+            rule = self._rules_by_name.get(entry["rule"])
+            if not level or rule is None:
+                continue
+            alert = {
+                "severity": level,
+                "category": rule.category,
+                "message": rule.message(level, entry["value"], entry.get("instance")),
+                "value": entry["value"],
+                "threshold": rule.threshold(level),
+                "rule": rule.name,
+                "fingerprint": fp,
+                "since": entry.get("since")
+            }
+            if rule.key_as:
+                alert[rule.key_as] = entry.get("instance")
+            active.append(alert)
+        return active
+
+    def evaluate(self, metrics: Dict[str, Any], stateless_alerts: List[Dict[str, Any]],
+                 now: Optional[float] = None) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
+        """Avalia as métricas; retorna (alertas ativos, eventos fired/resolved desta avaliação).
+
+        Alertas de `stateless_alerts` com 'threshold' ou 'rule' são substituídos pelas regras;
+        os demais passam apenas pela deduplicação.
+        """
+        now = time.time() if now is None else now
+        events: List[Dict[str, Any]] = []
+
+        self._evaluate_rules(metrics, now, events)
+        passthrough = self._evaluate_passthrough([a for a in stateless_alerts if "threshold" not in a and "rule" not in a], now, events)
+
+        return self.active_alerts() + passthrough, events
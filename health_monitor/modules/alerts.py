@@ -3,6 +3,8 @@ Módulo para geração de alertas baseados em thresholds
 """
 from typing import Dict, List, Any
 
+from modules import alert_engine, rule_expr
+
 
 def check_disk_alerts(disk_metrics: Dict[str, Any], thresholds: Dict[str, Any]) -> List[Dict[str, Any]]:
     """Verifica alertas relacionados a disco"""
@@ -197,25 +199,56 @@ def check_network_alerts(network_metrics: Dict[str, Any], thresholds: Dict[str,
             "message": "Falha na resolução DNS",
         })
     
-    # Verificar interfaces com erros
-    for interface in network_metrics.get("interfaces", []):
-        stats = interface.get("statistics", {})
-        errors_in = stats.get("errors_in", 0)
-        errors_out = stats.get("errors_out", 0)
-        
-        if errors_in > 100 or errors_out > 100:
-            alerts.append({
-                "severity": "warning",
-                "category": "network",
-                "message": f"Interface {interface.get('name')} com erros elevados",
-                "interface": interface.get("name"),
-                "errors_in": errors_in,
-                "errors_out": errors_out
-            })
+    return alerts
+
+
+# Verificações geradas diretamente da tabela alert_engine.THRESHOLD_RULES
+# (mesmas mensagens e limites do motor com estado)
+TABLE_RULES = ("disk_io_util", "disk_io_await", "swap_out_rate", "network_error_rate")
+
+
+def _evaluate_rules(metrics: Dict[str, Any], rules: List[alert_engine.Rule]) -> List[Dict[str, Any]]:
+    """Avalia regras do motor sem estado (sem histerese nem duração)"""
+    alerts = []
+    
+    for rule in rules:
+        rule.prepare(metrics)
+        for instance, obj in rule_expr.resolve_source(metrics, rule_expr.parse_source(rule.source)):
+            sample = rule.sample(obj)
+            if sample is None:
+                continue
+            value, match = sample
+            severity = rule.target_level(match, None)
+            if severity is None:
+                continue
+            
+            instance_value = obj.get(rule.key, instance) if rule.key and isinstance(obj, dict) else instance
+            alert = {
+                "severity": severity,
+                "category": rule.category,
+                "message": rule.message(severity, value, instance_value),
+                "value": value,
+                "rule": rule.name
+            }
+            if rule.threshold(severity) is not None:
+                alert["threshold"] = rule.threshold(severity)
+            if rule.key_as:
+                alert[rule.key_as] = instance_value
+            alerts.append(alert)
     
     return alerts
 
 
+def check_threshold_rules(metrics: Dict[str, Any], config: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """Verifica as regras de limiar de TABLE_RULES (I/O de disco, swap-out, erros de rede)"""
+    return _evaluate_rules(metrics, alert_engine.build_threshold_rules(config, TABLE_RULES))
+
+
+def check_rule_alerts(metrics: Dict[str, Any], config: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """Verifica as regras declaradas em alerting.rules (sem estado: sem histerese nem duração)"""
+    return _evaluate_rules(metrics, alert_engine.build_custom_rules(config))
+
+
 def generate_alerts(metrics: Dict[str, Any], config: Dict[str, Any]) -> List[Dict[str, Any]]:
     """Gera todos os alertas baseados nas métricas coletadas"""
     all_alerts = []
@@ -237,4 +270,10 @@ def generate_alerts(metrics: Dict[str, Any], config: Dict[str, Any]) -> List[Dic
     if "network" in metrics:
         all_alerts.extend(check_network_alerts(metrics["network"], thresholds))
     
+    # Limiares definidos na tabela de regras do motor
+    all_alerts.extend(check_threshold_rules(metrics, config))
+    
+    # Regras declarativas da configuração
+    all_alerts.extend(check_rule_alerts(metrics, config))
+    
     return all_alerts
@@ -0,0 +1,131 @@
+"""
+Módulo para execução concorrente dos coletores de métricas
+"""
+import queue
+import threading
+import time
+from typing import Dict, List, Any, Callable, Tuple, Optional
+
+
+# (nome, rótulo exibido, função coletora)
+Collector = Tuple[str, str, Callable[[Dict[str, Any]], Dict[str, Any]]]
+
+DEFAULT_TIMEOUT = 60
+
+# Thread da execução mais recente de cada coletor (pode seguir viva após o tempo limite)
+_running: Dict[str, threading.Thread] = {}
+_running_lock = threading.Lock()
+
+
+def _timed_call(func: Callable[[Dict[str, Any]], Dict[str, Any]],
+                config: Dict[str, Any]) -> Tuple[Optional[Dict[str, Any]], Optional[Exception], float]:
+    """Executa um coletor e mede o tempo gasto, capturando a exceção se houver"""
+    start = time.monotonic()
+    try:
+        return func(config), None, time.monotonic() - start
+    except Exception as e:
+        return None, e, time.monotonic() - start
+
+
+def get_collector_timeout(name: str, config: Dict[str, Any]) -> float:
+    """Obtém o timeout configurado para um coletor"""
+    monitoring = config.get("monitoring", {})
+    timeouts = monitoring.get("collector_timeouts", {})
+    return float(timeouts.get(name, monitoring.get("collector_timeout", DEFAULT_TIMEOUT)))
+
+
+def _start_collector(name: str, func: Callable[[Dict[str, Any]], Dict[str, Any]],
+                     config: Dict[str, Any]) -> Optional[Tuple[threading.Thread, Dict[str, Any]]]:
+    """Inicia o coletor em uma thread daemon, ou retorna None se a execução anterior ainda não terminou.
+
+    Threads daemon não seguram o encerramento do processo, e um coletor nunca roda
+    duas vezes ao mesmo tempo (o estado dos amostradores é global por módulo).
+    """
+    with _running_lock:
+        previous = _running.get(name)
+        if previous is not None and previous.is_alive():
+            return None
+
+        outcome: Dict[str, Any] = {}
+
+        def _run():
+            outcome["result"] = _timed_call(func, config)
+
+        thread = threading.Thread(target=_run, name=f"collector-{name}", daemon=True)
+        _running[name] = thread
+        thread.start()
+    return thread, outcome
+
+
+def _await_collector(name: str, running: Optional[Tuple[threading.Thread, Dict[str, Any]]],
+                     config: Dict[str, Any], start: float, quiet: bool) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+    """Espera o coletor até o tempo limite (contado a partir de `start`).
+
+    Retorna (métricas ou erro, estatística da execução).
+    """
+    if running is None:
+        if not quiet:
+            print(f"    ⚠️  {name}: execução anterior ainda em andamento")
+        return {"error": "Execução anterior ainda em andamento"}, {"status": "skipped", "duration_seconds": 0.0}
+
+    thread, outcome = running
+    timeout = get_collector_timeout(name, config)
+    thread.join(max(timeout - (time.monotonic() - start), 0))
+    if thread.is_alive():
+        if not quiet:
+            print(f"    ⚠️  {name}: tempo limite de {timeout}s excedido")
+        return ({"error": f"Tempo limite de {timeout}s excedido"},
+                {"status": "timeout", "duration_seconds": round(time.monotonic() - start, 3)})
+
+    result, error, elapsed = outcome["result"]
+    if error is not None:
+        if not quiet:
+            print(f"    ⚠️  {name}: Erro: {error}")
+        return {"error": str(error)}, {"status": "error", "duration_seconds": round(elapsed, 3)}
+    return result, {"status": "ok", "duration_seconds": round(elapsed, 3)}
+
+
+def run_collectors(collectors: List[Collector], config: Dict[str, Any],
+                   stats: Optional[Dict[str, Any]] = None, quiet: bool = False) -> Dict[str, Any]:
+    """Executa os coletores em paralelo, isolando falhas e timeouts por coletor.
+
+    Um coletor que estoura o tempo limite continua rodando em segundo plano até
+    terminar (os subprocessos têm timeout próprio); enquanto isso, novas execuções
+    dele são puladas e marcadas como `skipped`.
+    """
+    metrics = {}
+    durations = {}
+    start = time.monotonic()
+
+    started = []
+    for name, label, func in collectors:
+        if not quiet:
+            print(f"  {label}...")
+        started.append((name, _start_collector(name, func, config)))
+
+    # O prazo de cada coletor é contado a partir do início da coleta
+    for name, running in started:
+        metrics[name], durations[name] = _await_collector(name, running, config, start, quiet)
+
+    if stats is not None:
+        stats["mode"] = "parallel"
+        stats["total_seconds"] = round(time.monotonic() - start, 3)
+        stats["collectors"] = durations
+
+    return metrics
+
+
+def start_collectors(collectors: List[Collector], config: Dict[str, Any], results: queue.Queue) -> None:
+    """Dispara os coletores sem esperar por eles (modo daemon).
+
+    Cada um entrega (nome, métricas ou erro, estatística) em `results` ao terminar
+    ou ao estourar o tempo limite, então um coletor lento não atrasa os demais.
+    """
+    start = time.monotonic()
+    for name, _, func in collectors:
+        running = _start_collector(name, func, config)
+
+        def _deliver(name=name, running=running):
+            results.put((name,) + _await_collector(name, running, config, start, quiet=True))
+
+        threading.Thread(target=_deliver, name=f"collector-wait-{name}", daemon=True).start()
@@ -1,19 +1,132 @@
 """
 Módulo para monitoramento de CPU
 """
+import os
 import psutil
 import subprocess
 from typing import Dict, List, Any, Optional
 
+from modules import state
 
-def get_cpu_usage() -> Dict[str, Any]:
+
+# Indica se o psutil já possui uma amostra anterior (fallback sem /proc/stat)
+_counters_primed = False
+
+# Último snapshot de /proc/stat mantido em memória (modo daemon)
+_last_snapshot: Optional[Dict[str, Any]] = None
+
+# Colunas de /proc/stat: user nice system idle iowait irq softirq steal (guest já está em user)
+_IDLE, _IOWAIT, _SOFTIRQ, _STEAL = 3, 4, 6, 7
+_TIME_FIELDS = 8
+
+
+def _read_proc_stat() -> Dict[str, Any]:
+    """Lê os contadores de tempo de CPU de /proc/stat em uma única leitura"""
+    with open('/proc/stat', 'r') as f:
+        content = f.read()
+    
+    snapshot = {"cpus": {}, "btime": None}
+    for line in content.splitlines():
+        if line.startswith('cpu'):
+            parts = line.split()
+            snapshot["cpus"][parts[0]] = [int(v) for v in parts[1:_TIME_FIELDS + 1]]
+        elif line.startswith('btime'):
+            snapshot["btime"] = int(line.split()[1])
+    
+    return snapshot
+
+
+def _percentages(current: List[int], previous: Optional[List[int]]) -> Dict[str, float]:
+    """Calcula percentuais a partir do delta entre dois snapshots de uma CPU"""
+    if previous is None or len(previous) != len(current) or any(c < p for c, p in zip(current, previous)):
+        # Sem snapshot válido: média desde o boot
+        previous = [0] * len(current)
+    
+    delta = [c - p for c, p in zip(current, previous)]
+    total = sum(delta)
+    if total <= 0:
+        return {"busy": 0.0, "iowait": 0.0, "softirq": 0.0, "steal": 0.0, "ticks": 0}
+    
+    busy = total - delta[_IDLE] - delta[_IOWAIT]
+    return {
+        "busy": round(busy / total * 100, 1),
+        "iowait": round(delta[_IOWAIT] / total * 100, 1),
+        "softirq": round(delta[_SOFTIRQ] / total * 100, 1),
+        "steal": round(delta[_STEAL] / total * 100, 1),
+        "ticks": total
+    }
+
+
+def _get_cpu_usage_proc(config: Dict[str, Any]) -> Dict[str, Any]:
+    """Calcula uso de CPU pelo delta de /proc/stat contra o snapshot anterior"""
+    global _last_snapshot
+    
+    current = _read_proc_stat()
+    # Com snapshot em memória (modo daemon) o estado em disco não é lido nem gravado a cada ciclo
+    persist = _last_snapshot is None
+    previous = state.load_state(config, "cpu") if persist else _last_snapshot
+    
+    # Snapshot de outro boot não serve como base
+    if previous.get("btime") != current["btime"]:
+        previous = {}
+    previous_cpus = previous.get("cpus", {})
+    
+    total = _percentages(current["cpus"]["cpu"], previous_cpus.get("cpu"))
+    per_core = [
+        _percentages(values, previous_cpus.get(name))["busy"]
+        for name, values in current["cpus"].items() if name != "cpu"
+    ]
+    
+    _last_snapshot = current
+    if persist:
+        try:
+            state.save_state(config, "cpu", current)
+        except OSError:
+            pass
+    
+    core_total = max(len(per_core), 1)
+    clock_ticks = os.sysconf('SC_CLK_TCK') if hasattr(os, 'sysconf') else 100
+    
+    return {
+        "percent_total": total["busy"],
+        "percent_per_core": per_core,
+        "iowait_percent": total["iowait"],
+        "steal_percent": total["steal"],
+        "softirq_percent": total["softirq"],
+        "sample_window_seconds": round(total["ticks"] / core_total / clock_ticks, 2),
+        "sampling": "delta" if previous_cpus else "since_boot"
+    }
+
+
+def _get_cpu_usage_psutil() -> Dict[str, Any]:
+    """Obtém uso de CPU via psutil (sistemas sem /proc/stat)"""
+    global _counters_primed
+    
+    if _counters_primed:
+        # Delta desde a chamada anterior, sem bloquear
+        cpu_percent = psutil.cpu_percent(interval=None, percpu=True)
+        percent_total = psutil.cpu_percent(interval=None)
+    else:
+        cpu_percent = psutil.cpu_percent(interval=1, percpu=True)
+        percent_total = psutil.cpu_percent(interval=0.1)
+        _counters_primed = True
+    
+    return {
+        "percent_total": percent_total,
+        "percent_per_core": cpu_percent
+    }
+
+
+def get_cpu_usage(config: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
     """Obtém informações de uso da CPU"""
-    cpu_percent = psutil.cpu_percent(interval=1, percpu=True)
+    try:
+        usage = _get_cpu_usage_proc(config or {})
+    except (OSError, ValueError, KeyError, IndexError):
+        usage = _get_cpu_usage_psutil()
+    
     cpu_freq = psutil.cpu_freq()
     
-    return {
-        "percent_total": psutil.cpu_percent(interval=0.1),
-        "percent_per_core": cpu_percent,
+    usage.update({
         "core_count": psutil.cpu_count(logical=False),
         "logical_count": psutil.cpu_count(logical=True),
         "frequency_mhz": {
@@ -21,7 +134,9 @@ def get_cpu_usage() -> Dict[str, Any]:
             "min": round(cpu_freq.min, 2) if cpu_freq else None,
             "max": round(cpu_freq.max, 2) if cpu_freq else None
         }
-    }
+    })
+    
+    return usage
 
 
 def get_load_average() -> Dict[str, Any]:
@@ -92,7 +207,7 @@ def get_cpu_temperature() -> Optional[Dict[str, Any]]:
 def collect_cpu_metrics(config: Dict[str, Any]) -> Dict[str, Any]:
     """Coleta todas as métricas de CPU"""
     return {
-        "usage": get_cpu_usage(),
+        "usage": get_cpu_usage(config),
         "load_average": get_load_average(),
         "temperature": get_cpu_temperature()
     }
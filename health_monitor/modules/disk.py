@@ -1,92 +1,148 @@
 """
 Módulo para monitoramento de discos e armazenamento
 """
+import os
 import psutil
 import subprocess
 import json
-from typing import Dict, List, Any
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Any, Optional, Tuple
 
+from modules import state
 
-def get_disk_usage() -> List[Dict[str, Any]]:
-    """Obtém informações de uso de disco para todas as partições"""
+
+def get_mount_usage() -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
+    """Obtém uso de espaço e de inodes de cada partição com um único statvfs por ponto de montagem"""
     partitions = []
+    inodes = []
     
     for partition in psutil.disk_partitions(all=False):
         try:
-            usage = psutil.disk_usage(partition.mountpoint)
-            partitions.append({
-                "device": partition.device,
-                "mountpoint": partition.mountpoint,
-                "fstype": partition.fstype,
-                "total_gb": round(usage.total / (1024**3), 2),
-                "used_gb": round(usage.used / (1024**3), 2),
-                "free_gb": round(usage.free / (1024**3), 2),
-                "percent_used": usage.percent
-            })
-        except PermissionError:
+            st = os.statvfs(partition.mountpoint)
+        except (PermissionError, FileNotFoundError):
             # Ignorar partições sem permissão de acesso
             continue
+        
+        # Mesmo cálculo do psutil.disk_usage (espaço reservado ao root não conta como livre)
+        total = st.f_blocks * st.f_frsize
+        free = st.f_bavail * st.f_frsize
+        used = (st.f_blocks - st.f_bfree) * st.f_frsize
+        usable = used + free
+        
+        partitions.append({
+            "device": partition.device,
+            "mountpoint": partition.mountpoint,
+            "fstype": partition.fstype,
+            "total_gb": round(total / (1024**3), 2),
+            "used_gb": round(used / (1024**3), 2),
+            "free_gb": round(free / (1024**3), 2),
+            "percent_used": round(used / usable * 100, 1) if usable else 0.0
+        })
+        
+        # Alguns filesystems (ex.: btrfs) não possuem limite fixo de inodes
+        inodes_used = st.f_files - st.f_ffree
+        inodes.append({
+            "filesystem": partition.device,
+            "inodes_total": st.f_files,
+            "inodes_used": inodes_used,
+            "inodes_free": st.f_ffree,
+            "percent_used": round(inodes_used / st.f_files * 100, 1) if st.f_files else 0.0,
+            "mountpoint": partition.mountpoint
+        })
     
-    return partitions
+    return partitions, inodes
+
+
+def get_disk_usage() -> List[Dict[str, Any]]:
+    """Obtém informações de uso de disco para todas as partições"""
+    return get_mount_usage()[0]
 
 
 def get_inodes_info() -> List[Dict[str, Any]]:
     """Obtém informações sobre uso de inodes"""
-    inodes = []
-    
     try:
-        result = subprocess.run(
-            ['df', '-i'],
-            capture_output=True,
-            text=True,
-            timeout=10
-        )
-        
-        if result.returncode == 0:
-            lines = result.stdout.strip().split('\n')[1:]  # Pular cabeçalho
-            
-            for line in lines:
-                parts = line.split()
-                if len(parts) >= 6 and parts[0].startswith('/'):
-                    try:
-                        percent = parts[4].rstrip('%')
-                        inodes.append({
-                            "filesystem": parts[0],
-                            "inodes_total": parts[1],
-                            "inodes_used": parts[2],
-                            "inodes_free": parts[3],
-                            "percent_used": int(percent) if percent != '-' else 0,
-                            "mountpoint": parts[5]
-                        })
-                    except (ValueError, IndexError):
-                        continue
+        return get_mount_usage()[1]
     except Exception as e:
-        inodes.append({"error": f"Erro ao obter inodes: {str(e)}"})
+        return [{"error": f"Erro ao obter inodes: {str(e)}"}]
+
+
+def _list_disks() -> List[str]:
+    """Lista os dispositivos de bloco do tipo disco"""
+    result = subprocess.run(
+        ['lsblk', '-d', '-n', '-o', 'NAME,TYPE'],
+        capture_output=True,
+        text=True,
+        timeout=10
+    )
+    
+    devices = []
+    if result.returncode == 0:
+        for line in result.stdout.strip().split('\n'):
+            parts = line.split()
+            if len(parts) >= 2 and parts[1] == 'disk':
+                devices.append(f"/dev/{parts[0]}")
     
-    return inodes
+    return devices
 
 
-def get_smart_status() -> List[Dict[str, Any]]:
-    """Obtém status SMART dos discos (requer smartmontools)"""
+def get_smart_status(config: Optional[Dict[str, Any]] = None) -> List[Dict[str, Any]]:
+    """Obtém status SMART dos discos (requer smartmontools).
+    
+    Os discos são consultados em paralelo e o resultado de cada um fica em cache
+    por `smart_cache_ttl_seconds`, já que os atributos SMART mudam lentamente.
+    """
+    config = config or {}
+    monitoring = config.get("monitoring", {})
+    ttl = monitoring.get("smart_cache_ttl_seconds", 3600)
+    max_workers = monitoring.get("smart_max_workers", 4)
+    
     smart_data = []
     
     try:
-        # Listar todos os dispositivos de bloco
-        result = subprocess.run(
-            ['lsblk', '-d', '-n', '-o', 'NAME,TYPE'],
-            capture_output=True,
-            text=True,
-            timeout=10
-        )
+        devices = _list_disks()
+        
+        now = time.time()
+        cache = state.load_state(config, "smart").get("devices", {})
+        fresh = {
+            device: cache[device]
+            for device in devices
+            if device in cache and now - cache[device].get("timestamp", 0) < ttl
+        }
+        
+        # Consultar em paralelo apenas os discos sem cache válido
+        to_probe = [device for device in devices if device not in fresh]
+        if to_probe:
+            with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(to_probe)))) as executor:
+                probed = dict(zip(to_probe, executor.map(_get_device_smart, to_probe)))
+        else:
+            probed = {}
+        
+        new_cache = {}
+        for device in devices:
+            if device in fresh:
+                entry = fresh[device]
+                smart_info = dict(entry["result"])
+                smart_info["cached"] = True
+                smart_info["cache_age_seconds"] = int(now - entry["timestamp"])
+                new_cache[device] = entry
+            else:
+                smart_info = probed[device]
+                # Erros não são mantidos em cache para serem reavaliados no próximo ciclo
+                if "error" not in smart_info:
+                    new_cache[device] = {"timestamp": now, "result": smart_info}
+                smart_info = dict(smart_info)
+                smart_info["cached"] = False
+                smart_info["cache_age_seconds"] = 0
+            
+            smart_data.append(smart_info)
         
-        if result.returncode == 0:
-            for line in result.stdout.strip().split('\n'):
-                parts = line.split()
-                if len(parts) >= 2 and parts[1] == 'disk':
-                    device = f"/dev/{parts[0]}"
-                    smart_info = _get_device_smart(device)
-                    if smart_info:
-                        smart_data.append(smart_info)
+        # Ciclo servido só pelo cache: nada mudou, evitar reescrever o arquivo de estado
+        if probed:
+            try:
+                state.save_state(config, "smart", {"devices": new_cache})
+            except OSError:
+                pass
     except Exception as e:
         smart_data.append({
             "error": f"Erro ao obter SMART: {str(e)}",
@@ -169,13 +225,14 @@ def _get_device_smart(device: str) -> Dict[str, Any]:
 
 def collect_disk_metrics(config: Dict[str, Any]) -> Dict[str, Any]:
     """Coleta todas as métricas de disco"""
+    partitions, inodes = get_mount_usage()
     metrics = {
-        "partitions": get_disk_usage(),
-        "inodes": get_inodes_info()
+        "partitions": partitions,
+        "inodes": inodes
     }
     
     # Verificar SMART apenas se configurado
     if config.get("monitoring", {}).get("check_smart", True):
-        metrics["smart_status"] = get_smart_status()
+        metrics["smart_status"] = get_smart_status(config)
     
     return metrics
@@ -0,0 +1,142 @@
+"""
+Módulo para monitoramento de I/O de disco (IOPS, throughput, latência, fila e utilização)
+"""
+import os
+import time
+from typing import Dict, List, Any, Optional, Set, Tuple
+
+
+# Colunas de /proc/diskstats após (major, minor, nome)
+_READS, _SECTORS_READ, _MS_READING = 0, 2, 3
+_WRITES, _SECTORS_WRITTEN, _MS_WRITING = 4, 6, 7
+_IN_FLIGHT, _MS_IO, _WEIGHTED_MS_IO = 8, 9, 10
+_FIELDS = 11
+# Todas as colunas são cumulativas, exceto as operações em andamento
+_CUMULATIVE = tuple(i for i in range(_FIELDS) if i != _IN_FLIGHT)
+
+# /proc/diskstats sempre conta setores de 512 bytes
+_SECTOR_BYTES = 512
+
+DEFAULT_EXCLUDE = ("loop", "ram", "zram")
+
+# Amostra anterior mantida em memória (modo daemon)
+_last_sample: Optional[Dict[str, Tuple[str, List[int]]]] = None
+_last_sample_time = 0.0
+
+# Dispositivos inteiros (/sys/block) e nomes já vistos que não são (partições)
+_whole_disks: Set[str] = set()
+_not_disks: Set[str] = set()
+
+
+def _refresh_block_devices() -> None:
+    global _whole_disks
+    try:
+        _whole_disks = set(os.listdir('/sys/block'))
+    except OSError:
+        _whole_disks = set()
+
+
+def _is_whole_disk(name: str) -> bool:
+    """Partições ficam de fora; /sys/block só é relido quando aparece um nome desconhecido"""
+    if name in _whole_disks:
+        return True
+    if name in _not_disks:
+        return False
+    _refresh_block_devices()
+    if name in _whole_disks or not _whole_disks:
+        return True
+    _not_disks.add(name)
+    return False
+
+
+def _read_diskstats(exclude: Tuple[str, ...]) -> Dict[str, Tuple[str, List[int]]]:
+    """Lê /proc/diskstats em uma única leitura: nome -> (major:minor, contadores)"""
+    with open('/proc/diskstats', 'r') as f:
+        content = f.read()
+
+    sample = {}
+    for line in content.splitlines():
+        parts = line.split()
+        if len(parts) < 3 + _FIELDS:
+            continue
+        name = parts[2]
+        if name.startswith(exclude) or not _is_whole_disk(name):
+            continue
+        counters = [int(v) for v in parts[3:3 + _FIELDS]]
+        # Dispositivos sem nenhuma operação desde o boot (ex.: leitor óptico vazio)
+        if counters[_READS] == 0 and counters[_WRITES] == 0:
+            continue
+        sample[name] = (f"{parts[0]}:{parts[1]}", counters)
+
+    return sample
+
+
+def _device_stats(name: str, counters: List[int], previous: Optional[List[int]],
+                  elapsed: float) -> Dict[str, Any]:
+    """Calcula as métricas de um dispositivo pelo delta entre duas amostras"""
+    stats = {"device": name, "in_flight": counters[_IN_FLIGHT]}
+
+    if previous is None or any(counters[i] < previous[i] for i in _CUMULATIVE):
+        # Sem base válida (dispositivo novo ou contadores reiniciados)
+        for field in ("read_iops", "write_iops", "read_mb_per_sec", "write_mb_per_sec",
+                      "await_ms", "read_await_ms", "write_await_ms", "queue_depth", "util_percent"):
+            stats[field] = None
+        return stats
+
+    delta = [c - p for c, p in zip(counters, previous)]
+    reads, writes = delta[_READS], delta[_WRITES]
+    ios = reads + writes
+
+    stats.update({
+        "read_iops": round(reads / elapsed, 1),
+        "write_iops": round(writes / elapsed, 1),
+        "read_mb_per_sec": round(delta[_SECTORS_READ] * _SECTOR_BYTES / (1024**2) / elapsed, 2),
+        "write_mb_per_sec": round(delta[_SECTORS_WRITTEN] * _SECTOR_BYTES / (1024**2) / elapsed, 2),
+        # Latência média por operação concluída no intervalo (equivalente ao await do iostat)
+        "await_ms": round((delta[_MS_READING] + delta[_MS_WRITING]) / ios, 2) if ios else 0.0,
+        "read_await_ms": round(delta[_MS_READING] / reads, 2) if reads else 0.0,
+        "write_await_ms": round(delta[_MS_WRITING] / writes, 2) if writes else 0.0,
+        # Tamanho médio da fila (aqu-sz) e fração do tempo com I/O em andamento
+        "queue_depth": round(delta[_WEIGHTED_MS_IO] / (elapsed * 1000), 2),
+        "util_percent": round(min(delta[_MS_IO] / (elapsed * 1000) * 100, 100.0), 1)
+    })
+    return stats
+
+
+def collect_disk_io_metrics(config: Dict[str, Any]) -> Dict[str, Any]:
+    """Coleta as métricas de I/O por dispositivo.
+
+    As taxas vêm do delta contra a amostra anterior: no modo daemon, a do ciclo
+    passado; na primeira coleta, uma amostra curta (`disk_io_sample_interval`).
+    """
+    global _last_sample, _last_sample_time
+
+    monitoring = config.get("monitoring", {})
+    exclude = tuple(monitoring.get("disk_io_exclude", DEFAULT_EXCLUDE))
+
+    previous = _last_sample
+    previous_time = _last_sample_time
+
+    if previous is None:
+        previous = _read_diskstats(exclude)
+        previous_time = time.monotonic()
+        time.sleep(monitoring.get("disk_io_sample_interval", 0.5))
+
+    current = _read_diskstats(exclude)
+    current_time = time.monotonic()
+    elapsed = max(current_time - previous_time, 1e-6)
+
+    _last_sample = current
+    _last_sample_time = current_time
+
+    devices = []
+    for name, (identity, counters) in current.items():
+        before = previous.get(name)
+        # Mesmo nome com outro major:minor é outro dispositivo (ex.: disco USB reconectado)
+        previous_counters = before[1] if before and before[0] == identity else None
+        devices.append(_device_stats(name, counters, previous_counters, elapsed))
+
+    return {
+        "devices": devices,
+        "sample_window_seconds": round(elapsed, 2)
+    }
@@ -0,0 +1,240 @@
+"""
+Módulo exportador Prometheus/OpenMetrics: serve as métricas coletadas via HTTP
+"""
+import math
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Any, Optional, Tuple
+
+from modules import history
+
+
+PREFIX = "health"
+
+CONTENT_TYPE_OPENMETRICS = "application/openmetrics-text; version=1.0.0; charset=utf-8"
+CONTENT_TYPE_TEXT = "text/plain; version=0.0.4; charset=utf-8"
+
+# Limites do histograma de duração das coletas (segundos)
+DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+# Nome do label para os itens de cada lista (padrão: o próprio nome da lista)
+_LABEL_NAMES = {
+    "partitions": "mountpoint",
+    "inodes": "mountpoint",
+    "smart_status": "device",
+    "devices": "device",
+    "interfaces": "interface",
+    "connectivity": "target",
+    "per_nameserver": "nameserver",
+    "systemd_services": "service",
+    "percent_per_core": "core"
+}
+
+# Dicionários com chaves dinâmicas (nomes de unidades), que gerariam séries sem controle
+_SKIP_SEGMENTS = ("by_unit",)
+
+# Sufixos que o OpenMetrics reserva para contadores, histogramas e info: um gauge
+# com esses nomes (ex.: logs.errors_total) invalidaria a exposição
+_RESERVED_SUFFIXES = ("_total", "_count", "_sum", "_bucket", "_created", "_info")
+
+_SEGMENT = re.compile(r'([^.\[]+)((?:\[[^\]]*\])?)')
+_INVALID_NAME_CHARS = re.compile(r'[^a-zA-Z0-9_]')
+
+
+def _metric_name(parts: List[str]) -> str:
+    """Monta um nome de métrica válido a partir dos segmentos do caminho"""
+    return re.sub(r'_+', '_', _INVALID_NAME_CHARS.sub("_", "_".join([PREFIX] + parts)))
+
+
+def _escape_label(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\"", "\\\"").replace("\n", "\\n")
+
+
+def _format_labels(labels: List[Tuple[str, str]]) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape_label(str(value))}"' for name, value in labels) + "}"
+
+
+def _format_value(value: float) -> str:
+    if math.isnan(value):
+        return "NaN"
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    return repr(float(value))
+
+
+def path_to_series(path: str) -> Optional[Tuple[str, List[Tuple[str, str]]]]:
+    """Converte um caminho do histórico (disk.partitions[/].percent_used) em nome e labels"""
+    parts = []
+    labels = []
+    for segment, item in _SEGMENT.findall(path):
+        if segment in _SKIP_SEGMENTS:
+            return None
+        parts.append(segment)
+        if item:
+            labels.append((_LABEL_NAMES.get(segment, _INVALID_NAME_CHARS.sub("_", segment)), item[1:-1]))
+    name = _metric_name(parts)
+    if name.endswith(_RESERVED_SUFFIXES):
+        # Renomear nos dois formatos, para o nome da série não depender do Accept do scrape
+        name += "_value"
+    return name, labels
+
+
+# Família de métricas: (nome, tipo OpenMetrics, unidade, linhas de amostras)
+Family = Tuple[str, str, Optional[str], List[str]]
+
+
+def render_families(families: List[Family], openmetrics: bool = True) -> bytes:
+    """Gera o texto de exposição; sem OpenMetrics usa o formato texto 0.0.4 do Prometheus"""
+    lines = []
+    for name, metric_type, unit, samples in families:
+        if not openmetrics and metric_type == "info":
+            # O formato 0.0.4 não tem o tipo info: usar gauge com o nome completo
+            lines.append(f"# TYPE {name}_info gauge")
+        else:
+            lines.append(f"# TYPE {name} {metric_type}")
+        if unit and openmetrics:
+            lines.append(f"# UNIT {name} {unit}")
+        lines.extend(samples)
+    if openmetrics:
+        lines.append("# EOF")
+    return ("\n".join(lines) + "\n").encode("utf-8")
+
+
+class Histogram:
+    """Histograma cumulativo com um conjunto de buckets por label"""
+
+    def __init__(self, buckets: Tuple[float, ...] = DURATION_BUCKETS):
+        self.buckets = buckets
+        self.series: Dict[str, Dict[str, Any]] = {}
+
+    def observe(self, label: str, value: float) -> None:
+        entry = self.series.setdefault(label, {"counts": [0] * len(self.buckets), "count": 0, "sum": 0.0})
+        for index, bound in enumerate(self.buckets):
+            if value <= bound:
+                entry["counts"][index] += 1
+        entry["count"] += 1
+        entry["sum"] += value
+
+    def family(self, name: str, label_name: str) -> Family:
+        samples = []
+        for label, entry in sorted(self.series.items()):
+            label_text = f'{label_name}="{_escape_label(label)}"'
+            for bound, count in zip(self.buckets, entry["counts"]):
+                samples.append(f'{name}_bucket{{{label_text},le="{bound}"}} {count}')
+            samples.append(f'{name}_bucket{{{label_text},le="+Inf"}} {entry["count"]}')
+            samples.append(f'{name}_count{{{label_text}}} {entry["count"]}')
+            samples.append(f'{name}_sum{{{label_text}}} {_format_value(entry["sum"])}')
+        return name, "histogram", "seconds", samples
+
+
+def report_families(report: Dict[str, Any]) -> List[Family]:
+    """Converte as métricas, o resumo e a identificação do host de um relatório em famílias"""
+    samples: Dict[str, List[str]] = {}
+
+    values = dict(history.flatten_metrics(report.get("metrics", {})))
+    values.update(history.flatten_metrics(report.get("summary", {}), "summary"))
+
+    for path, value in values.items():
+        series = path_to_series(path)
+        if series is None:
+            continue
+        name, labels = series
+        samples.setdefault(name, []).append(f"{name}{_format_labels(labels)} {_format_value(value)}")
+
+    families: List[Family] = [(name, "gauge", None, samples[name]) for name in sorted(samples)]
+
+    info = report.get("metrics", {}).get("system", {}).get("info", {})
+    info_labels = [("hostname", report.get("hostname", "unknown"))]
+    info_labels += [(key, info[key]) for key in ("distribution", "kernel", "architecture") if info.get(key)]
+    families.append((f"{PREFIX}_host", "info", None, [f"{PREFIX}_host_info{_format_labels(info_labels)} 1"]))
+    return families
+
+
+class MetricsExporter:
+    """Mantém os snapshots pré-renderizados servidos a cada scrape"""
+
+    def __init__(self):
+        self.durations = Histogram()
+        self.last_success: Dict[str, float] = {}
+        self.last_status: Dict[str, str] = {}
+        self.snapshot = render_families([])
+        self.snapshot_text = render_families([], openmetrics=False)
+        self._lock = threading.Lock()
+
+    def record_collection(self, stats: Dict[str, Any], now: Optional[float] = None) -> None:
+        """Registra duração e status das coletas de um ciclo"""
+        now = time.time() if now is None else now
+        with self._lock:
+            for name, entry in stats.get("collectors", {}).items():
+                self.last_status[name] = entry.get("status", "unknown")
+                if entry.get("duration_seconds") is not None:
+                    self.durations.observe(name, entry["duration_seconds"])
+                if entry.get("status") == "ok":
+                    self.last_success[name] = now
+
+    def _collector_families(self) -> List[Family]:
+        """Frescor e duração de cada coletor"""
+        name = f"{PREFIX}_collector_last_success_timestamp_seconds"
+        freshness = [f'{name}{{collector="{c}"}} {_format_value(ts)}' for c, ts in sorted(self.last_success.items())]
+
+        up_name = f"{PREFIX}_collector_up"
+        up = [f'{up_name}{{collector="{c}"}} {1 if status == "ok" else 0}' for c, status in sorted(self.last_status.items())]
+
+        snapshot_name = f"{PREFIX}_exporter_snapshot_timestamp_seconds"
+        return [
+            (name, "gauge", "seconds", freshness),
+            (up_name, "gauge", None, up),
+            self.durations.family(f"{PREFIX}_collector_duration_seconds", "collector"),
+            (snapshot_name, "gauge", "seconds", [f"{snapshot_name} {_format_value(time.time())}"])
+        ]
+
+    def update(self, report: Dict[str, Any]) -> None:
+        """Renderiza o relatório e troca os snapshots (os scrapes nunca disparam coleta)"""
+        with self._lock:
+            families = report_families(report) + self._collector_families()
+        # Atribuições simples: cada scrape lê um snapshot completo, antigo ou novo
+        self.snapshot = render_families(families)
+        self.snapshot_text = render_families(families, openmetrics=False)
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    # Cabeçalhos e corpo saem em escritas separadas; sem Nagle, o keep-alive não espera o ACK atrasado
+    disable_nagle_algorithm = True
+
+    def do_GET(self):
+        if self.path.split("?", 1)[0] != "/metrics":
+            body = b"Health Monitor exporter - use /metrics\n"
+            self._send(404 if self.path != "/" else 200, "text/plain; charset=utf-8", body)
+            return
+
+        exporter = self.server.exporter
+        if "application/openmetrics-text" in self.headers.get("Accept", ""):
+            self._send(200, CONTENT_TYPE_OPENMETRICS, exporter.snapshot)
+        else:
+            self._send(200, CONTENT_TYPE_TEXT, exporter.snapshot_text)
+
+    def _send(self, status: int, content_type: str, body: bytes):
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def start_server(exporter: MetricsExporter, host: str = "127.0.0.1", port: int = 9877) -> ThreadingHTTPServer:
+    """Inicia o servidor HTTP em uma thread em segundo plano"""
+    server = ThreadingHTTPServer((host, port), _MetricsHandler)
+    server.daemon_threads = True
+    server.exporter = exporter
+
+    thread = threading.Thread(target=server.serve_forever, name="metrics-exporter", daemon=True)
+    thread.start()
+    return server
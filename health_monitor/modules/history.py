@@ -0,0 +1,283 @@
+"""
+Módulo de histórico: armazena as métricas numéricas dos relatórios em séries temporais (SQLite)
+"""
+import sqlite3
+import time
+from pathlib import Path
+from typing import Dict, List, Any, Iterator, Optional, Tuple
+
+from modules import state
+
+
+# Listas que não formam séries estáveis (rankings, logs, endereços)
+_SKIP_KEYS = {
+    "top_cpu_usage", "top_memory_usage", "top_io_usage", "top_open_files",
+    "errors", "warnings", "boot_errors", "kernel_messages",
+    "addresses", "queries"
+}
+
+# Campos usados para identificar itens de listas (ex.: partitions[/home])
+_ITEM_KEYS = ("mountpoint", "device", "name", "host", "nameserver", "label")
+
+# Tabelas de agregação: (nome, tamanho do bucket em segundos)
+_ROLLUPS = (("rollup_1m", 60), ("rollup_1h", 3600))
+
+_RESOLUTIONS = {"raw": None, "1m": "rollup_1m", "1h": "rollup_1h"}
+
+_AGGREGATES = {"avg", "min", "max", "sum", "count"}
+
+DEFAULT_RETENTION = {
+    "raw_hours": 48,
+    "minute_days": 14,
+    "hour_days": 365
+}
+
+# Intervalo mínimo entre limpezas de retenção
+_RETENTION_INTERVAL = 3600
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS series (
+    id INTEGER PRIMARY KEY,
+    host TEXT NOT NULL,
+    metric TEXT NOT NULL,
+    UNIQUE (host, metric)
+);
+CREATE TABLE IF NOT EXISTS samples (
+    series_id INTEGER NOT NULL,
+    ts INTEGER NOT NULL,
+    value REAL NOT NULL,
+    PRIMARY KEY (series_id, ts)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS rollup_1m (
+    series_id INTEGER NOT NULL,
+    bucket INTEGER NOT NULL,
+    count INTEGER NOT NULL,
+    sum REAL NOT NULL,
+    min REAL NOT NULL,
+    max REAL NOT NULL,
+    PRIMARY KEY (series_id, bucket)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS rollup_1h (
+    series_id INTEGER NOT NULL,
+    bucket INTEGER NOT NULL,
+    count INTEGER NOT NULL,
+    sum REAL NOT NULL,
+    min REAL NOT NULL,
+    max REAL NOT NULL,
+    PRIMARY KEY (series_id, bucket)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+"""
+
+
+def item_key(item: Any, index: int) -> str:
+    """Identifica um item de lista pelo primeiro campo de identificação presente"""
+    if isinstance(item, dict):
+        for field in _ITEM_KEYS:
+            if item.get(field) is not None:
+                return str(item[field])
+    return str(index)
+
+
+def _walk(value: Any, path: str) -> Iterator[Tuple[str, float]]:
+    """Percorre a estrutura produzindo (caminho, valor) para cada número"""
+    if isinstance(value, bool):
+        yield path, float(value)
+    elif isinstance(value, (int, float)):
+        yield path, float(value)
+    elif isinstance(value, dict):
+        for key, child in value.items():
+            if key in _SKIP_KEYS:
+                continue
+            yield from _walk(child, f"{path}.{key}" if path else str(key))
+    elif isinstance(value, list):
+        for index, item in enumerate(value):
+            yield from _walk(item, f"{path}[{item_key(item, index)}]")
+
+
+def flatten_metrics(metrics: Dict[str, Any], prefix: str = "") -> Iterator[Tuple[str, float]]:
+    """Converte métricas aninhadas em pares (caminho, valor), ex.: disk.partitions[/].percent_used"""
+    return _walk(metrics, prefix)
+
+
+def flatten_report(report: Dict[str, Any]) -> Dict[str, float]:
+    """Extrai todas as métricas numéricas de um relatório"""
+    values = dict(flatten_metrics(report.get("metrics", {})))
+    values.update(flatten_metrics(report.get("summary", {}), "summary"))
+    values.update(flatten_metrics(report.get("collection", {}).get("collectors", {}), "collection"))
+    return values
+
+
+def get_history_path(config: Dict[str, Any]) -> Path:
+    """Obtém o caminho do banco de histórico"""
+    path = Path(config.get("history", {}).get("path", "history.db"))
+    if not path.is_absolute():
+        path = state.get_state_dir(config) / path
+    return path
+
+
+def connect(config: Dict[str, Any]) -> sqlite3.Connection:
+    """Abre o banco de histórico em modo WAL, criando o schema se necessário"""
+    path = get_history_path(config)
+    path.parent.mkdir(parents=True, exist_ok=True)
+
+    conn = sqlite3.connect(str(path), timeout=10)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.executescript(_SCHEMA)
+    return conn
+
+
+def _series_ids(conn: sqlite3.Connection, host: str, metrics: List[str]) -> Dict[str, int]:
+    """Obtém (ou cria) os ids das séries de um host"""
+    ids = dict(conn.execute("SELECT metric, id FROM series WHERE host = ?", (host,)).fetchall())
+
+    missing = [m for m in metrics if m not in ids]
+    if missing:
+        conn.executemany("INSERT OR IGNORE INTO series (host, metric) VALUES (?, ?)", [(host, m) for m in missing])
+        ids = dict(conn.execute("SELECT metric, id FROM series WHERE host = ?", (host,)).fetchall())
+
+    return ids
+
+
+def store_report(report: Dict[str, Any], config: Dict[str, Any]) -> int:
+    """Grava as métricas numéricas do relatório; retorna o número de pontos gravados"""
+    values = flatten_report(report)
+    if not values:
+        return 0
+
+    host = report.get("hostname", "unknown")
+    ts = int(report.get("timestamp_unix") or time.time())
+
+    conn = connect(config)
+    try:
+        with conn:
+            ids = _series_ids(conn, host, list(values))
+            rows = [(ids[metric], value) for metric, value in values.items()]
+
+            conn.executemany(
+                "INSERT OR REPLACE INTO samples (series_id, ts, value) VALUES (?, ?, ?)",
+                [(series_id, ts, value) for series_id, value in rows]
+            )
+
+            # Downsampling incremental: raw -> 1 min -> 1 h
+            for table, size in _ROLLUPS:
+                bucket = ts - ts % size
+                conn.executemany(
+                    f"INSERT INTO {table} (series_id, bucket, count, sum, min, max) VALUES (?, ?, 1, ?, ?, ?) "
+                    "ON CONFLICT (series_id, bucket) DO UPDATE SET "
+                    "count = count + 1, sum = sum + excluded.sum, "
+                    "min = MIN(min, excluded.min), max = MAX(max, excluded.max)",
+                    [(series_id, bucket, value, value, value) for series_id, value in rows]
+                )
+
+        apply_retention(conn, config.get("history", {}).get("retention", {}))
+    finally:
+        conn.close()
+
+    return len(values)
+
+
+def apply_retention(conn: sqlite3.Connection, retention: Dict[str, Any], force: bool = False) -> None:
+    """Remove dados antigos de cada resolução (executado no máximo uma vez por hora)"""
+    now = int(time.time())
+    row = conn.execute("SELECT value FROM meta WHERE key = 'last_retention'").fetchone()
+    if not force and row and now - int(row[0]) < _RETENTION_INTERVAL:
+        return
+
+    limits = dict(DEFAULT_RETENTION, **retention)
+    with conn:
+        conn.execute("DELETE FROM samples WHERE ts < ?", (now - limits["raw_hours"] * 3600,))
+        conn.execute("DELETE FROM rollup_1m WHERE bucket < ?", (now - limits["minute_days"] * 86400,))
+        conn.execute("DELETE FROM rollup_1h WHERE bucket < ?", (now - limits["hour_days"] * 86400,))
+        conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('last_retention', ?)", (str(now),))
+
+
+def _series_filter(metric: str, host: Optional[str]) -> Tuple[str, List[Any]]:
+    """Monta o filtro de séries; '*' no nome da métrica funciona como curinga"""
+    if "*" in metric:
+        # '[' é literal nos caminhos (partitions[/home]), não classe de caracteres do GLOB
+        clause = "s.metric GLOB ?"
+        params = [metric.replace("[", "[[]")]
+    else:
+        clause = "s.metric = ?"
+        params = [metric]
+    if host is not None:
+        clause += " AND s.host = ?"
+        params.append(host)
+    return clause, params
+
+
+def _time_bounds(resolution: str, start: int, end: int) -> Tuple[int, int]:
+    """Ajusta o início para incluir o bucket que contém 'start'"""
+    for table, size in _ROLLUPS:
+        if _RESOLUTIONS[resolution] == table:
+            return start - start % size, end
+    return start, end
+
+
+def query_range(config: Dict[str, Any], metric: str, start: int, end: int,
+                host: Optional[str] = None, resolution: str = "raw") -> List[Dict[str, Any]]:
+    """Consulta os pontos de uma métrica em um intervalo [start, end] (timestamps unix)"""
+    if resolution not in _RESOLUTIONS:
+        raise ValueError(f"Resolução inválida: {resolution}")
+
+    clause, params = _series_filter(metric, host)
+    table = _RESOLUTIONS[resolution]
+
+    if table is None:
+        sql = (f"SELECT s.host, s.metric, d.ts, d.value FROM samples d JOIN series s ON s.id = d.series_id "
+               f"WHERE {clause} AND d.ts BETWEEN ? AND ? ORDER BY s.host, s.metric, d.ts")
+        columns = ("host", "metric", "ts", "value")
+    else:
+        sql = (f"SELECT s.host, s.metric, d.bucket, d.sum / d.count, d.min, d.max, d.count "
+               f"FROM {table} d JOIN series s ON s.id = d.series_id "
+               f"WHERE {clause} AND d.bucket BETWEEN ? AND ? ORDER BY s.host, s.metric, d.bucket")
+        columns = ("host", "metric", "ts", "avg", "min", "max", "count")
+
+    conn = connect(config)
+    try:
+        rows = conn.execute(sql, params + list(_time_bounds(resolution, start, end))).fetchall()
+    finally:
+        conn.close()
+
+    return [dict(zip(columns, row)) for row in rows]
+
+
+def aggregate(config: Dict[str, Any], metric: str, start: int, end: int, func: str = "avg",
+              host: Optional[str] = None, resolution: str = "raw") -> Dict[str, Optional[float]]:
+    """Agrega uma métrica no intervalo; retorna um valor por (host, métrica)"""
+    if func not in _AGGREGATES:
+        raise ValueError(f"Agregação inválida: {func}")
+    if resolution not in _RESOLUTIONS:
+        raise ValueError(f"Resolução inválida: {resolution}")
+
+    clause, params = _series_filter(metric, host)
+    table = _RESOLUTIONS[resolution]
+
+    if table is None:
+        expression = f"{func.upper()}(d.value)"
+        sql = (f"SELECT s.host, s.metric, {expression} FROM samples d JOIN series s ON s.id = d.series_id "
+               f"WHERE {clause} AND d.ts BETWEEN ? AND ? GROUP BY s.id")
+    else:
+        # Agregar a partir dos buckets preserva média, mínimo e máximo exatos
+        expression = {
+            "avg": "SUM(d.sum) / SUM(d.count)",
+            "min": "MIN(d.min)",
+            "max": "MAX(d.max)",
+            "sum": "SUM(d.sum)",
+            "count": "SUM(d.count)"
+        }[func]
+        sql = (f"SELECT s.host, s.metric, {expression} FROM {table} d JOIN series s ON s.id = d.series_id "
+               f"WHERE {clause} AND d.bucket BETWEEN ? AND ? GROUP BY s.id")
+
+    conn = connect(config)
+    try:
+        rows = conn.execute(sql, params + list(_time_bounds(resolution, start, end))).fetchall()
+    finally:
+        conn.close()
+
+    return {f"{row[0]}:{row[1]}": row[2] for row in rows}
@@ -1,86 +1,173 @@
 """
 Módulo para coleta de logs do sistema
 """
+import json
 import subprocess
+import threading
+from collections import Counter, deque
 from datetime import datetime, timedelta
-from typing import Dict, List, Any
+from typing import Dict, List, Any, Callable, Optional, Tuple
 
+from modules import state
 
-def get_journal_errors(hours: int = 24) -> List[Dict[str, Any]]:
-    """Obtém erros e warnings do journal das últimas N horas"""
-    errors = []
+
+def _format_entry(entry: Dict[str, Any], with_priority: bool) -> Dict[str, Any]:
+    """Converte uma entrada JSON do journal no formato do relatório"""
+    formatted = {
+        "timestamp": entry.get('__REALTIME_TIMESTAMP', ''),
+        "unit": entry.get('_SYSTEMD_UNIT', entry.get('SYSLOG_IDENTIFIER', 'unknown')),
+        "message": str(entry.get('MESSAGE', ''))[:200]  # Limitar tamanho da mensagem
+    }
+    if with_priority:
+        formatted["priority"] = entry.get('PRIORITY', '')
+    return formatted
+
+
+def _stream_command(cmd: List[str], timeout: float, on_line: Callable[[str], None]) -> Tuple[int, bool]:
+    """Executa um comando processando a saída linha a linha, sem acumulá-la em memória.
+    
+    Retorna (código de saída, se o tempo limite foi atingido).
+    """
+    proc = subprocess.Popen(
+        cmd,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.DEVNULL,
+        text=True,
+        errors='replace'
+    )
+    timed_out = threading.Event()
+    
+    def _kill():
+        timed_out.set()
+        proc.kill()
     
+    timer = threading.Timer(timeout, _kill)
+    timer.start()
     try:
-        # Calcular timestamp de início
+        for line in proc.stdout:
+            on_line(line)
+        # Fim da saída não significa processo encerrado: esperar o código de saída real
+        # (o timer continua valendo caso ele não termine)
+        proc.wait()
+    finally:
+        timer.cancel()
+        if proc.poll() is None:
+            proc.kill()
+        proc.stdout.close()
+        proc.wait()
+    
+    return proc.returncode, timed_out.is_set()
+
+
+def read_journal(hours: int = 24, cursor: Optional[str] = None,
+                 max_errors: int = 50, max_warnings: int = 30) -> Dict[str, Any]:
+    """Lê erros (prioridade 0-3) e warnings (4) do journal em uma única passagem.
+    
+    Com cursor, lê apenas as entradas posteriores a ele; sem cursor, as das últimas N horas.
+    Apenas as entradas mais recentes são mantidas, mas as contagens cobrem todas as lidas.
+    """
+    errors = deque(maxlen=max_errors)
+    warnings = deque(maxlen=max_warnings)
+    by_priority = Counter()
+    by_unit = Counter()
+    last_cursor = [cursor]
+    
+    cmd = ['journalctl', '-p', '0..4', '--no-pager', '-o', 'json']
+    if cursor:
+        cmd += ['--after-cursor', cursor]
+    else:
         since_time = datetime.now() - timedelta(hours=hours)
-        since_str = since_time.strftime('%Y-%m-%d %H:%M:%S')
+        cmd += ['--since', since_time.strftime('%Y-%m-%d %H:%M:%S')]
+    
+    def _process(line: str):
+        try:
+            entry = json.loads(line)
+            priority = int(entry.get('PRIORITY', 6))
+        except (json.JSONDecodeError, TypeError, ValueError, AttributeError):
+            return
         
-        # Buscar por mensagens de erro e críticas
-        result = subprocess.run(
-            ['journalctl', '-p', 'err', '--since', since_str, '--no-pager', '-o', 'json'],
-            capture_output=True,
-            text=True,
-            timeout=30
-        )
+        last_cursor[0] = entry.get('__CURSOR', last_cursor[0])
+        if priority > 4:
+            return
         
-        if result.returncode == 0 and result.stdout.strip():
-            import json
-            for line in result.stdout.strip().split('\n'):
-                try:
-                    entry = json.loads(line)
-                    errors.append({
-                        "timestamp": entry.get('__REALTIME_TIMESTAMP', ''),
-                        "priority": entry.get('PRIORITY', ''),
-                        "unit": entry.get('_SYSTEMD_UNIT', entry.get('SYSLOG_IDENTIFIER', 'unknown')),
-                        "message": entry.get('MESSAGE', '')[:200]  # Limitar tamanho da mensagem
-                    })
-                except json.JSONDecodeError:
-                    continue
-            
-            # Limitar a 50 entradas mais recentes
-            errors = errors[-50:]
+        formatted = _format_entry(entry, with_priority=priority <= 3)
+        by_priority[str(priority)] += 1
+        by_unit[formatted["unit"]] += 1
+        
+        if priority <= 3:
+            errors.append(formatted)
+        else:
+            warnings.append(formatted)
+    
+    returncode, timed_out = _stream_command(cmd, 30, _process)
+    
+    if returncode != 0 and cursor and not timed_out and not by_priority:
+        # Cursor inválido (journal rotacionado): voltar à janela de tempo
+        return read_journal(hours, None, max_errors, max_warnings)
+    
+    return {
+        "errors": list(errors),
+        "warnings": list(warnings),
+        "cursor": last_cursor[0],
+        "counts": {
+            "errors_total": sum(n for p, n in by_priority.items() if int(p) <= 3),
+            "warnings_total": by_priority.get("4", 0),
+            "by_priority": dict(sorted(by_priority.items())),
+            "by_unit": dict(by_unit.most_common(20)),
+            "units_total": len(by_unit),
+            "truncated": timed_out
+        }
+    }
+
+
+def get_journal_errors(hours: int = 24) -> List[Dict[str, Any]]:
+    """Obtém erros do journal das últimas N horas"""
+    try:
+        return read_journal(hours)["errors"]
     except FileNotFoundError:
-        errors.append({"error": "journalctl não encontrado"})
+        return [{"error": "journalctl não encontrado"}]
     except Exception as e:
-        errors.append({"error": f"Erro ao coletar logs: {str(e)}"})
-    
-    return errors
+        return [{"error": f"Erro ao coletar logs: {str(e)}"}]
 
 
 def get_journal_warnings(hours: int = 24) -> List[Dict[str, Any]]:
     """Obtém warnings do journal das últimas N horas"""
-    warnings = []
+    try:
+        return read_journal(hours)["warnings"]
+    except Exception as e:
+        return [{"error": f"Erro ao coletar warnings: {str(e)}"}]
+
+
+def get_journal_entries(config: Dict[str, Any], hours: int, incremental: bool) -> Dict[str, Any]:
+    """Obtém erros e warnings do journal, opcionalmente a partir do último cursor salvo"""
+    monitoring = config.get("monitoring", {})
+    journal_state = state.load_state(config, "journal") if incremental else {}
+    cursor = journal_state.get("cursor")
     
     try:
-        since_time = datetime.now() - timedelta(hours=hours)
-        since_str = since_time.strftime('%Y-%m-%d %H:%M:%S')
-        
-        result = subprocess.run(
-            ['journalctl', '-p', 'warning', '--since', since_str, '--no-pager', '-o', 'json'],
-            capture_output=True,
-            text=True,
-            timeout=30
+        journal = read_journal(
+            hours,
+            cursor,
+            monitoring.get("journal_max_errors", 50),
+            monitoring.get("journal_max_warnings", 30)
         )
-        
-        if result.returncode == 0 and result.stdout.strip():
-            import json
-            for line in result.stdout.strip().split('\n'):
-                try:
-                    entry = json.loads(line)
-                    warnings.append({
-                        "timestamp": entry.get('__REALTIME_TIMESTAMP', ''),
-                        "unit": entry.get('_SYSTEMD_UNIT', entry.get('SYSLOG_IDENTIFIER', 'unknown')),
-                        "message": entry.get('MESSAGE', '')[:200]
-                    })
-                except json.JSONDecodeError:
-                    continue
-            
-            # Limitar a 30 entradas mais recentes
-            warnings = warnings[-30:]
+    except FileNotFoundError:
+        return {"errors": [{"error": "journalctl não encontrado"}], "warnings": []}
     except Exception as e:
-        warnings.append({"error": f"Erro ao coletar warnings: {str(e)}"})
+        return {
+            "errors": [{"error": f"Erro ao coletar logs: {str(e)}"}],
+            "warnings": [{"error": f"Erro ao coletar warnings: {str(e)}"}]
+        }
+    
+    if incremental and journal["cursor"]:
+        state.save_state(config, "journal", {"cursor": journal["cursor"]})
     
-    return warnings
+    return {
+        "errors": journal["errors"],
+        "warnings": journal["warnings"],
+        "counts": journal["counts"],
+        "mode": "incremental" if cursor else "window"
+    }
 
 
 def get_boot_messages() -> List[str]:
@@ -108,17 +195,21 @@ def get_kernel_messages() -> List[str]:
     messages = []
     
     try:
-        result = subprocess.run(
+        # Manter apenas as últimas 20 linhas
+        lines = deque(maxlen=20)
+        
+        def _keep(line: str):
+            if line.strip():
+                lines.append(line.rstrip('\n'))
+        
+        returncode, _ = _stream_command(
             ['dmesg', '-T', '-l', 'err,warn', '--color=never'],
-            capture_output=True,
-            text=True,
-            timeout=10
+            10,
+            _keep
         )
         
-        if result.returncode == 0 and result.stdout.strip():
-            lines = result.stdout.strip().split('\n')
-            # Pegar apenas as últimas 20 linhas
-            messages = lines[-20:]
+        if returncode == 0:
+            messages = list(lines)
     except FileNotFoundError:
         messages.append("dmesg não encontrado ou sem permissão")
     except Exception as e:
@@ -133,13 +224,18 @@ def collect_log_metrics(config: Dict[str, Any]) -> Dict[str, Any]:
     
     if config.get("monitoring", {}).get("check_journal_errors", True):
         hours = config.get("monitoring", {}).get("journal_errors_hours", 24)
+        incremental = config.get("monitoring", {}).get("journal_incremental", False)
+        journal = get_journal_entries(config, hours, incremental)
         
         metrics = {
-            "errors": get_journal_errors(hours),
-            "warnings": get_journal_warnings(hours),
+            "errors": journal["errors"],
+            "warnings": journal["warnings"],
             "boot_errors": get_boot_messages(),
             "kernel_messages": get_kernel_messages(),
             "collection_period_hours": hours
         }
+        if "mode" in journal:
+            metrics["journal_mode"] = journal["mode"]
+            metrics["journal_counts"] = journal["counts"]
     
     return metrics
@@ -2,7 +2,9 @@
 Módulo para monitoramento de memória
 """
 import psutil
-from typing import Dict, Any
+from typing import Dict, Any, Optional
+
+from modules import rates
 
 
 def get_memory_info() -> Dict[str, Any]:
@@ -21,11 +23,11 @@ def get_memory_info() -> Dict[str, Any]:
     }
 
 
-def get_swap_info() -> Dict[str, Any]:
-    """Obtém informações sobre uso de swap"""
+def get_swap_info(config: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """Obtém informações sobre uso de swap (com `config`, inclui as taxas de swap-in/out)"""
     swap = psutil.swap_memory()
     
-    return {
+    info = {
         "total_gb": round(swap.total / (1024**3), 2),
         "used_gb": round(swap.used / (1024**3), 2),
         "free_gb": round(swap.free / (1024**3), 2),
@@ -33,11 +35,22 @@ def get_swap_info() -> Dict[str, Any]:
         "swap_in_gb": round(swap.sin / (1024**3), 2) if hasattr(swap, 'sin') else 0,
         "swap_out_gb": round(swap.sout / (1024**3), 2) if hasattr(swap, 'sout') else 0
     }
+    
+    if config is not None and hasattr(swap, 'sin'):
+        per_instance, sampling = rates.compute_rates(config, "swap", {"swap": {"sin": swap.sin, "sout": swap.sout}})
+        values = per_instance["swap"]
+        info["rates"] = {
+            "swap_in_mb_per_sec": round(values["sin"] / (1024**2), 3) if values["sin"] is not None else None,
+            "swap_out_mb_per_sec": round(values["sout"] / (1024**2), 3) if values["sout"] is not None else None,
+            **sampling
+        }
+    
+    return info
 
 
 def collect_memory_metrics(config: Dict[str, Any]) -> Dict[str, Any]:
     """Coleta todas as métricas de memória"""
     return {
         "ram": get_memory_info(),
-        "swap": get_swap_info()
+        "swap": get_swap_info(config)
     }
@@ -1,14 +1,64 @@
 """
 Módulo para monitoramento de rede
 """
+import asyncio
 import psutil
-import subprocess
-import socket
-from typing import Dict, List, Any
+import random
+import struct
+import time
+from typing import Dict, List, Any, Optional, Tuple
 
+from modules import rates
 
-def get_network_interfaces() -> List[Dict[str, Any]]:
-    """Obtém informações sobre interfaces de rede"""
+
+# Contadores de /proc/net/dev convertidos em taxas: (campo do psutil, nome da taxa)
+_RATE_COUNTERS = (
+    ("bytes_sent", "bytes_sent_per_sec"),
+    ("bytes_recv", "bytes_recv_per_sec"),
+    ("packets_sent", "packets_sent_per_sec"),
+    ("packets_recv", "packets_recv_per_sec"),
+    ("errin", "errors_in_per_sec"),
+    ("errout", "errors_out_per_sec"),
+    ("dropin", "drops_in_per_sec"),
+    ("dropout", "drops_out_per_sec")
+)
+
+
+def _ifindex(interface_name: str) -> Optional[int]:
+    """Índice da interface no kernel (muda quando a interface é recriada)"""
+    try:
+        with open(f"/sys/class/net/{interface_name}/ifindex", 'r') as f:
+            return int(f.read())
+    except (OSError, ValueError):
+        return None
+
+
+def get_interface_rates(config: Dict[str, Any], net_io: Dict[str, Any]) -> Tuple[Dict[str, Dict[str, Any]], Dict[str, Any]]:
+    """Taxas por segundo de cada interface (throughput, pacotes, erros, descartes)"""
+    counters = {
+        name: {field: getattr(io, field) for field, _ in _RATE_COUNTERS}
+        for name, io in net_io.items()
+    }
+    identities = {name: _ifindex(name) for name in net_io}
+    per_instance, sampling = rates.compute_rates(config, "network", counters, identities)
+
+    interface_rates = {}
+    for name, values in per_instance.items():
+        entry = {rate: values[field] for field, rate in _RATE_COUNTERS}
+        if entry["errors_in_per_sec"] is not None and entry["errors_out_per_sec"] is not None:
+            entry["errors_per_sec"] = entry["errors_in_per_sec"] + entry["errors_out_per_sec"]
+        else:
+            entry["errors_per_sec"] = None
+        interface_rates[name] = {k: (round(v, 2) if v is not None else None) for k, v in entry.items()}
+    return interface_rates, sampling
+
+
+def get_network_interfaces(config: Optional[Dict[str, Any]] = None,
+                           sampling: Optional[Dict[str, Any]] = None) -> List[Dict[str, Any]]:
+    """Obtém informações sobre interfaces de rede.
+    
+    Com `config`, inclui as taxas por segundo; `sampling` recebe os dados da amostragem.
+    """
     interfaces = []
     
     # Estatísticas de rede
@@ -17,6 +67,12 @@ def get_network_interfaces() -> List[Dict[str, Any]]:
     net_addrs = psutil.net_if_addrs()
     # Status das interfaces
     net_stats = psutil.net_if_stats()
+    # Taxas calculadas sobre a mesma leitura dos contadores
+    interface_rates = {}
+    if config is not None:
+        interface_rates, rate_sampling = get_interface_rates(config, net_io)
+        if sampling is not None:
+            sampling.update(rate_sampling)
     
     for interface_name, stats in net_stats.items():
         interface_info = {
@@ -52,6 +108,8 @@ def get_network_interfaces() -> List[Dict[str, Any]]:
                 "drops_in": io.dropin,
                 "drops_out": io.dropout
             }
+        if interface_name in interface_rates:
+            interface_info["rates"] = interface_rates[interface_name]
         
         interfaces.append(interface_info)
     
@@ -88,87 +146,289 @@ def get_network_connections() -> Dict[str, Any]:
     return connections
 
 
-def check_connectivity(hosts: List[str]) -> List[Dict[str, Any]]:
-    """Verifica conectividade com hosts específicos"""
-    results = []
+def _parse_target(target: str) -> Tuple[str, Optional[int]]:
+    """Separa host e porta de um alvo ('host', 'host:porta' ou '[ipv6]:porta')"""
+    if target.startswith('['):
+        host, _, rest = target[1:].partition(']')
+        port = rest.lstrip(':')
+        return host, int(port) if port else None
     
-    for host in hosts:
-        result = {
-            "host": host,
-            "reachable": False,
-            "latency_ms": None
-        }
-        
-        try:
-            # Usar ping para verificar conectividade
-            ping_result = subprocess.run(
-                ['ping', '-c', '1', '-W', '2', host],
-                capture_output=True,
-                text=True,
-                timeout=5
-            )
-            
-            if ping_result.returncode == 0:
-                result["reachable"] = True
-                
-                # Extrair latência
-                output = ping_result.stdout
-                for line in output.split('\n'):
-                    if 'time=' in line:
-                        try:
-                            time_part = line.split('time=')[1].split()[0]
-                            result["latency_ms"] = round(float(time_part), 2)
-                        except (IndexError, ValueError):
-                            pass
-                        break
-        except Exception as e:
-            result["error"] = str(e)
-        
-        results.append(result)
+    # Endereço IPv6 sem colchetes não possui porta
+    if target.count(':') == 1:
+        host, port = target.split(':')
+        return host, int(port)
+    
+    return target, None
+
+
+def _latency_summary(result: Dict[str, Any], latencies: List[float], sent: int) -> Dict[str, Any]:
+    """Preenche latência mínima/média/máxima e perda a partir das respostas obtidas"""
+    result["probes"] = sent
+    result["loss_percent"] = round((sent - len(latencies)) / sent * 100, 1) if sent else 100.0
+    
+    if latencies:
+        avg = sum(latencies) / len(latencies)
+        result["reachable"] = True
+        result["latency_ms"] = round(avg, 2)
+        result["latency_min_ms"] = round(min(latencies), 2)
+        result["latency_avg_ms"] = round(avg, 2)
+        result["latency_max_ms"] = round(max(latencies), 2)
+    
+    return result
+
+
+async def _tcp_connect(host: str, port: int, timeout: float) -> Optional[float]:
+    """Mede o tempo de um TCP connect; retorna None se falhar"""
+    start = time.perf_counter()
+    try:
+        _, writer = await asyncio.wait_for(asyncio.open_connection(host, port), timeout)
+    except (OSError, asyncio.TimeoutError):
+        return None
+    
+    latency = (time.perf_counter() - start) * 1000
+    writer.close()
+    try:
+        await writer.wait_closed()
+    except OSError:
+        pass
+    return latency
+
+
+async def _probe_tcp(host: str, port: int, count: int, timeout: float) -> Dict[str, Any]:
+    """Executa N probes de TCP connect simultâneos"""
+    result = {"host": host, "port": port, "method": "tcp", "reachable": False, "latency_ms": None}
+    latencies = await asyncio.gather(*(_tcp_connect(host, port, timeout) for _ in range(count)))
+    return _latency_summary(result, [l for l in latencies if l is not None], count)
+
+
+async def _probe_icmp(host: str, count: int, timeout: float) -> Dict[str, Any]:
+    """Executa N pings ICMP em um único processo ping"""
+    result = {"host": host, "method": "icmp", "reachable": False, "latency_ms": None}
+    
+    try:
+        proc = await asyncio.create_subprocess_exec(
+            'ping', '-n', '-c', str(count), '-i', '0.2', '-W', str(max(int(timeout), 1)), host,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.DEVNULL
+        )
+    except FileNotFoundError:
+        result["error"] = "ping não encontrado"
+        return result
+    
+    # Prazo do host: intervalo entre pings + timeout da última resposta
+    deadline = (count - 1) * 0.2 + timeout + 1
+    try:
+        stdout, _ = await asyncio.wait_for(proc.communicate(), deadline)
+    except asyncio.TimeoutError:
+        proc.kill()
+        await proc.wait()
+        result["error"] = f"Tempo limite de {deadline:.1f}s excedido"
+        return _latency_summary(result, [], count)
+    
+    latencies = []
+    for line in stdout.decode(errors='replace').split('\n'):
+        if 'time=' in line:
+            try:
+                latencies.append(float(line.split('time=')[1].split()[0]))
+            except (IndexError, ValueError):
+                pass
+    
+    return _latency_summary(result, latencies, count)
+
+
+async def _probe_target(target: str, count: int, timeout: float) -> Dict[str, Any]:
+    """Verifica um alvo via TCP (host:porta) ou ICMP (host)"""
+    try:
+        host, port = _parse_target(target)
+    except ValueError:
+        return {"host": target, "reachable": False, "latency_ms": None, "error": "Alvo inválido"}
+    
+    try:
+        if port is not None:
+            result = await _probe_tcp(host, port, count, timeout)
+        else:
+            result = await _probe_icmp(host, count, timeout)
+        result["host"] = target
+        return result
+    except Exception as e:
+        return {"host": target, "reachable": False, "latency_ms": None, "error": str(e)}
+
+
+async def _probe_all(targets: List[str], count: int, timeout: float) -> List[Dict[str, Any]]:
+    """Verifica todos os alvos ao mesmo tempo"""
+    return list(await asyncio.gather(*(_probe_target(t, count, timeout) for t in targets)))
+
+
+def check_connectivity(hosts: List[str], count: int = 1, timeout: float = 2) -> List[Dict[str, Any]]:
+    """Verifica conectividade com hosts específicos.
+    
+    Todos os hosts são verificados simultaneamente; entradas no formato 'host:porta'
+    usam TCP connect, as demais usam ICMP (ping).
+    """
+    return asyncio.run(_probe_all(hosts, max(int(count), 1), timeout))
+
+
+def _build_dns_query(name: str, query_id: int) -> bytes:
+    """Monta uma consulta DNS do tipo A com recursão"""
+    header = struct.pack('!HHHHHH', query_id, 0x0100, 1, 0, 0, 0)
+    labels = name.strip('.').encode('idna').split(b'.')
+    qname = b''.join(bytes([len(label)]) + label for label in labels) + b'\x00'
+    return header + qname + struct.pack('!HH', 1, 1)
+
+
+class _DNSClientProtocol(asyncio.DatagramProtocol):
+    """Recebe a resposta de uma única consulta DNS via UDP"""
+    
+    def __init__(self, query_id: int):
+        self.query_id = query_id
+        self.response = asyncio.get_running_loop().create_future()
+    
+    def datagram_received(self, data: bytes, addr):
+        # Ignorar respostas de outras consultas
+        if len(data) >= 12 and struct.unpack('!H', data[:2])[0] == self.query_id and not self.response.done():
+            self.response.set_result(data)
+    
+    def error_received(self, exc: Exception):
+        if not self.response.done():
+            self.response.set_exception(exc)
+
+
+async def _query_nameserver(nameserver: str, name: str, timeout: float, port: int = 53) -> Dict[str, Any]:
+    """Consulta um nome diretamente em um nameserver, com tempo limite"""
+    result = {"nameserver": nameserver, "name": name, "resolved": False, "latency_ms": None}
+    query_id = random.randint(0, 0xFFFF)
+    loop = asyncio.get_running_loop()
+    transport = None
+    
+    start = time.perf_counter()
+    try:
+        transport, protocol = await loop.create_datagram_endpoint(
+            lambda: _DNSClientProtocol(query_id),
+            remote_addr=(nameserver, port)
+        )
+        transport.sendto(_build_dns_query(name, query_id))
+        data = await asyncio.wait_for(protocol.response, timeout)
+    except asyncio.TimeoutError:
+        result["error"] = f"Sem resposta em {timeout}s"
+        return result
+    except (OSError, UnicodeError) as e:
+        result["error"] = str(e)
+        return result
+    finally:
+        if transport is not None:
+            transport.close()
     
-    return results
+    result["latency_ms"] = round((time.perf_counter() - start) * 1000, 2)
+    flags, _, answers = struct.unpack('!HHH', data[2:8])
+    result["rcode"] = flags & 0x000F
+    result["answers"] = answers
+    result["resolved"] = result["rcode"] == 0 and answers > 0
+    return result
+
+
+async def _query_all(nameservers: List[str], names: List[str], timeout: float, port: int) -> List[Dict[str, Any]]:
+    """Consulta todos os nomes em todos os nameservers ao mesmo tempo"""
+    return list(await asyncio.gather(*(
+        _query_nameserver(ns, name, timeout, port) for ns in nameservers for name in names
+    )))
+
+
+def _read_nameservers() -> List[str]:
+    """Lê os nameservers de /etc/resolv.conf"""
+    nameservers = []
+    with open('/etc/resolv.conf', 'r') as f:
+        for line in f:
+            parts = line.strip().split()
+            if len(parts) >= 2 and parts[0] == 'nameserver':
+                nameservers.append(parts[1])
+    return nameservers
 
 
-def get_dns_info() -> Dict[str, Any]:
-    """Obtém informações sobre configuração DNS"""
+async def _check_dns(names: Optional[List[str]] = None, timeout: float = 2,
+                     nameservers: Optional[List[str]] = None, port: int = 53) -> Dict[str, Any]:
+    """Lê a configuração DNS e consulta cada nameserver no laço de eventos em execução"""
+    names = names or ['google.com']
     dns_info = {
         "nameservers": [],
         "can_resolve": False
     }
     
-    try:
-        # Ler /etc/resolv.conf
-        with open('/etc/resolv.conf', 'r') as f:
-            for line in f:
-                line = line.strip()
-                if line.startswith('nameserver'):
-                    parts = line.split()
-                    if len(parts) >= 2:
-                        dns_info["nameservers"].append(parts[1])
-    except Exception as e:
-        dns_info["error"] = f"Erro ao ler resolv.conf: {str(e)}"
+    if nameservers is None:
+        try:
+            nameservers = _read_nameservers()
+        except Exception as e:
+            dns_info["error"] = f"Erro ao ler resolv.conf: {str(e)}"
+            return dns_info
+    dns_info["nameservers"] = nameservers
     
-    # Testar resolução DNS
-    try:
-        socket.gethostbyname('google.com')
-        dns_info["can_resolve"] = True
-    except Exception:
-        dns_info["can_resolve"] = False
+    if not nameservers:
+        dns_info["error"] = "Nenhum nameserver configurado"
+        return dns_info
+    
+    queries = await _query_all(nameservers, names, timeout, port)
+    dns_info["queries"] = queries
+    
+    # Latência e sucesso por nameserver
+    per_nameserver = []
+    for ns in nameservers:
+        ns_queries = [q for q in queries if q["nameserver"] == ns]
+        latencies = [q["latency_ms"] for q in ns_queries if q["latency_ms"] is not None]
+        per_nameserver.append({
+            "nameserver": ns,
+            "responding": bool(latencies),
+            "resolved": sum(1 for q in ns_queries if q["resolved"]),
+            "failed": sum(1 for q in ns_queries if not q["resolved"]),
+            "latency_avg_ms": round(sum(latencies) / len(latencies), 2) if latencies else None
+        })
+    dns_info["per_nameserver"] = per_nameserver
+    
+    # Resolução funciona se cada nome foi resolvido por ao menos um nameserver
+    dns_info["can_resolve"] = all(
+        any(q["resolved"] for q in queries if q["name"] == name) for name in names
+    )
     
     return dns_info
 
 
+def get_dns_info(names: Optional[List[str]] = None, timeout: float = 2,
+                 nameservers: Optional[List[str]] = None, port: int = 53) -> Dict[str, Any]:
+    """Obtém informações sobre configuração DNS e testa cada nameserver diretamente via UDP"""
+    return asyncio.run(_check_dns(names, timeout, nameservers, port))
+
+
+async def _run_probes(monitoring: Dict[str, Any]) -> Tuple[Dict[str, Any], Optional[List[Dict[str, Any]]]]:
+    """Executa as consultas DNS e os probes de conectividade ao mesmo tempo, em um único laço"""
+    dns = _check_dns(
+        monitoring.get("dns_check_names", ["google.com"]),
+        monitoring.get("dns_timeout", 2)
+    )
+    
+    hosts = monitoring.get("network_check_hosts", [])
+    if not hosts:
+        return await dns, None
+    
+    connectivity = _probe_all(
+        hosts,
+        max(int(monitoring.get("network_probe_count", 3)), 1),
+        monitoring.get("network_probe_timeout", 2)
+    )
+    dns_info, results = await asyncio.gather(dns, connectivity)
+    return dns_info, results
+
+
 def collect_network_metrics(config: Dict[str, Any]) -> Dict[str, Any]:
     """Coleta todas as métricas de rede"""
+    rate_sampling = {}
     metrics = {
-        "interfaces": get_network_interfaces(),
-        "connections": get_network_connections(),
-        "dns": get_dns_info()
+        "interfaces": get_network_interfaces(config, rate_sampling),
+        "rates": rate_sampling,
+        "connections": get_network_connections()
     }
     
-    # Verificar conectividade se configurado
-    hosts = config.get("monitoring", {}).get("network_check_hosts", [])
-    if hosts:
-        metrics["connectivity"] = check_connectivity(hosts)
+    # DNS e conectividade (se configurada) compartilham o mesmo asyncio.run: o tempo
+    # da coleta é o do probe mais lento, não a soma dos dois
+    metrics["dns"], connectivity = asyncio.run(_run_probes(config.get("monitoring", {})))
+    if connectivity is not None:
+        metrics["connectivity"] = connectivity
     
     return metrics
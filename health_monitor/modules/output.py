@@ -0,0 +1,129 @@
+"""
+Módulo para serialização e gravação dos relatórios nos formatos de saída suportados
+"""
+import gzip
+import json
+import os
+import tempfile
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Any, Optional
+
+
+# Formato -> extensão do arquivo
+FORMATS = {
+    "json": ".json",
+    "ndjson": ".ndjson",
+    "json.gz": ".json.gz",
+    "json.zst": ".json.zst",
+    "msgpack": ".msgpack"
+}
+
+
+def _compact_json(report: Dict[str, Any]) -> bytes:
+    """Serializa em JSON sem espaços"""
+    return json.dumps(report, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+
+
+def serialize(report: Dict[str, Any], fmt: str) -> bytes:
+    """Serializa o relatório no formato pedido"""
+    if fmt == "json":
+        return json.dumps(report, indent=2, ensure_ascii=False).encode('utf-8')
+
+    if fmt == "ndjson":
+        return _compact_json(report) + b'\n'
+
+    if fmt == "json.gz":
+        return gzip.compress(_compact_json(report), compresslevel=6)
+
+    if fmt == "json.zst":
+        try:
+            import zstandard
+        except ImportError:
+            raise RuntimeError("Formato json.zst requer o pacote zstandard (pip install zstandard)")
+        return zstandard.ZstdCompressor(level=3).compress(_compact_json(report))
+
+    if fmt == "msgpack":
+        try:
+            import msgpack
+        except ImportError:
+            raise RuntimeError("Formato msgpack requer o pacote msgpack (pip install msgpack)")
+        return msgpack.packb(report, use_bin_type=True)
+
+    raise ValueError(f"Formato de saída desconhecido: {fmt} (use {', '.join(FORMATS)})")
+
+
+def write_atomic(path: Path, data: bytes) -> None:
+    """Grava o arquivo inteiro de forma atômica (arquivo temporário + rename)"""
+    fd, tmp_path = tempfile.mkstemp(prefix=f".{path.name}.", suffix=".tmp", dir=str(path.parent))
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except Exception:
+        try:
+            os.unlink(tmp_path)
+        except OSError:
+            pass
+        raise
+
+
+def append_line(path: Path, data: bytes) -> int:
+    """Acrescenta uma linha com uma única escrita O_APPEND; retorna o offset onde ela começa"""
+    fd = os.open(str(path), os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+    try:
+        offset = os.fstat(fd).st_size
+        os.write(fd, data)
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+    return offset
+
+
+# Arquivos do índice mantidos no diretório de saída
+INDEX_FILE = "index.ndjson"
+LATEST_FILE = "latest.json"
+
+
+def update_index(output_dir: Path, filepath: Path, report: Dict[str, Any], offset: Optional[int] = None) -> Dict[str, Any]:
+    """Registra o relatório no manifesto (ordenado por tempo) e atualiza o ponteiro 'latest'"""
+    summary = report.get("summary", {})
+    entry = {
+        "ts": report.get("timestamp_unix"),
+        "timestamp": report.get("timestamp"),
+        "file": filepath.name,
+        "offset": offset,
+        "host": report.get("hostname"),
+        "health_status": summary.get("health_status")
+    }
+    line = json.dumps(entry, ensure_ascii=False, separators=(',', ':')).encode('utf-8') + b'\n'
+
+    append_line(output_dir / INDEX_FILE, line)
+    write_atomic(output_dir / LATEST_FILE, line)
+    return entry
+
+
+def write_report(report: Dict[str, Any], output_dir: Path, fmt: str = "json",
+                 timestamp: Optional[datetime] = None, index: bool = True) -> Path:
+    """Grava o relatório no diretório de saída e retorna o caminho do arquivo"""
+    if fmt not in FORMATS:
+        raise ValueError(f"Formato de saída desconhecido: {fmt} (use {', '.join(FORMATS)})")
+
+    timestamp = timestamp or datetime.now()
+    data = serialize(report, fmt)
+    offset = None
+
+    if fmt == "ndjson":
+        # Um arquivo por dia, uma linha por relatório
+        filepath = output_dir / f"health_{timestamp.strftime('%Y%m%d')}{FORMATS[fmt]}"
+        offset = append_line(filepath, data)
+    else:
+        filepath = output_dir / f"health_{timestamp.strftime('%Y%m%d_%H%M%S')}{FORMATS[fmt]}"
+        write_atomic(filepath, data)
+
+    if index:
+        update_index(output_dir, filepath, report, offset)
+
+    return filepath
@@ -0,0 +1,85 @@
+"""
+Módulo de taxas: converte contadores cumulativos (desde o boot) em taxas por segundo
+"""
+import time
+from typing import Dict, Any, Optional, Tuple
+
+import psutil
+
+from modules import state
+
+
+# Última amostra de cada grupo de contadores mantida em memória (modo daemon)
+_last_samples: Dict[str, Dict[str, Any]] = {}
+
+
+def _boot_time() -> int:
+    try:
+        return int(psutil.boot_time())
+    except Exception:
+        return 0
+
+
+def compute_rates(config: Dict[str, Any], name: str, counters: Dict[str, Dict[str, float]],
+                  identities: Optional[Dict[str, Any]] = None,
+                  now: Optional[float] = None) -> Tuple[Dict[str, Dict[str, Optional[float]]], Dict[str, Any]]:
+    """Calcula a taxa por segundo de cada contador contra a amostra anterior do grupo `name`.
+
+    `counters` mapeia instância -> {contador: valor cumulativo}; `identities` permite
+    detectar instâncias recriadas (ex.: ifindex de uma interface). Contadores que
+    diminuíram, instâncias recriadas e amostras de outro boot não geram taxa (None).
+    A amostra só é gravada em `state/` quando veio do disco (execução pontual ou
+    primeira coleta do daemon).
+    Retorna (taxas por instância, informações da amostragem).
+    """
+    now = time.time() if now is None else now
+    identities = identities or {}
+    boot_time = _boot_time()
+
+    # Com amostra em memória (modo daemon) o estado em disco não é lido nem gravado a cada ciclo
+    previous = _last_samples.get(name)
+    persist = previous is None
+    if persist:
+        previous = state.load_state(config, f"rates_{name}")
+
+    elapsed = now - previous.get("timestamp", now)
+    valid = previous.get("boot_time") == boot_time and elapsed > 0
+    previous_counters = previous.get("counters", {}) if valid else {}
+    previous_identities = previous.get("identities", {}) if valid else {}
+
+    rates = {}
+    resets = 0
+    for instance, values in counters.items():
+        before = previous_counters.get(instance)
+        if before is not None and previous_identities.get(instance) != identities.get(instance):
+            # Mesmo nome, outra instância: os contadores recomeçaram do zero
+            before = None
+            resets += 1
+
+        instance_rates = {}
+        for counter, value in values.items():
+            last = before.get(counter) if before else None
+            if last is None:
+                instance_rates[counter] = None
+            elif value < last:
+                instance_rates[counter] = None
+                resets += 1
+            else:
+                instance_rates[counter] = (value - last) / elapsed
+        rates[instance] = instance_rates
+
+    current = {"timestamp": now, "boot_time": boot_time, "counters": counters, "identities": identities}
+    _last_samples[name] = current
+    if persist:
+        try:
+            state.save_state(config, f"rates_{name}", current)
+        except OSError:
+            pass
+
+    sampling = {
+        "sampling": "delta" if previous_counters else "first_sample",
+        "interval_seconds": round(elapsed, 2) if previous_counters else None
+    }
+    if resets:
+        sampling["counter_resets"] = resets
+    return rates, sampling
@@ -0,0 +1,345 @@
+"""
+Linguagem de regras declarativas: expressões sobre caminhos de métricas compiladas em bytecode
+
+Exemplo: disk.partitions[*].percent_used > 90 and mountpoint != "/boot"
+
+- Caminhos com `[*]` percorrem os itens de uma lista (e `.*` as chaves de um dicionário);
+  a expressão é avaliada uma vez para cada item.
+- Nomes simples (`mountpoint`) são campos do item atual.
+- Caminhos sem `[*]` (`cpu.load_average.normalized_5min`) são valores escalares,
+  resolvidos uma única vez por avaliação.
+"""
+import ast
+import re
+import time
+from functools import lru_cache
+from typing import Dict, List, Any, Iterator, Optional, Tuple
+
+from modules import history
+
+
+_EACH = "__each__"
+_ANY = "__any__"
+
+# Marcadores fora de strings: '[*]' (itens de lista) e '.*' (chaves de dicionário)
+_MARKERS = re.compile(r'("(?:[^"\\]|\\.)*"|\'(?:[^\'\\]|\\.)*\')|\[\*\]|\.\*')
+
+_FUNCTIONS = {"abs": abs, "min": min, "max": max, "len": len, "round": round}
+
+_ALLOWED_NODES = (
+    ast.Expression, ast.BoolOp, ast.And, ast.Or, ast.UnaryOp, ast.Not, ast.USub, ast.UAdd,
+    ast.BinOp, ast.Add, ast.Sub, ast.Mult, ast.Div, ast.FloorDiv, ast.Mod,
+    ast.Compare, ast.Eq, ast.NotEq, ast.Lt, ast.LtE, ast.Gt, ast.GtE, ast.In, ast.NotIn,
+    ast.Constant, ast.Tuple, ast.List, ast.Call, ast.Name, ast.Attribute, ast.Load
+)
+
+# Erros de avaliação que apenas invalidam o item (ex.: campo ausente comparado com número)
+_EVAL_ERRORS = (TypeError, ValueError, ZeroDivisionError, AttributeError, KeyError, IndexError)
+
+
+def parse_source(source: str) -> List[str]:
+    """Divide um caminho de origem em segmentos: nomes, '*' (qualquer chave) e '[*]' (itens de lista)"""
+    tokens = []
+    for part in source.split("."):
+        if part.endswith("[*]"):
+            if part[:-3]:
+                tokens.append(part[:-3])
+            tokens.append("[*]")
+        else:
+            tokens.append(part)
+    return tokens
+
+
+def resolve_source(value: Any, tokens: List[str], instance: str = "") -> Iterator[Tuple[str, Any]]:
+    """Percorre as métricas produzindo (identificador da instância, objeto) para cada casamento"""
+    if not tokens:
+        yield instance, value
+        return
+
+    token, rest = tokens[0], tokens[1:]
+    if token == "[*]":
+        if isinstance(value, list):
+            for index, item in enumerate(value):
+                key = history.item_key(item, index)
+                yield from resolve_source(item, rest, f"{instance}[{key}]" if instance else key)
+    elif token == "*":
+        if isinstance(value, dict):
+            for key, child in value.items():
+                yield from resolve_source(child, rest, f"{instance}.{key}" if instance else str(key))
+    elif isinstance(value, dict) and token in value:
+        yield from resolve_source(value[token], rest, instance)
+
+
+def _lookup(value: Any, path: Tuple[str, ...]) -> Any:
+    """Valor em um caminho de chaves; None se algum nível não existir"""
+    for key in path:
+        if not isinstance(value, dict):
+            return None
+        value = value.get(key)
+    return value
+
+
+def _preprocess(text: str) -> str:
+    """Troca os marcadores de caminho por nomes válidos em Python"""
+    def replace(match):
+        if match.group(1):
+            return match.group(1)
+        return "." + _EACH if match.group(0) == "[*]" else "." + _ANY
+    return _MARKERS.sub(replace, text)
+
+
+def _path_of(node: ast.AST) -> Optional[List[str]]:
+    """Segmentos de um caminho pontuado (Name/Attribute), ou None se não for caminho"""
+    parts = []
+    while isinstance(node, ast.Attribute):
+        parts.append(node.attr)
+        node = node.value
+    if not isinstance(node, ast.Name):
+        return None
+    parts.append(node.id)
+    return parts[::-1]
+
+
+def _source_text(parts: List[str]) -> str:
+    text = ""
+    for part in parts:
+        if part == _EACH:
+            text += "[*]"
+        else:
+            text += ("." if text else "") + ("*" if part == _ANY else part)
+    return text
+
+
+class _Compiler(ast.NodeTransformer):
+    """Valida a árvore e reescreve caminhos em acessos ao item (e) e aos escalares (s)"""
+
+    def __init__(self, source: Optional[str]):
+        self.source = source
+        self.scalar_paths: List[Tuple[str, ...]] = []
+        self.fields: List[Tuple[str, ...]] = []
+        self.roots: List[str] = []
+
+    def generic_visit(self, node):
+        if not isinstance(node, _ALLOWED_NODES):
+            raise ValueError(f"Construção não permitida em regra: {type(node).__name__}")
+        return super().generic_visit(node)
+
+    def visit_Constant(self, node):
+        if not isinstance(node.value, (str, int, float, bool, type(None))):
+            raise ValueError(f"Constante não permitida em regra: {node.value!r}")
+        return node
+
+    def visit_Call(self, node):
+        if not isinstance(node.func, ast.Name) or node.func.id not in _FUNCTIONS or node.keywords:
+            raise ValueError("Apenas as funções abs, min, max, len e round são permitidas")
+        node.args = [self.visit(arg) for arg in node.args]
+        return node
+
+    def visit_Name(self, node):
+        if node.id in ("True", "False", "None"):
+            return ast.Constant(value={"True": True, "False": False, "None": None}[node.id])
+        return self._path(node)
+
+    def visit_Attribute(self, node):
+        return self._path(node)
+
+    def _path(self, node):
+        parts = _path_of(node)
+        if parts is None:
+            raise ValueError("Acesso a atributo só é permitido em caminhos de métricas")
+        if any(part.startswith("_") and part not in (_EACH, _ANY) for part in parts):
+            raise ValueError(f"Nome não permitido em regra: {'.'.join(parts)}")
+
+        marks = [i for i, part in enumerate(parts) if part in (_EACH, _ANY)]
+        if marks:
+            # Caminho iterado: prefixo até o último marcador é a origem, o resto é campo do item
+            last = marks[-1] + 1
+            source = _source_text(parts[:last])
+            if self.source is None:
+                self.source = source
+            elif self.source != source:
+                raise ValueError(f"Regra com mais de uma origem iterada: {self.source} e {source}")
+            self._root(parts[0])
+            return self._field(tuple(parts[last:]))
+
+        if len(parts) == 1:
+            return self._field((parts[0],))
+
+        # Caminho absoluto: escalar resolvido uma vez por avaliação
+        path = tuple(parts)
+        self._root(parts[0])
+        if path not in self.scalar_paths:
+            self.scalar_paths.append(path)
+        index = self.scalar_paths.index(path)
+        return ast.Subscript(value=ast.Name(id="s", ctx=ast.Load()),
+                             slice=ast.Constant(value=index), ctx=ast.Load())
+
+    def _root(self, root: str):
+        if root not in self.roots:
+            self.roots.append(root)
+
+    def _field(self, path: Tuple[str, ...]):
+        if path not in self.fields:
+            self.fields.append(path)
+        element = ast.Name(id="e", ctx=ast.Load())
+        if not path:
+            return element
+        if len(path) == 1:
+            # e.get('campo'): o caso comum, sem chamada auxiliar
+            return ast.Call(func=ast.Attribute(value=element, attr="get", ctx=ast.Load()),
+                            args=[ast.Constant(value=path[0])], keywords=[])
+        return ast.Call(func=ast.Name(id="_lookup", ctx=ast.Load()),
+                        args=[element, ast.Constant(value=path)], keywords=[])
+
+
+class CompiledExpression:
+    """Expressão de regra compilada em uma função Python (e, s) -> valor"""
+
+    def __init__(self, text: str, source: Optional[str] = None):
+        self.text = text
+        try:
+            tree = ast.parse(_preprocess(text).strip(), mode="eval")
+        except SyntaxError as e:
+            raise ValueError(f"Expressão de regra inválida: {text!r} ({e.msg})")
+
+        compiler = _Compiler(source)
+        body = compiler.visit(tree).body
+        if compiler.fields and compiler.source is None:
+            raise ValueError(f"Campos sem origem iterada (use caminho com [*]): {text!r}")
+
+        self.source = compiler.source
+        self.tokens = parse_source(self.source) if self.source else []
+        self.scalar_paths = compiler.scalar_paths
+        self.fields = compiler.fields
+        self.roots = compiler.roots
+
+        function = ast.Expression(body=ast.Lambda(
+            args=ast.arguments(posonlyargs=[], args=[ast.arg(arg="e"), ast.arg(arg="s")],
+                               kwonlyargs=[], kw_defaults=[], defaults=[]),
+            body=body))
+        code = compile(ast.fix_missing_locations(function), f"<regra {text}>", "eval")
+        namespace = dict(_FUNCTIONS, _lookup=_lookup, __builtins__={})
+        self.function = eval(code, namespace)
+
+    def scalars(self, metrics: Dict[str, Any]) -> Tuple[Any, ...]:
+        """Resolve os caminhos absolutos da expressão (uma vez por avaliação)"""
+        return tuple(_lookup(metrics, path) for path in self.scalar_paths)
+
+    def compute(self, element: Any, scalars: Tuple[Any, ...]) -> Any:
+        """Valor da expressão para um item; None se a avaliação falhar"""
+        try:
+            return self.function(element, scalars)
+        except _EVAL_ERRORS:
+            return None
+
+    def matches(self, element: Any, scalars: Tuple[Any, ...]) -> bool:
+        """A condição vale para o item? Campos ausentes ou de tipo incompatível não casam"""
+        try:
+            return bool(self.function(element, scalars))
+        except _EVAL_ERRORS:
+            return False
+
+    def elements(self, metrics: Dict[str, Any]) -> Iterator[Tuple[str, Any]]:
+        """Itens percorridos pela expressão; sem origem iterada, um único item vazio"""
+        if self.tokens:
+            return resolve_source(metrics, self.tokens)
+        return iter([("", None)])
+
+    def evaluate(self, metrics: Dict[str, Any]) -> List[Tuple[str, Any]]:
+        """Avalia a expressão sobre todos os itens, retornando (instância, item) dos que casam.
+        
+        O último nível iterado é percorrido diretamente, e o identificador da instância
+        só é montado para os itens que casam.
+        """
+        scalars = self.scalars(metrics)
+        function = self.function
+        matched = []
+
+        if not self.tokens:
+            try:
+                if function(None, scalars):
+                    matched.append(("", None))
+            except _EVAL_ERRORS:
+                pass
+            return matched
+
+        last = self.tokens[-1]
+        for prefix, container in resolve_source(metrics, self.tokens[:-1]):
+            if last == "[*]" and isinstance(container, list):
+                items = enumerate(container)
+            elif last == "*" and isinstance(container, dict):
+                items = container.items()
+            else:
+                continue
+            for key, element in items:
+                try:
+                    if not function(element, scalars):
+                        continue
+                except _EVAL_ERRORS:
+                    continue
+                if last == "[*]":
+                    key = history.item_key(element, key)
+                    matched.append((f"{prefix}[{key}]" if prefix else key, element))
+                else:
+                    matched.append((f"{prefix}.{key}" if prefix else str(key), element))
+        return matched
+
+
+@lru_cache(maxsize=256)
+def compile_expression(text: str, source: Optional[str] = None) -> CompiledExpression:
+    """Compila a expressão (uma única vez por texto e origem)"""
+    return CompiledExpression(text, source)
+
+
+def _benchmark_metrics(partitions: int, interfaces: int) -> Dict[str, Any]:
+    return {
+        "disk": {"partitions": [
+            {"mountpoint": "/" if i == 0 else f"/mnt/d{i}", "percent_used": 50 + (i * 7) % 50}
+            for i in range(partitions)
+        ]},
+        "network": {"interfaces": [
+            {"interface": f"eth{i}", "errors_in": i * 3, "errors_out": 0, "is_up": True}
+            for i in range(interfaces)
+        ]},
+        "cpu": {"load_average": {"normalized_5min": 1.5}}
+    }
+
+
+def benchmark(samples: int = 20000) -> None:
+    """Mede o custo de compilação e de avaliação por amostra e por item"""
+    from modules import alerts
+
+    expressions = [
+        'disk.partitions[*].percent_used > 90 and mountpoint != "/boot"',
+        'network.interfaces[*].errors_in + errors_out > 100 and is_up',
+        'cpu.load_average.normalized_5min > 2 or cpu.load_average.normalized_5min < 0'
+    ]
+
+    print("⏱️  Custo de avaliação das regras declarativas")
+    for count in (4, 32):
+        metrics = _benchmark_metrics(count, count)
+        print(f"\n   {count} partições / {count} interfaces:")
+        for text in expressions:
+            start = time.perf_counter()
+            expression = CompiledExpression(text)
+            compile_us = (time.perf_counter() - start) * 1e6
+
+            items = sum(1 for _ in expression.elements(metrics))
+            start = time.perf_counter()
+            for _ in range(samples):
+                expression.evaluate(metrics)
+            per_sample = (time.perf_counter() - start) / samples * 1e6
+            print(f"   • {text}")
+            print(f"     compilação {compile_us:.0f} µs | {per_sample:.2f} µs/amostra | "
+                  f"{per_sample * 1000 / max(items, 1):.0f} ns/item")
+
+        # Referência: verificação escrita à mão em alerts.py
+        start = time.perf_counter()
+        for _ in range(samples):
+            alerts.check_disk_alerts(metrics["disk"], {"disk_usage_critical": 90, "disk_usage_warning": 80})
+        per_sample = (time.perf_counter() - start) / samples * 1e6
+        print(f"   • alerts.check_disk_alerts (referência): {per_sample:.2f} µs/amostra")
+
+
+if __name__ == "__main__":
+    benchmark()
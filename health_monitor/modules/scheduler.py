@@ -0,0 +1,37 @@
+"""
+Módulo de agendamento em intervalos fixos para o modo daemon
+"""
+import time
+from typing import Dict, List, Optional
+
+
+class IntervalScheduler:
+    """Agenda tarefas nomeadas em intervalos fixos, sem acumular atraso"""
+
+    def __init__(self, intervals: Dict[str, float], now: Optional[float] = None):
+        now = time.monotonic() if now is None else now
+        self.intervals = {name: max(float(interval), 0.1) for name, interval in intervals.items()}
+        # Todas as tarefas rodam logo na primeira iteração
+        self.next_run = {name: now for name in self.intervals}
+
+    def due(self, now: Optional[float] = None) -> List[str]:
+        """Retorna as tarefas vencidas e agenda a próxima execução de cada uma"""
+        now = time.monotonic() if now is None else now
+        due = []
+
+        for name, next_run in self.next_run.items():
+            if next_run <= now:
+                due.append(name)
+                interval = self.intervals[name]
+                # Manter a grade fixa; execuções perdidas são descartadas
+                missed = int((now - next_run) // interval) + 1
+                self.next_run[name] = next_run + missed * interval
+
+        return due
+
+    def seconds_until_next(self, now: Optional[float] = None) -> float:
+        """Tempo até a próxima tarefa vencer"""
+        now = time.monotonic() if now is None else now
+        if not self.next_run:
+            return 1.0
+        return max(min(self.next_run.values()) - now, 0.0)
@@ -0,0 +1,49 @@
+"""
+Módulo para persistência de estado entre execuções (snapshots, cursores, caches)
+"""
+import json
+import os
+import tempfile
+from pathlib import Path
+from typing import Dict, Any
+
+
+DEFAULT_STATE_DIR = Path(__file__).parent.parent / "state"
+
+
+def get_state_dir(config: Dict[str, Any]) -> Path:
+    """Obtém o diretório de estado (relativo ao diretório do health_monitor)"""
+    state_dir = Path(config.get("state_dir", str(DEFAULT_STATE_DIR)))
+    if not state_dir.is_absolute():
+        state_dir = DEFAULT_STATE_DIR.parent / state_dir
+    return state_dir
+
+
+def load_state(config: Dict[str, Any], name: str) -> Dict[str, Any]:
+    """Carrega o estado salvo; retorna dicionário vazio se ausente ou corrompido"""
+    state_file = get_state_dir(config) / f"{name}.json"
+
+    try:
+        with open(state_file, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        return data if isinstance(data, dict) else {}
+    except (FileNotFoundError, json.JSONDecodeError, OSError):
+        return {}
+
+
+def save_state(config: Dict[str, Any], name: str, data: Dict[str, Any]) -> None:
+    """Salva o estado de forma atômica (arquivo temporário + rename)"""
+    state_dir = get_state_dir(config)
+    state_dir.mkdir(parents=True, exist_ok=True)
+
+    fd, tmp_path = tempfile.mkstemp(prefix=f".{name}.", suffix=".tmp", dir=str(state_dir))
+    try:
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            json.dump(data, f, separators=(',', ':'))
+        os.replace(tmp_path, state_dir / f"{name}.json")
+    except Exception:
+        try:
+            os.unlink(tmp_path)
+        except OSError:
+            pass
+        raise
@@ -1,11 +1,13 @@
 """
 Módulo para monitoramento do sistema
 """
+import heapq
 import psutil
 import subprocess
 import platform
+import time
 from datetime import datetime, timedelta
-from typing import Dict, List, Any
+from typing import Dict, List, Any, Optional, Tuple
 
 
 def get_system_info() -> Dict[str, Any]:
@@ -57,93 +59,208 @@ def _format_uptime(uptime: timedelta) -> str:
     return " ".join(parts) if parts else "< 1m"
 
 
-def get_process_info() -> Dict[str, Any]:
-    """Obtém informações sobre processos"""
-    process_count = len(psutil.pids())
+# Atributos lidos de cada processo em uma única passagem (psutil usa oneshot)
+_PROCESS_ATTRS = ['pid', 'name', 'create_time', 'cpu_times', 'memory_info', 'io_counters', 'num_fds']
+
+# Amostra anterior de processos mantida em memória (modo daemon)
+_last_process_sample: Optional[Dict[Tuple[int, float], Dict[str, Any]]] = None
+_last_process_sample_time = 0.0
+
+
+def _sample_processes() -> Dict[Tuple[int, float], Dict[str, Any]]:
+    """Lê os contadores de todos os processos, indexados por (pid, create_time)"""
+    samples = {}
     
-    # Top processos por CPU
-    top_cpu = []
-    # Top processos por memória
-    top_memory = []
+    for proc in psutil.process_iter(_PROCESS_ATTRS, ad_value=None):
+        info = proc.info
+        cpu_times = info.get('cpu_times')
+        memory_info = info.get('memory_info')
+        io = info.get('io_counters')
+        
+        # create_time distingue PIDs reutilizados entre amostras
+        samples[(info['pid'], info.get('create_time') or 0.0)] = {
+            "pid": info['pid'],
+            "name": info.get('name') or "unknown",
+            "cpu": cpu_times.user + cpu_times.system if cpu_times else None,
+            "rss": memory_info.rss if memory_info else 0,
+            "io": io.read_bytes + io.write_bytes if io else None,
+            "fds": info.get('num_fds')
+        }
     
-    try:
-        processes = []
-        for proc in psutil.process_iter(['pid', 'name', 'cpu_percent', 'memory_percent']):
-            try:
-                processes.append(proc.info)
-            except (psutil.NoSuchProcess, psutil.AccessDenied):
-                continue
+    return samples
+
+
+def get_process_info(config: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """Obtém informações sobre processos.
+    
+    O percentual de CPU e a taxa de I/O vêm do delta contra a amostra anterior:
+    no modo daemon, a do ciclo passado; na primeira coleta, uma amostra curta.
+    """
+    global _last_process_sample, _last_process_sample_time
+    
+    monitoring = (config or {}).get("monitoring", {})
+    top_k = monitoring.get("top_processes", 5)
+    
+    previous = _last_process_sample
+    previous_time = _last_process_sample_time
+    
+    if previous is None:
+        # Preparar os contadores e aguardar um intervalo curto
+        previous = _sample_processes()
+        previous_time = time.monotonic()
+        time.sleep(monitoring.get("process_sample_interval", 0.5))
+    
+    current = _sample_processes()
+    current_time = time.monotonic()
+    elapsed = max(current_time - previous_time, 1e-6)
+    
+    _last_process_sample = current
+    _last_process_sample_time = current_time
+    
+    total_memory = psutil.virtual_memory().total
+    processes = []
+    for key, sample in current.items():
+        before = previous.get(key)
+        cpu_percent = 0.0
+        io_rate = 0.0
         
-        # Ordenar por CPU
-        sorted_cpu = sorted(processes, key=lambda x: x.get('cpu_percent', 0), reverse=True)[:5]
-        top_cpu = [
-            {
-                "pid": p['pid'],
-                "name": p['name'],
-                "cpu_percent": round(p.get('cpu_percent', 0), 2)
-            }
-            for p in sorted_cpu
-        ]
+        if before is not None:
+            if sample["cpu"] is not None and before["cpu"] is not None:
+                cpu_percent = max(sample["cpu"] - before["cpu"], 0.0) / elapsed * 100
+            if sample["io"] is not None and before["io"] is not None:
+                io_rate = max(sample["io"] - before["io"], 0) / elapsed
         
-        # Ordenar por memória
-        sorted_mem = sorted(processes, key=lambda x: x.get('memory_percent', 0), reverse=True)[:5]
-        top_memory = [
+        sample["cpu_percent"] = cpu_percent
+        sample["io_rate"] = io_rate
+        processes.append(sample)
+    
+    return {
+        "total_processes": len(current),
+        "sample_window_seconds": round(elapsed, 2),
+        "top_cpu_usage": [
+            {"pid": p["pid"], "name": p["name"], "cpu_percent": round(p["cpu_percent"], 2)}
+            for p in heapq.nlargest(top_k, processes, key=lambda p: p["cpu_percent"])
+        ],
+        "top_memory_usage": [
             {
-                "pid": p['pid'],
-                "name": p['name'],
-                "memory_percent": round(p.get('memory_percent', 0), 2)
+                "pid": p["pid"],
+                "name": p["name"],
+                "memory_percent": round(p["rss"] / total_memory * 100, 2),
+                "rss_mb": round(p["rss"] / (1024**2), 2)
             }
-            for p in sorted_mem
+            for p in heapq.nlargest(top_k, processes, key=lambda p: p["rss"])
+        ],
+        "top_io_usage": [
+            {"pid": p["pid"], "name": p["name"], "io_bytes_per_sec": round(p["io_rate"], 2)}
+            for p in heapq.nlargest(top_k, processes, key=lambda p: p["io_rate"])
+        ],
+        "top_open_files": [
+            {"pid": p["pid"], "name": p["name"], "open_fds": p["fds"]}
+            for p in heapq.nlargest(top_k, processes, key=lambda p: p["fds"] or 0)
         ]
-    except Exception as e:
-        pass
-    
-    return {
-        "total_processes": process_count,
-        "top_cpu_usage": top_cpu,
-        "top_memory_usage": top_memory
     }
 
 
+# Serviços verificados quando monitoring.systemd_services não está configurado
+DEFAULT_SERVICES = [
+    'NetworkManager',
+    'systemd-journald',
+    'sshd',
+    'firewalld',
+    'chronyd',
+    'dbus',
+    'polkit'
+]
+
+_SHOW_PROPERTIES = 'Id,Names,LoadState,ActiveState,SubState,NRestarts,MemoryCurrent,CPUUsageNSec'
+
+# Quantidade de unidades por chamada ao systemctl
+_SHOW_BATCH_SIZE = 200
+
+
+def _parse_systemctl_show(output: str) -> List[Dict[str, str]]:
+    """Converte a saída de 'systemctl show' (blocos chave=valor) em dicionários"""
+    units = []
+    current = {}
+    
+    for line in output.split('\n'):
+        if not line.strip():
+            if current:
+                units.append(current)
+                current = {}
+            continue
+        key, _, value = line.partition('=')
+        current[key] = value
+    
+    if current:
+        units.append(current)
+    
+    return units
+
+
+def _parse_counter(value: Optional[str]) -> Optional[int]:
+    """Converte contadores do systemd; '[not set]' e UINT64_MAX indicam ausência"""
+    try:
+        number = int(value)
+    except (TypeError, ValueError):
+        return None
+    return None if number >= 2**64 - 1 else number
+
+
+def _unit_name(service: str) -> str:
+    """Completa o nome da unidade com o sufixo .service quando necessário"""
+    return service if '.' in service else f"{service}.service"
+
+
 def get_systemd_services(config: Dict[str, Any]) -> List[Dict[str, Any]]:
-    """Obtém status de serviços systemd importantes"""
+    """Obtém status de serviços systemd importantes com uma única consulta ao systemctl"""
     services = []
+    monitoring = config.get("monitoring", {})
     
-    if not config.get("monitoring", {}).get("check_systemd_services", True):
+    if not monitoring.get("check_systemd_services", True):
         return services
     
-    # Lista de serviços comuns para verificar
-    important_services = [
-        'NetworkManager',
-        'systemd-journald',
-        'sshd',
-        'firewalld',
-        'chronyd',
-        'dbus',
-        'polkit'
-    ]
-    
-    for service in important_services:
+    important_services = monitoring.get("systemd_services", DEFAULT_SERVICES)
+    
+    for offset in range(0, len(important_services), _SHOW_BATCH_SIZE):
+        batch = important_services[offset:offset + _SHOW_BATCH_SIZE]
+        
         try:
             result = subprocess.run(
-                ['systemctl', 'is-active', service],
+                ['systemctl', 'show', '--no-pager', '-p', _SHOW_PROPERTIES, '--'] + [_unit_name(s) for s in batch],
                 capture_output=True,
                 text=True,
-                timeout=5
+                timeout=10
             )
             
-            status = result.stdout.strip()
+            # Indexar por todos os nomes (aliases incluídos, ex.: dbus -> dbus-broker)
+            by_name = {}
+            for unit in _parse_systemctl_show(result.stdout):
+                for name in unit.get('Names', '').split() + [unit.get('Id', '')]:
+                    by_name[name] = unit
+        except Exception as e:
+            services.extend({"name": s, "status": "error", "error": str(e)} for s in batch)
+            continue
+        
+        for service in batch:
+            unit = by_name.get(_unit_name(service))
+            if unit is None:
+                services.append({"name": service, "status": "unknown", "active": False})
+                continue
+            
+            status = unit.get('ActiveState', 'unknown')
+            memory = _parse_counter(unit.get('MemoryCurrent'))
+            cpu_nsec = _parse_counter(unit.get('CPUUsageNSec'))
             
             services.append({
                 "name": service,
                 "status": status,
-                "active": status == "active"
-            })
-        except Exception as e:
-            services.append({
-                "name": service,
-                "status": "error",
-                "error": str(e)
+                "active": status == "active",
+                "sub_state": unit.get('SubState'),
+                "load_state": unit.get('LoadState'),
+                "restarts": _parse_counter(unit.get('NRestarts')),
+                "memory_mb": round(memory / (1024**2), 2) if memory is not None else None,
+                "cpu_seconds": round(cpu_nsec / 1e9, 2) if cpu_nsec is not None else None
             })
     
     return services
@@ -176,7 +293,7 @@ def collect_system_metrics(config: Dict[str, Any]) -> Dict[str, Any]:
     """Coleta todas as métricas do sistema"""
     return {
         "info": get_system_info(),
-        "processes": get_process_info(),
+        "processes": get_process_info(config),
         "systemd_services": get_systemd_services(config),
         "failed_services": get_failed_services()
     }
@@ -0,0 +1,194 @@
+"""
+Testes do motor de alertas com estado (alert_engine.AlertEngine)
+"""
+import json
+import sys
+import unittest
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from modules import alert_engine  # noqa: E402
+
+
+def _disk(*partitions):
+    """Métricas novas a cada chamada (o motor só reavalia categorias com objeto novo)"""
+    return {"disk": {"partitions": [{"mountpoint": mp, "percent_used": pct} for mp, pct in partitions]}}
+
+
+def _engine(**alerting):
+    config = {"thresholds": {"disk_usage_warning": 80, "disk_usage_critical": 90}, "alerting": alerting}
+    return alert_engine.AlertEngine(alert_engine.build_rules(config))
+
+
+def _resumo(events):
+    return [(e["event"], e["severity"], e.get("previous_severity")) for e in events]
+
+
+class TestHisterese(unittest.TestCase):
+
+    def test_libera_so_abaixo_do_limite_menos_a_margem(self):
+        engine = _engine()  # disk_usage: histerese padrão de 2 pontos
+
+        _, events = engine.evaluate(_disk(("/", 81.0)), [], now=1)
+        self.assertEqual(_resumo(events), [("fired", "warning", None)])
+        self.assertEqual(events[0]["message"], "Uso alto de disco em /: 81.0%")
+
+        # Abaixo do disparo (80), acima da liberação (78): continua ativo
+        active, events = engine.evaluate(_disk(("/", 79.0)), [], now=2)
+        self.assertEqual(events, [])
+        self.assertEqual([a["severity"] for a in active], ["warning"])
+        self.assertEqual(active[0]["value"], 79.0)
+
+        active, events = engine.evaluate(_disk(("/", 77.9)), [], now=3)
+        self.assertEqual(_resumo(events), [("resolved", "warning", "warning")])
+        self.assertEqual(active, [])
+
+    def test_agrava_e_atenua_entre_niveis(self):
+        engine = _engine()
+        engine.evaluate(_disk(("/", 85.0)), [], now=1)
+
+        _, events = engine.evaluate(_disk(("/", 91.0)), [], now=2)
+        self.assertEqual(_resumo(events), [("fired", "critical", "warning")])
+
+        _, events = engine.evaluate(_disk(("/", 89.0)), [], now=3)
+        self.assertEqual(events, [])
+
+        active, events = engine.evaluate(_disk(("/", 87.0)), [], now=4)
+        self.assertEqual(_resumo(events), [("fired", "warning", "critical")])
+        self.assertEqual(active[0]["threshold"], 80)
+
+    def test_margem_configuravel(self):
+        engine = _engine(hysteresis={"disk_usage": 10})
+        engine.evaluate(_disk(("/", 81.0)), [], now=1)
+        _, events = engine.evaluate(_disk(("/", 71.0)), [], now=2)
+        self.assertEqual(events, [])
+        _, events = engine.evaluate(_disk(("/", 69.0)), [], now=3)
+        self.assertEqual(_resumo(events), [("resolved", "warning", "warning")])
+
+
+class TestDuracaoMinima(unittest.TestCase):
+
+    def test_for_samples_exige_amostras_seguidas(self):
+        engine = _engine(for_samples={"disk_usage": 3})
+
+        for now in (1, 2):
+            active, events = engine.evaluate(_disk(("/", 85.0)), [], now=now)
+            self.assertEqual((active, events), ([], []))
+
+        # Uma amostra fora da condição zera a contagem
+        engine.evaluate(_disk(("/", 50.0)), [], now=3)
+        for now in (4, 5):
+            _, events = engine.evaluate(_disk(("/", 85.0)), [], now=now)
+            self.assertEqual(events, [])
+
+        active, events = engine.evaluate(_disk(("/", 85.0)), [], now=6)
+        self.assertEqual(_resumo(events), [("fired", "warning", None)])
+        self.assertEqual(active[0]["since"], 6)
+
+    def test_for_seconds_avanca_mesmo_sem_coleta_nova(self):
+        engine = _engine(for_seconds={"disk_usage": 60})
+        metrics = _disk(("/", 85.0))
+
+        _, events = engine.evaluate(metrics, [], now=0)
+        self.assertEqual(events, [])
+        _, events = engine.evaluate(_disk(("/", 85.0)), [], now=30)
+        self.assertEqual(events, [])
+
+        # Mesmo objeto de métricas (categoria não coletada de novo): só o tempo avança
+        stale = _disk(("/", 85.0))
+        engine.evaluate(stale, [], now=40)
+        _, events = engine.evaluate(stale, [], now=61)
+        self.assertEqual(_resumo(events), [("fired", "warning", None)])
+
+    def test_atenuacao_e_imediata(self):
+        engine = _engine(for_samples={"disk_usage": 2})
+        engine.evaluate(_disk(("/", 85.0)), [], now=1)
+        _, events = engine.evaluate(_disk(("/", 85.0)), [], now=2)
+        self.assertEqual(_resumo(events), [("fired", "warning", None)])
+
+        _, events = engine.evaluate(_disk(("/", 10.0)), [], now=3)
+        self.assertEqual(_resumo(events), [("resolved", "warning", "warning")])
+
+
+class TestInstancias(unittest.TestCase):
+
+    def test_instancia_que_desaparece_e_resolvida(self):
+        engine = _engine()
+        _, events = engine.evaluate(_disk(("/", 85.0), ("/data", 95.0)), [], now=1)
+        self.assertEqual(sorted(_resumo(events)), [("fired", "critical", None), ("fired", "warning", None)])
+
+        active, events = engine.evaluate(_disk(("/", 85.0)), [], now=2)
+        self.assertEqual(_resumo(events), [("resolved", "critical", "critical")])
+        self.assertEqual(events[0]["message"], "Uso crítico de disco em /data: 95.0%")
+        self.assertEqual([a["mountpoint"] for a in active], ["/"])
+
+    def test_active_alerts_no_formato_de_alerts(self):
+        engine = _engine()
+        engine.evaluate(_disk(("/", 85.0)), [], now=5)
+        (alert,) = engine.active_alerts()
+        self.assertEqual({k: alert[k] for k in ("severity", "category", "value", "threshold", "rule", "mountpoint", "since")},
+                         {"severity": "warning", "category": "disk", "value": 85.0, "threshold": 80,
+                          "rule": "disk_usage", "mountpoint": "/", "since": 5})
+        self.assertEqual(len(alert["fingerprint"]), 16)
+
+    def test_estado_serializado_continua_sem_eventos_duplicados(self):
+        engine = _engine()
+        engine.evaluate(_disk(("/", 85.0)), [{"severity": "critical", "category": "disk",
+                                              "message": "SMART falhou para /dev/sda", "device": "/dev/sda"}], now=1)
+
+        state = json.loads(json.dumps(engine.state))
+        config = {"thresholds": {"disk_usage_warning": 80, "disk_usage_critical": 90}}
+        restored = alert_engine.AlertEngine(alert_engine.build_rules(config), state)
+        active, events = restored.evaluate(_disk(("/", 86.0)), [{"severity": "critical", "category": "disk",
+                                                                 "message": "SMART falhou para /dev/sda",
+                                                                 "device": "/dev/sda"}], now=2)
+        self.assertEqual(events, [])
+        self.assertEqual(len(active), 2)
+
+
+class TestPassthrough(unittest.TestCase):
+
+    def _services(self, count):
+        return {"severity": "warning", "category": "system", "message": f"{count} serviço(s) systemd falharam",
+                "services": [f"svc{i}" for i in range(count)]}
+
+    def test_deduplica_pelo_fingerprint_sem_a_mensagem(self):
+        engine = _engine()
+        _, events = engine.evaluate({}, [self._services(2)], now=1)
+        self.assertEqual(_resumo(events), [("fired", "warning", None)])
+
+        # A contagem na mensagem muda, o alerta é o mesmo
+        active, events = engine.evaluate({}, [self._services(3)], now=2)
+        self.assertEqual(events, [])
+        self.assertEqual(active[0]["message"], "3 serviço(s) systemd falharam")
+        self.assertEqual(active[0]["since"], 1)
+
+        _, events = engine.evaluate({}, [], now=3)
+        self.assertEqual(_resumo(events), [("resolved", "warning", "warning")])
+        self.assertEqual(events[0]["message"], "3 serviço(s) systemd falharam")
+
+    def test_identidade_separa_alertas(self):
+        engine = _engine()
+        hosts = [{"severity": "warning", "category": "network", "message": f"Host {h} não acessível", "host": h}
+                 for h in ("8.8.8.8", "1.1.1.1")]
+        active, events = engine.evaluate({}, hosts, now=1)
+        self.assertEqual(len(events), 2)
+        self.assertEqual(len({a["fingerprint"] for a in active}), 2)
+
+        _, events = engine.evaluate({}, hosts[:1], now=2)
+        self.assertEqual(len(events), 1)
+        self.assertEqual(events[0]["message"], "Host 1.1.1.1 não acessível")
+
+    def test_alertas_de_limiar_sem_estado_sao_substituidos_pelas_regras(self):
+        engine = _engine()
+        stateless = [{"severity": "warning", "category": "disk", "message": "Uso alto de disco em /: 85.0%",
+                      "value": 85.0, "threshold": 80, "mountpoint": "/"}]
+        active, events = engine.evaluate(_disk(("/", 85.0)), stateless, now=1)
+        self.assertEqual(len(active), 1)
+        self.assertEqual(active[0]["rule"], "disk_usage")
+        self.assertEqual(len(events), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
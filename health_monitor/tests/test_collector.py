@@ -0,0 +1,169 @@
+"""
+Testes da execução concorrente dos coletores e do agendador de intervalos
+"""
+import queue
+import sys
+import threading
+import time
+import unittest
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from modules import collector, scheduler  # noqa: E402
+
+
+class _CollectorTestCase(unittest.TestCase):
+    """Coletores falsos: rápido, com erro e lento (preso até `release` ser sinalizado)"""
+
+    def setUp(self):
+        collector._running.clear()
+        self.release = threading.Event()
+        self.slow_calls = 0
+        # Liberar os coletores presos antes de limpar o registro, para as threads terminarem
+        self.addCleanup(collector._running.clear)
+        self.addCleanup(self.release.set)
+        self.config = {"monitoring": {"collector_timeout": 5, "collector_timeouts": {"slow": 0.1}}}
+
+    def fast(self, config):
+        return {"value": 1}
+
+    def failing(self, config):
+        raise RuntimeError("falha simulada")
+
+    def slow(self, config):
+        self.slow_calls += 1
+        self.release.wait(5)
+        return {"value": "lento"}
+
+
+class TestRunCollectors(_CollectorTestCase):
+
+    def test_ok_erro_e_timeout_isolados(self):
+        stats = {}
+        started = time.monotonic()
+        metrics = collector.run_collectors(
+            [("fast", "Rápido", self.fast), ("failing", "Erro", self.failing), ("slow", "Lento", self.slow)],
+            self.config, stats, quiet=True)
+        elapsed = time.monotonic() - started
+
+        self.assertEqual(metrics["fast"], {"value": 1})
+        self.assertEqual(metrics["failing"], {"error": "falha simulada"})
+        self.assertIn("Tempo limite", metrics["slow"]["error"])
+
+        statuses = {name: entry["status"] for name, entry in stats["collectors"].items()}
+        self.assertEqual(statuses, {"fast": "ok", "failing": "error", "slow": "timeout"})
+        self.assertEqual(stats["mode"], "parallel")
+        self.assertGreaterEqual(stats["collectors"]["slow"]["duration_seconds"], 0.1)
+        # O coletor preso não segura a coleta além do próprio tempo limite
+        self.assertLess(elapsed, 2)
+
+    def test_execucao_anterior_em_andamento_e_pulada(self):
+        collectors = [("slow", "Lento", self.slow)]
+        collector.run_collectors(collectors, self.config, quiet=True)
+
+        stats = {}
+        metrics = collector.run_collectors(collectors, self.config, stats, quiet=True)
+        self.assertEqual(stats["collectors"]["slow"], {"status": "skipped", "duration_seconds": 0.0})
+        self.assertIn("error", metrics["slow"])
+        self.assertEqual(self.slow_calls, 1)
+
+        # Terminada a execução presa, o coletor volta a rodar
+        self.release.set()
+        collector._running["slow"].join(5)
+        stats = {}
+        self.assertEqual(collector.run_collectors(collectors, self.config, stats, quiet=True)["slow"],
+                         {"value": "lento"})
+        self.assertEqual(stats["collectors"]["slow"]["status"], "ok")
+
+
+class TestStartCollectors(_CollectorTestCase):
+
+    def _drain(self, results, count):
+        return {name: (value, stats) for name, value, stats in (results.get(timeout=5) for _ in range(count))}
+
+    def test_resultados_chegam_pela_fila(self):
+        results = queue.Queue()
+        started = time.monotonic()
+        collector.start_collectors(
+            [("slow", "Lento", self.slow), ("failing", "Erro", self.failing), ("fast", "Rápido", self.fast)],
+            self.config, results)
+        # Disparar não espera nenhum coletor
+        self.assertLess(time.monotonic() - started, 0.1)
+
+        # O coletor rápido entrega antes do lento, mesmo tendo sido disparado depois
+        first = results.get(timeout=5)
+        self.assertNotEqual(first[0], "slow")
+
+        delivered = self._drain(results, 2)
+        delivered[first[0]] = first[1:]
+        self.assertEqual(delivered["fast"][0], {"value": 1})
+        self.assertEqual(delivered["fast"][1]["status"], "ok")
+        self.assertEqual(delivered["failing"][1]["status"], "error")
+        self.assertEqual(delivered["slow"][1]["status"], "timeout")
+
+    def test_coletor_ainda_rodando_e_entregue_como_skipped(self):
+        results = queue.Queue()
+        collector.start_collectors([("slow", "Lento", self.slow)], self.config, results)
+        self.assertEqual(results.get(timeout=5)[2]["status"], "timeout")
+
+        collector.start_collectors([("slow", "Lento", self.slow)], self.config, results)
+        name, value, stats = results.get(timeout=5)
+        self.assertEqual((name, stats["status"]), ("slow", "skipped"))
+        self.assertEqual(self.slow_calls, 1)
+
+
+class TestIntervalScheduler(unittest.TestCase):
+
+    def test_grade_fixa_sem_acumular_atraso(self):
+        tasks = scheduler.IntervalScheduler({"cpu": 10, "disk": 60}, now=0)
+        self.assertEqual(sorted(tasks.due(0)), ["cpu", "disk"])
+        self.assertEqual(tasks.due(5), [])
+        self.assertEqual(tasks.seconds_until_next(5), 5)
+
+        # Iteração atrasada: roda uma vez e volta para a grade (40, não 35 + 10)
+        self.assertEqual(tasks.due(35), ["cpu"])
+        self.assertEqual(tasks.next_run["cpu"], 40)
+        self.assertEqual(sorted(tasks.due(60)), ["cpu", "disk"])
+
+    def test_intervalo_minimo(self):
+        tasks = scheduler.IntervalScheduler({"cpu": 0}, now=0)
+        self.assertEqual(tasks.intervals["cpu"], 0.1)
+        self.assertEqual(scheduler.IntervalScheduler({}, now=0).seconds_until_next(0), 1.0)
+
+
+class TestSlowCollectorDoesNotDelayFastInterval(_CollectorTestCase):
+
+    def test_intervalo_rapido_segue_durante_coletor_lento(self):
+        """Mesmo laço do daemon: coletor em andamento não é redisparado nem segura os demais"""
+        self.config["monitoring"]["collector_timeouts"]["slow"] = 5
+        collectors = [("fast", "Rápido", self.fast), ("slow", "Lento", self.slow)]
+        tasks = scheduler.IntervalScheduler({"fast": 0.1, "slow": 0.1})
+        results = queue.Queue()
+        in_flight = set()
+        fast_deliveries = []
+
+        deadline = time.monotonic() + 0.75
+        while time.monotonic() < deadline:
+            due = tasks.due()
+            due_collectors = [c for c in collectors if c[0] in due and c[0] not in in_flight]
+            if due_collectors:
+                in_flight.update(name for name, _, _ in due_collectors)
+                collector.start_collectors(due_collectors, self.config, results)
+            try:
+                name, value, stats = results.get(timeout=tasks.seconds_until_next())
+            except queue.Empty:
+                continue
+            in_flight.discard(name)
+            if name == "fast":
+                fast_deliveries.append(time.monotonic())
+
+        # ~7 intervalos de 0,1s com o coletor lento preso o tempo todo
+        self.assertGreaterEqual(len(fast_deliveries), 5)
+        self.assertLess(max(b - a for a, b in zip(fast_deliveries, fast_deliveries[1:])), 0.3)
+        self.assertIn("slow", in_flight)
+        self.assertEqual(self.slow_calls, 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,139 @@
+"""
+Testes dos probes de conectividade (network._parse_target, network._probe_tcp) contra um socket local
+"""
+import asyncio
+import socket
+import sys
+import time
+import unittest
+from pathlib import Path
+from unittest import mock
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from modules import network  # noqa: E402
+
+
+class TestParseTarget(unittest.TestCase):
+
+    def test_formatos(self):
+        for target, expected in (("example.com", ("example.com", None)),
+                                 ("example.com:443", ("example.com", 443)),
+                                 ("10.0.0.1:22", ("10.0.0.1", 22)),
+                                 ("[::1]:8080", ("::1", 8080)),
+                                 ("[2001:db8::1]", ("2001:db8::1", None)),
+                                 ("2001:db8::1", ("2001:db8::1", None))):
+            with self.subTest(target=target):
+                self.assertEqual(network._parse_target(target), expected)
+
+    def test_porta_invalida(self):
+        for target in ("host:http", "[::1]:x"):
+            with self.subTest(target=target):
+                with self.assertRaises(ValueError):
+                    network._parse_target(target)
+
+    def test_alvo_invalido_vira_erro_no_resultado(self):
+        result = asyncio.run(network._probe_target("host:http", 1, 0.5))
+        self.assertEqual(result, {"host": "host:http", "reachable": False, "latency_ms": None,
+                                  "error": "Alvo inválido"})
+
+
+class TestProbeTcp(unittest.TestCase):
+
+    def setUp(self):
+        self.server = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        self.addCleanup(self.server.close)
+        self.server.bind(("127.0.0.1", 0))
+        self.server.listen(16)
+        self.port = self.server.getsockname()[1]
+
+    def _closed_port(self):
+        # Porta que acabou de ser liberada: connect recusado na hora
+        sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        sock.bind(("127.0.0.1", 0))
+        port = sock.getsockname()[1]
+        sock.close()
+        return port
+
+    def test_porta_aberta(self):
+        result = asyncio.run(network._probe_tcp("127.0.0.1", self.port, 3, 1))
+        self.assertTrue(result["reachable"])
+        self.assertEqual((result["method"], result["port"], result["probes"]), ("tcp", self.port, 3))
+        self.assertEqual(result["loss_percent"], 0.0)
+        self.assertLessEqual(result["latency_min_ms"], result["latency_avg_ms"])
+        self.assertLessEqual(result["latency_avg_ms"], result["latency_max_ms"])
+
+    def test_porta_fechada(self):
+        result = asyncio.run(network._probe_tcp("127.0.0.1", self._closed_port(), 2, 1))
+        self.assertFalse(result["reachable"])
+        self.assertIsNone(result["latency_ms"])
+        self.assertEqual(result["loss_percent"], 100.0)
+        self.assertNotIn("latency_avg_ms", result)
+
+    def test_perda_parcial(self):
+        answers = iter([12.0, None, 8.0, None])
+
+        async def _fake_connect(host, port, timeout):
+            return next(answers)
+
+        with mock.patch.object(network, "_tcp_connect", _fake_connect):
+            result = asyncio.run(network._probe_tcp("127.0.0.1", self.port, 4, 1))
+        self.assertEqual(result["loss_percent"], 50.0)
+        self.assertEqual((result["latency_min_ms"], result["latency_avg_ms"], result["latency_max_ms"]),
+                         (8.0, 10.0, 12.0))
+
+    def test_alvos_verificados_ao_mesmo_tempo(self):
+        async def _slow_connect(host, port, timeout):
+            await asyncio.sleep(0.2)
+            return 1.0
+
+        targets = [f"127.0.0.1:{self.port}"] * 5
+        with mock.patch.object(network, "_tcp_connect", _slow_connect):
+            start = time.monotonic()
+            results = network.check_connectivity(targets, count=3)
+        self.assertLess(time.monotonic() - start, 0.5)
+        self.assertEqual([r["host"] for r in results], targets)
+        self.assertTrue(all(r["reachable"] for r in results))
+
+
+class TestCollectNetworkMetrics(unittest.TestCase):
+
+    def test_dns_e_conectividade_no_mesmo_laco(self):
+        async def _slow_dns(names, timeout, nameservers=None, port=53):
+            await asyncio.sleep(0.3)
+            return {"can_resolve": True, "names": names}
+
+        async def _slow_probes(hosts, count, timeout):
+            await asyncio.sleep(0.3)
+            return [{"host": h, "reachable": True, "probes": count} for h in hosts]
+
+        config = {"monitoring": {"dns_check_names": ["a.test"], "network_check_hosts": ["h:1"],
+                                 "network_probe_count": 2}}
+        with mock.patch.object(network, "get_network_interfaces", return_value=[]), \
+                mock.patch.object(network, "get_network_connections", return_value={}), \
+                mock.patch.object(network, "_check_dns", _slow_dns), \
+                mock.patch.object(network, "_probe_all", _slow_probes), \
+                mock.patch.object(network.asyncio, "run", wraps=asyncio.run) as run:
+            start = time.monotonic()
+            metrics = network.collect_network_metrics(config)
+            elapsed = time.monotonic() - start
+
+        self.assertEqual(run.call_count, 1)
+        self.assertLess(elapsed, 0.55)
+        self.assertEqual(metrics["dns"], {"can_resolve": True, "names": ["a.test"]})
+        self.assertEqual(metrics["connectivity"], [{"host": "h:1", "reachable": True, "probes": 2}])
+
+    def test_sem_alvos_de_conectividade(self):
+        async def _dns(names, timeout, nameservers=None, port=53):
+            return {"can_resolve": False}
+
+        with mock.patch.object(network, "get_network_interfaces", return_value=[]), \
+                mock.patch.object(network, "get_network_connections", return_value={}), \
+                mock.patch.object(network, "_check_dns", _dns):
+            metrics = network.collect_network_metrics({})
+        self.assertEqual(metrics["dns"], {"can_resolve": False})
+        self.assertNotIn("connectivity", metrics)
+
+
+if __name__ == "__main__":
+    unittest.main()
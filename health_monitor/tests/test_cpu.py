@@ -0,0 +1,96 @@
+"""
+Testes do uso de CPU calculado pelo delta de /proc/stat (cpu._get_cpu_usage_proc)
+"""
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from modules import cpu, state  # noqa: E402
+
+
+def _snapshot(btime, total, core0, core1):
+    """Snapshot no formato de _read_proc_stat (user nice system idle iowait irq softirq steal)"""
+    return {"btime": btime, "cpus": {"cpu": total, "cpu0": core0, "cpu1": core1}}
+
+
+BASE = _snapshot(1000, [100, 0, 100, 700, 50, 0, 30, 20], [50, 0, 50, 350, 25, 0, 15, 10],
+                 [50, 0, 50, 350, 25, 0, 15, 10])
+# +200 ticks: 60 user, 20 system, 100 idle, 10 iowait, 6 softirq, 4 steal
+# (cpu0: 80 de 100 ocupados; cpu1: 10 de 100, o resto idle/iowait)
+NEXT = _snapshot(1000, [160, 0, 120, 800, 60, 0, 36, 24], [110, 0, 70, 370, 25, 0, 15, 10],
+                 [50, 0, 50, 430, 35, 0, 21, 14])
+
+
+class TestCpuUsageProc(unittest.TestCase):
+
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.config = {"state_dir": tmp.name}
+        self.state_file = Path(tmp.name) / "cpu.json"
+
+        cpu._last_snapshot = None
+        self.addCleanup(setattr, cpu, "_last_snapshot", None)
+        self.snapshots = []
+        patcher = mock.patch.object(cpu, "_read_proc_stat", side_effect=lambda: self.snapshots.pop(0))
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def _usage(self, *snapshots):
+        self.snapshots.extend(snapshots)
+        return cpu._get_cpu_usage_proc(self.config)
+
+    def test_primeira_coleta_usa_media_desde_o_boot(self):
+        usage = self._usage(BASE)
+        self.assertEqual(usage["sampling"], "since_boot")
+        # 1000 ticks, 750 ociosos (idle + iowait)
+        self.assertEqual(usage["percent_total"], 25.0)
+        self.assertEqual(usage["iowait_percent"], 5.0)
+
+    def test_delta_contra_o_snapshot_anterior(self):
+        self._usage(BASE)
+        usage = self._usage(NEXT)
+
+        self.assertEqual(usage["sampling"], "delta")
+        self.assertEqual(usage["percent_total"], 45.0)
+        self.assertEqual(usage["iowait_percent"], 5.0)
+        self.assertEqual(usage["softirq_percent"], 3.0)
+        self.assertEqual(usage["steal_percent"], 2.0)
+        self.assertEqual(usage["percent_per_core"], [80.0, 10.0])
+
+    def test_snapshot_de_outro_boot_e_descartado(self):
+        self._usage(BASE)
+        # Contadores maiores, mas de outro boot: o delta seria 45%, a média desde o boot é 28.3%
+        reboot = dict(NEXT, btime=2000)
+        usage = self._usage(reboot)
+        self.assertEqual(usage["sampling"], "since_boot")
+        self.assertEqual(usage["percent_total"], 28.3)
+
+    def test_execucoes_pontuais_usam_o_estado_em_disco(self):
+        self._usage(BASE)
+        self.assertEqual(state.load_state(self.config, "cpu")["cpus"]["cpu"], BASE["cpus"]["cpu"])
+
+        cpu._last_snapshot = None  # novo processo
+        usage = self._usage(NEXT)
+        self.assertEqual(usage["sampling"], "delta")
+        self.assertEqual(usage["percent_total"], 45.0)
+
+    def test_snapshot_em_memoria_nao_grava_em_disco(self):
+        self._usage(BASE)
+        gravado = self.state_file.read_bytes()
+
+        with mock.patch.object(cpu.state, "save_state") as save_state, \
+                mock.patch.object(cpu.state, "load_state") as load_state:
+            usage = self._usage(NEXT)
+        save_state.assert_not_called()
+        load_state.assert_not_called()
+        self.assertEqual(usage["sampling"], "delta")
+        self.assertEqual(self.state_file.read_bytes(), gravado)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,197 @@
+"""
+Testes do coletor de I/O de disco (disk_io) com /proc/diskstats sintético
+"""
+import sys
+import unittest
+from pathlib import Path
+from types import SimpleNamespace
+from unittest import mock
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from modules import alerts, disk_io  # noqa: E402
+
+
+def _line(major, minor, name, reads=0, sectors_read=0, ms_reading=0, writes=0, sectors_written=0,
+          ms_writing=0, in_flight=0, ms_io=0, weighted_ms_io=0):
+    # Campos 'merged' zerados e as colunas de discard/flush dos kernels recentes no fim
+    fields = [reads, 0, sectors_read, ms_reading, writes, 0, sectors_written, ms_writing,
+              in_flight, ms_io, weighted_ms_io, 0, 0, 0, 0]
+    return f"{major:4d} {minor:7d} {name} " + " ".join(str(v) for v in fields)
+
+
+BEFORE = "\n".join([
+    _line(8, 0, "sda", reads=100, sectors_read=2048, ms_reading=50, writes=200, sectors_written=4096,
+          ms_writing=150, in_flight=1, ms_io=500, weighted_ms_io=800),
+    _line(8, 1, "sda1", reads=90, sectors_read=2000, writes=190, sectors_written=4000),
+    _line(7, 0, "loop0", reads=10, sectors_read=80),
+    _line(11, 0, "sr0"),
+    _line(259, 0, "nvme0n1", reads=5000, writes=5000, ms_io=100)
+]) + "\n"
+
+# Dois segundos depois: sda com +200 leituras (20 MiB) e +100 escritas (10 MiB);
+# nvme0n1 com contadores menores (reiniciados)
+AFTER = "\n".join([
+    _line(8, 0, "sda", reads=300, sectors_read=2048 + 40960, ms_reading=450, writes=300,
+          sectors_written=4096 + 20480, ms_writing=650, in_flight=3, ms_io=1500, weighted_ms_io=3800),
+    _line(8, 1, "sda1", reads=280, sectors_read=42000, writes=290, sectors_written=24000),
+    _line(7, 0, "loop0", reads=20, sectors_read=160),
+    _line(11, 0, "sr0"),
+    _line(259, 0, "nvme0n1", reads=10, writes=10, ms_io=1)
+]) + "\n"
+
+
+class _DiskIOTestCase(unittest.TestCase):
+
+    def setUp(self):
+        disk_io._last_sample = None
+        disk_io._last_sample_time = 0.0
+        disk_io._whole_disks = set()
+        disk_io._not_disks.clear()
+        self.addCleanup(setattr, disk_io, "_last_sample", None)
+        self.addCleanup(disk_io._not_disks.clear)
+        self.addCleanup(setattr, disk_io, "_whole_disks", set())
+
+        self.listdir = mock.Mock(return_value=["sda", "loop0", "sr0", "nvme0n1"])
+        patcher = mock.patch.object(disk_io, "os", SimpleNamespace(listdir=self.listdir))
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+        self.snapshots = []
+        patcher = mock.patch.object(disk_io, "open", create=True, side_effect=self._open)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+        self.clock = mock.Mock()
+        patcher = mock.patch.object(disk_io, "time", self.clock)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def _open(self, path, mode='r'):
+        self.assertEqual(path, '/proc/diskstats')
+        return mock.mock_open(read_data=self.snapshots.pop(0))()
+
+
+class TestIsWholeDisk(_DiskIOTestCase):
+
+    def test_particoes_ficam_de_fora_e_sys_block_e_cacheado(self):
+        self.assertTrue(disk_io._is_whole_disk("sda"))
+        self.assertFalse(disk_io._is_whole_disk("sda1"))
+        self.assertFalse(disk_io._is_whole_disk("sda1"))
+        self.assertTrue(disk_io._is_whole_disk("nvme0n1"))
+        # Uma leitura para sda e outra para o nome desconhecido sda1; depois tudo vem do cache
+        self.assertEqual(self.listdir.call_count, 2)
+
+    def test_disco_novo_relê_sys_block(self):
+        self.assertTrue(disk_io._is_whole_disk("sda"))
+        self.listdir.return_value = ["sda", "sdb"]
+        self.assertTrue(disk_io._is_whole_disk("sdb"))
+        self.assertEqual(self.listdir.call_count, 2)
+
+    def test_sem_sys_block_aceita_todos(self):
+        self.listdir.side_effect = OSError("sem /sys")
+        self.assertTrue(disk_io._is_whole_disk("sda1"))
+
+    def test_leitura_filtra_excluidos_particoes_e_ociosos(self):
+        self.snapshots = [BEFORE]
+        sample = disk_io._read_diskstats(disk_io.DEFAULT_EXCLUDE)
+        self.assertEqual(sorted(sample), ["nvme0n1", "sda"])
+        self.assertEqual(sample["sda"][0], "8:0")
+        self.assertEqual(sample["sda"][1][:4], [100, 0, 2048, 50])
+
+
+class TestCollectDiskIO(_DiskIOTestCase):
+
+    def test_primeira_coleta_amostra_curta_e_calcula_deltas(self):
+        self.snapshots = [BEFORE, AFTER]
+        self.clock.monotonic.side_effect = [100.0, 102.0]
+
+        result = disk_io.collect_disk_io_metrics({"monitoring": {"disk_io_sample_interval": 0.25}})
+
+        self.clock.sleep.assert_called_once_with(0.25)
+        self.assertEqual(result["sample_window_seconds"], 2.0)
+        devices = {d["device"]: d for d in result["devices"]}
+        self.assertEqual(sorted(devices), ["nvme0n1", "sda"])
+        self.assertEqual(devices["sda"], {
+            "device": "sda", "in_flight": 3,
+            "read_iops": 100.0, "write_iops": 50.0,
+            "read_mb_per_sec": 10.0, "write_mb_per_sec": 5.0,
+            "await_ms": 3.0, "read_await_ms": 2.0, "write_await_ms": 5.0,
+            "queue_depth": 1.5, "util_percent": 50.0
+        })
+        # Contadores reiniciados: sem base para as taxas
+        self.assertIsNone(devices["nvme0n1"]["read_iops"])
+        self.assertIsNone(devices["nvme0n1"]["util_percent"])
+
+    def test_coleta_seguinte_usa_amostra_anterior_sem_dormir(self):
+        self.snapshots = [BEFORE, AFTER]
+        self.clock.monotonic.side_effect = [100.0, 102.0, 104.0]
+        disk_io.collect_disk_io_metrics({})
+        self.clock.sleep.assert_called_once_with(0.5)
+
+        self.snapshots = [AFTER]
+        result = disk_io.collect_disk_io_metrics({})
+        self.clock.sleep.assert_called_once()
+        sda = next(d for d in result["devices"] if d["device"] == "sda")
+        # Nenhuma operação entre as duas leituras
+        self.assertEqual((sda["read_iops"], sda["await_ms"], sda["util_percent"]), (0.0, 0.0, 0.0))
+
+    def test_mesmo_nome_com_outro_major_minor_e_outro_dispositivo(self):
+        self.snapshots = [BEFORE, AFTER.replace("   8       0 sda", "   8      16 sda")]
+        self.clock.monotonic.side_effect = [100.0, 102.0]
+        result = disk_io.collect_disk_io_metrics({})
+        sda = next(d for d in result["devices"] if d["device"] == "sda")
+        self.assertIsNone(sda["read_iops"])
+
+    def test_utilizacao_limitada_a_100(self):
+        stats = disk_io._device_stats("sda", [1, 0, 0, 0, 1, 0, 0, 0, 0, 3000, 0],
+                                      [0] * disk_io._FIELDS, 2.0)
+        self.assertEqual(stats["util_percent"], 100.0)
+
+
+class TestThresholdRules(unittest.TestCase):
+
+    METRICS = {
+        "disk_io": {"devices": [
+            {"device": "sda", "util_percent": 97.0, "await_ms": 60.0},
+            {"device": "sdb", "util_percent": 10.0, "await_ms": None}
+        ]},
+        "memory": {"swap": {"rates": {"swap_out_mb_per_sec": 6.5}}},
+        "network": {"interfaces": [
+            {"name": "eth0", "rates": {"errors_per_sec": 0.2}},
+            {"name": "eth1", "rates": {"errors_per_sec": 12.0}}
+        ]}
+    }
+
+    def _alerts(self, config=None):
+        return {(a["rule"], a.get("device") or a.get("interface")): a
+                for a in alerts.check_threshold_rules(self.METRICS, config or {})}
+
+    def test_limites_padrao(self):
+        found = self._alerts()
+        self.assertEqual({key: a["severity"] for key, a in found.items()}, {
+            ("disk_io_util", "sda"): "critical",
+            ("disk_io_await", "sda"): "warning",
+            ("swap_out_rate", None): "warning",
+            ("network_error_rate", "eth1"): "critical"
+        })
+        util = found[("disk_io_util", "sda")]
+        self.assertEqual((util["category"], util["value"], util["threshold"]), ("disk_io", 97.0, 95))
+        self.assertEqual(util["message"], "Disco sda saturado: 97.0% de utilização")
+
+    def test_limites_da_configuracao(self):
+        config = {"thresholds": {"disk_io_util_critical": 99, "disk_io_await_warning": 100,
+                                 "swap_out_rate_warning": 10.0}}
+        found = self._alerts(config)
+        self.assertEqual(found[("disk_io_util", "sda")]["severity"], "warning")
+        self.assertNotIn(("disk_io_await", "sda"), found)
+        self.assertNotIn(("swap_out_rate", None), found)
+
+    def test_so_as_regras_da_tabela(self):
+        metrics = dict(self.METRICS, disk={"partitions": [{"mountpoint": "/", "percent_used": 99.0}]})
+        rules = {a["rule"] for a in alerts.check_threshold_rules(metrics, {})}
+        self.assertTrue(rules <= set(alerts.TABLE_RULES))
+
+
+if __name__ == "__main__":
+    unittest.main()
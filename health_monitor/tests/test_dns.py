@@ -0,0 +1,139 @@
+"""
+Testes da verificação de DNS (network.get_dns_info) contra um servidor DNS falso em 127.0.0.x
+"""
+import socket
+import struct
+import sys
+import threading
+import time
+import unittest
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from modules import network  # noqa: E402
+
+
+class StubDNSServer(threading.Thread):
+    """Servidor DNS UDP mínimo: responde conforme o nome consultado.
+
+    `ok.test` -> um registro A, `nx.test` -> NXDOMAIN, `mudo.test` -> sem resposta.
+    """
+
+    def __init__(self, address: str, port: int = 0, delay: float = 0.0):
+        super().__init__(daemon=True)
+        self.delay = delay
+        self.queries = 0
+        self.sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.sock.bind((address, port))
+        self.sock.settimeout(0.05)
+        self.port = self.sock.getsockname()[1]
+        self._stop_event = threading.Event()
+
+    def stop(self):
+        self._stop_event.set()
+        self.join()
+        self.sock.close()
+
+    def run(self):
+        while not self._stop_event.is_set():
+            try:
+                data, addr = self.sock.recvfrom(512)
+            except socket.timeout:
+                continue
+            self.queries += 1
+            response = self._response(data)
+            if response is not None:
+                time.sleep(self.delay)
+                self.sock.sendto(response, addr)
+
+    @staticmethod
+    def _qname(data: bytes) -> str:
+        labels, offset = [], 12
+        while data[offset]:
+            length = data[offset]
+            labels.append(data[offset + 1:offset + 1 + length].decode())
+            offset += length + 1
+        return '.'.join(labels)
+
+    def _response(self, data: bytes):
+        query_id = struct.unpack('!H', data[:2])[0]
+        question = data[12:]
+        name = self._qname(data)
+        if name == 'mudo.test':
+            return None
+        if name == 'nx.test':
+            return struct.pack('!HHHHHH', query_id, 0x8183, 1, 0, 0, 0) + question
+        answer = struct.pack('!HHHIH', 0xC00C, 1, 1, 60, 4) + socket.inet_aton('10.0.0.1')
+        return struct.pack('!HHHHHH', query_id, 0x8180, 1, 1, 0, 0) + question + answer
+
+
+class TestGetDnsInfo(unittest.TestCase):
+
+    def setUp(self):
+        self.rapido = StubDNSServer('127.0.0.1')
+        try:
+            # Mesma porta em outro endereço de loopback (get_dns_info usa uma porta para todos)
+            self.lento = StubDNSServer('127.0.0.2', self.rapido.port, delay=0.2)
+        except OSError as e:
+            self.rapido.sock.close()
+            self.skipTest(f"127.0.0.2 indisponível: {e}")
+        self.rapido.start()
+        self.lento.start()
+        self.port = self.rapido.port
+
+    def tearDown(self):
+        self.rapido.stop()
+        self.lento.stop()
+
+    def test_resposta_com_registro(self):
+        info = network.get_dns_info(['ok.test'], timeout=1, nameservers=['127.0.0.1'], port=self.port)
+
+        self.assertTrue(info["can_resolve"])
+        self.assertEqual(info["nameservers"], ['127.0.0.1'])
+        query = info["queries"][0]
+        self.assertTrue(query["resolved"])
+        self.assertEqual(query["rcode"], 0)
+        self.assertEqual(query["answers"], 1)
+        self.assertIsNotNone(query["latency_ms"])
+
+    def test_nxdomain(self):
+        info = network.get_dns_info(['nx.test'], timeout=1, nameservers=['127.0.0.1'], port=self.port)
+
+        self.assertFalse(info["can_resolve"])
+        query = info["queries"][0]
+        self.assertFalse(query["resolved"])
+        self.assertEqual(query["rcode"], 3)
+        self.assertEqual(query["answers"], 0)
+        # NXDOMAIN é uma resposta: o nameserver está respondendo
+        self.assertTrue(info["per_nameserver"][0]["responding"])
+
+    def test_tempo_limite(self):
+        start = time.monotonic()
+        info = network.get_dns_info(['mudo.test'], timeout=0.3, nameservers=['127.0.0.1'], port=self.port)
+
+        self.assertLess(time.monotonic() - start, 1.0)
+        self.assertFalse(info["can_resolve"])
+        query = info["queries"][0]
+        self.assertIsNone(query["latency_ms"])
+        self.assertIn("0.3", query["error"])
+        self.assertFalse(info["per_nameserver"][0]["responding"])
+
+    def test_latencia_por_nameserver(self):
+        info = network.get_dns_info(['ok.test', 'nx.test'], timeout=1,
+                                    nameservers=['127.0.0.1', '127.0.0.2'], port=self.port)
+
+        self.assertEqual(len(info["queries"]), 4)
+        por_ns = {ns["nameserver"]: ns for ns in info["per_nameserver"]}
+        for ns in ('127.0.0.1', '127.0.0.2'):
+            self.assertTrue(por_ns[ns]["responding"])
+            self.assertEqual(por_ns[ns]["resolved"], 1)
+            self.assertEqual(por_ns[ns]["failed"], 1)
+        self.assertGreaterEqual(por_ns['127.0.0.2']["latency_avg_ms"], 200)
+        self.assertLess(por_ns['127.0.0.1']["latency_avg_ms"], por_ns['127.0.0.2']["latency_avg_ms"])
+        self.assertEqual(self.rapido.queries, 2)
+        self.assertEqual(self.lento.queries, 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,124 @@
+"""
+Testes do texto de exposição do exportador (formatos 0.0.4 e OpenMetrics)
+"""
+import sys
+import unittest
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from modules import exporter  # noqa: E402
+
+
+REPORT = {
+    "hostname": "srv01",
+    "metrics": {
+        "cpu": {"usage": {"percent_total": 12.5, "percent_per_core": [10.0, 15.0]}},
+        "disk": {"partitions": [{"mountpoint": "/", "percent_used": 40}]},
+        "logs": {"errors_total": 3, "by_unit": {"ssh.service": 2}},
+        "system": {"info": {"kernel": "6.1.0", "architecture": "x86_64"}}
+    },
+    "summary": {"health_status": "healthy", "total_alerts": 0}
+}
+
+GOLDEN_OPENMETRICS = """\
+# TYPE health_cpu_usage_percent_per_core gauge
+health_cpu_usage_percent_per_core{core="0"} 10.0
+health_cpu_usage_percent_per_core{core="1"} 15.0
+# TYPE health_cpu_usage_percent_total_value gauge
+health_cpu_usage_percent_total_value 12.5
+# TYPE health_disk_partitions_percent_used gauge
+health_disk_partitions_percent_used{mountpoint="/"} 40.0
+# TYPE health_logs_errors_total_value gauge
+health_logs_errors_total_value 3.0
+# TYPE health_summary_total_alerts gauge
+health_summary_total_alerts 0.0
+# TYPE health_host info
+health_host_info{hostname="srv01",kernel="6.1.0",architecture="x86_64"} 1
+# TYPE health_collector_duration_seconds histogram
+# UNIT health_collector_duration_seconds seconds
+health_collector_duration_seconds_bucket{collector="cpu",le="0.1"} 0
+health_collector_duration_seconds_bucket{collector="cpu",le="1.0"} 1
+health_collector_duration_seconds_bucket{collector="cpu",le="+Inf"} 1
+health_collector_duration_seconds_count{collector="cpu"} 1
+health_collector_duration_seconds_sum{collector="cpu"} 0.5
+# EOF
+"""
+
+GOLDEN_TEXT = """\
+# TYPE health_cpu_usage_percent_per_core gauge
+health_cpu_usage_percent_per_core{core="0"} 10.0
+health_cpu_usage_percent_per_core{core="1"} 15.0
+# TYPE health_cpu_usage_percent_total_value gauge
+health_cpu_usage_percent_total_value 12.5
+# TYPE health_disk_partitions_percent_used gauge
+health_disk_partitions_percent_used{mountpoint="/"} 40.0
+# TYPE health_logs_errors_total_value gauge
+health_logs_errors_total_value 3.0
+# TYPE health_summary_total_alerts gauge
+health_summary_total_alerts 0.0
+# TYPE health_host_info gauge
+health_host_info{hostname="srv01",kernel="6.1.0",architecture="x86_64"} 1
+# TYPE health_collector_duration_seconds histogram
+health_collector_duration_seconds_bucket{collector="cpu",le="0.1"} 0
+health_collector_duration_seconds_bucket{collector="cpu",le="1.0"} 1
+health_collector_duration_seconds_bucket{collector="cpu",le="+Inf"} 1
+health_collector_duration_seconds_count{collector="cpu"} 1
+health_collector_duration_seconds_sum{collector="cpu"} 0.5
+"""
+
+
+def _families():
+    histogram = exporter.Histogram(buckets=(0.1, 1.0))
+    histogram.observe("cpu", 0.5)
+    return exporter.report_families(REPORT) + [histogram.family("health_collector_duration_seconds", "collector")]
+
+
+class TestRenderFamilies(unittest.TestCase):
+
+    def test_golden_openmetrics(self):
+        self.assertEqual(exporter.render_families(_families()).decode("utf-8"), GOLDEN_OPENMETRICS)
+
+    def test_golden_texto_0_0_4(self):
+        self.assertEqual(exporter.render_families(_families(), openmetrics=False).decode("utf-8"), GOLDEN_TEXT)
+
+    def test_snapshot_vazio(self):
+        self.assertEqual(exporter.render_families([]), b"# EOF\n")
+        self.assertEqual(exporter.render_families([], openmetrics=False), b"\n")
+
+    def test_valores_especiais_e_labels_escapados(self):
+        labels = exporter._format_labels([("name", 'a"b')])
+        family = ("health_x", "gauge", None, [
+            f"health_x{labels} {exporter._format_value(float('nan'))}",
+            f"health_x {exporter._format_value(float('-inf'))}"
+        ])
+        self.assertEqual(exporter.render_families([family], openmetrics=False),
+                         b'# TYPE health_x gauge\nhealth_x{name="a\\"b"} NaN\nhealth_x -Inf\n')
+
+
+class TestPathToSeries(unittest.TestCase):
+
+    def test_lista_vira_label(self):
+        self.assertEqual(exporter.path_to_series("disk.partitions[/boot].percent_used"),
+                         ("health_disk_partitions_percent_used", [("mountpoint", "/boot")]))
+
+    def test_sufixos_reservados_sao_renomeados(self):
+        for path, expected in (("logs.errors_total", "health_logs_errors_total_value"),
+                               ("cpu.core_count", "health_cpu_core_count_value"),
+                               ("x.latency_sum", "health_x_latency_sum_value"),
+                               ("x.le_bucket", "health_x_le_bucket_value"),
+                               ("x.start_created", "health_x_start_created_value"),
+                               ("system.host_info", "health_system_host_info_value")):
+            with self.subTest(path=path):
+                self.assertEqual(exporter.path_to_series(path)[0], expected)
+
+    def test_nomes_sem_sufixo_reservado_ficam_iguais(self):
+        self.assertEqual(exporter.path_to_series("logs.totals")[0], "health_logs_totals")
+        self.assertEqual(exporter.path_to_series("network.dns.count_ok")[0], "health_network_dns_count_ok")
+
+    def test_chaves_dinamicas_sao_ignoradas(self):
+        self.assertIsNone(exporter.path_to_series("logs.by_unit.ssh.service"))
+
+
+if __name__ == "__main__":
+    unittest.main()
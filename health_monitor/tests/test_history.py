@@ -0,0 +1,154 @@
+"""
+Testes do histórico de métricas (history) em um banco SQLite temporário
+"""
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from modules import history  # noqa: E402
+
+
+# Início de uma hora cheia (múltiplo de 3600)
+HOUR = 1760000400
+
+
+def _report(ts, ram, host="srv01", disk_root=50.0):
+    return {
+        "hostname": host,
+        "timestamp_unix": ts,
+        "metrics": {
+            "memory": {"ram": {"percent_used": ram}},
+            "disk": {"partitions": [{"mountpoint": "/", "percent_used": disk_root},
+                                    {"mountpoint": "/home", "percent_used": 20.0}]},
+            "system": {"top_cpu_usage": [{"name": "python", "cpu_percent": 99.0}]}
+        },
+        "summary": {"total_alerts": 1}
+    }
+
+
+class _HistoryTestCase(unittest.TestCase):
+
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.config = {"state_dir": tmp.name, "history": {"path": "history.db"}}
+        self.now = HOUR + 7200
+
+        clock = mock.Mock()
+        clock.time.side_effect = lambda: self.now
+        patcher = mock.patch.object(history, "time", clock)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def _count(self, table):
+        conn = history.connect(self.config)
+        try:
+            return conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+        finally:
+            conn.close()
+
+
+class TestStoreAndQuery(_HistoryTestCase):
+
+    def setUp(self):
+        super().setUp()
+        # Três amostras no primeiro minuto, uma no segundo, uma na hora seguinte
+        for offset, ram in ((0, 40.0), (20, 50.0), (40, 90.0), (60, 30.0), (3600, 70.0)):
+            history.store_report(_report(HOUR + offset, ram), self.config)
+
+    def test_store_report_grava_pontos_numericos(self):
+        points = history.store_report(_report(HOUR + 3660, 10.0, host="srv02"), self.config)
+        # ram, duas partições e total_alerts; rankings ficam de fora
+        self.assertEqual(points, 4)
+        self.assertTrue(history.get_history_path(self.config).exists())
+
+    def test_query_raw(self):
+        rows = history.query_range(self.config, "memory.ram.percent_used", HOUR, HOUR + 60)
+        self.assertEqual([(r["ts"], r["value"]) for r in rows],
+                         [(HOUR, 40.0), (HOUR + 20, 50.0), (HOUR + 40, 90.0), (HOUR + 60, 30.0)])
+        self.assertEqual(rows[0]["host"], "srv01")
+
+    def test_rollup_1m_faz_upsert_do_bucket(self):
+        rows = history.query_range(self.config, "memory.ram.percent_used", HOUR, HOUR + 119, resolution="1m")
+        self.assertEqual(rows, [
+            {"host": "srv01", "metric": "memory.ram.percent_used", "ts": HOUR,
+             "avg": 60.0, "min": 40.0, "max": 90.0, "count": 3},
+            {"host": "srv01", "metric": "memory.ram.percent_used", "ts": HOUR + 60,
+             "avg": 30.0, "min": 30.0, "max": 30.0, "count": 1}
+        ])
+
+    def test_rollup_1h_inclui_o_bucket_que_contem_o_inicio(self):
+        rows = history.query_range(self.config, "memory.ram.percent_used", HOUR + 30, HOUR + 3600,
+                                   resolution="1h")
+        self.assertEqual([(r["ts"], r["count"], r["min"], r["max"]) for r in rows],
+                         [(HOUR, 4, 30.0, 90.0), (HOUR + 3600, 1, 70.0, 70.0)])
+        self.assertAlmostEqual(rows[0]["avg"], 52.5)
+
+    def test_curinga_com_colchete_literal(self):
+        rows = history.query_range(self.config, "disk.partitions[*].percent_used", HOUR, HOUR)
+        self.assertEqual(sorted(r["metric"] for r in rows),
+                         ["disk.partitions[/].percent_used", "disk.partitions[/home].percent_used"])
+
+    def test_aggregate_raw_e_rollups_concordam(self):
+        for resolution in ("raw", "1m", "1h"):
+            with self.subTest(resolution=resolution):
+                key = "srv01:memory.ram.percent_used"
+                result = {func: history.aggregate(self.config, "memory.ram.percent_used", HOUR, HOUR + 3600,
+                                                  func, resolution=resolution)[key]
+                          for func in ("avg", "min", "max", "sum", "count")}
+                self.assertEqual(result, {"avg": 56.0, "min": 30.0, "max": 90.0, "sum": 280.0, "count": 5})
+
+    def test_filtro_de_host(self):
+        history.store_report(_report(HOUR, 99.0, host="srv02"), self.config)
+        result = history.aggregate(self.config, "memory.ram.percent_used", HOUR, HOUR, "max", host="srv02")
+        self.assertEqual(result, {"srv02:memory.ram.percent_used": 99.0})
+
+    def test_parametros_invalidos(self):
+        with self.assertRaises(ValueError):
+            history.query_range(self.config, "x", 0, 1, resolution="5m")
+        with self.assertRaises(ValueError):
+            history.aggregate(self.config, "x", 0, 1, func="median")
+
+
+class TestRetention(_HistoryTestCase):
+
+    def test_cada_resolucao_tem_sua_retencao(self):
+        retention = {"raw_hours": 1, "minute_days": 1, "hour_days": 2}
+        self.config["history"]["retention"] = retention
+        for ts in (HOUR - 3 * 86400, HOUR - 86400 - 60, HOUR):
+            history.store_report(_report(ts, 50.0), self.config)
+
+        conn = history.connect(self.config)
+        try:
+            history.apply_retention(conn, retention, force=True)
+            raw = sorted({row[0] for row in conn.execute("SELECT ts FROM samples")})
+            minute = sorted({row[0] for row in conn.execute("SELECT bucket FROM rollup_1m")})
+            hour = sorted({row[0] for row in conn.execute("SELECT bucket FROM rollup_1h")})
+        finally:
+            conn.close()
+
+        # now = HOUR + 2h: raw guarda 1 h, 1m guarda 1 dia, 1h guarda 2 dias
+        self.assertEqual(raw, [])
+        self.assertEqual(minute, [HOUR])
+        self.assertEqual(hour, [HOUR - 86400 - 3600, HOUR])
+
+    def test_limpeza_no_maximo_uma_vez_por_hora(self):
+        history.store_report(_report(HOUR, 50.0), self.config)
+        self.config["history"]["retention"] = {"raw_hours": 1}
+
+        # Última limpeza há menos de uma hora: pontos antigos continuam
+        self.now += 1800
+        history.store_report(_report(HOUR + 1, 50.0), self.config)
+        self.assertEqual(self._count("samples"), 8)
+
+        self.now += 1800
+        history.store_report(_report(HOUR + 2, 50.0), self.config)
+        self.assertEqual(self._count("samples"), 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
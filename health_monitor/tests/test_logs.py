@@ -0,0 +1,199 @@
+"""
+Testes da leitura do journal (logs.read_journal) com a saída do journalctl simulada
+"""
+import io
+import json
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from modules import logs, state  # noqa: E402
+
+
+def _entry(cursor, priority, unit="app.service", message="falha", ts="1761587832000000"):
+    return json.dumps({"__CURSOR": cursor, "PRIORITY": str(priority), "_SYSTEMD_UNIT": unit,
+                       "MESSAGE": message, "__REALTIME_TIMESTAMP": ts}) + "\n"
+
+
+class FakePopen:
+    """Substitui subprocess.Popen: cada chamada consome (linhas, código de saída) do roteiro"""
+
+    def __init__(self, script):
+        self.script = list(script)
+        self.commands = []
+
+    def __call__(self, cmd, **kwargs):
+        self.commands.append(cmd)
+        lines, returncode = self.script.pop(0)
+        return _FakeProcess(lines, returncode)
+
+
+class _FakeProcess:
+    """Processo que só é colhido no wait(): ao fim da saída, poll() ainda retorna None"""
+
+    def __init__(self, lines, returncode):
+        self.stdout = io.StringIO("".join(lines))
+        self.returncode = None
+        self._exit_code = returncode
+
+    def poll(self):
+        return self.returncode
+
+    def kill(self):
+        if self.returncode is None:
+            self._exit_code = -9
+
+    def wait(self):
+        self.returncode = self._exit_code
+        return self.returncode
+
+
+class _JournalTestCase(unittest.TestCase):
+
+    def _popen(self, *script):
+        popen = FakePopen(script)
+        patcher = mock.patch.object(logs.subprocess, "Popen", popen)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        return popen
+
+
+class TestCursor(_JournalTestCase):
+
+    def test_retoma_depois_do_cursor(self):
+        popen = self._popen(([_entry("c2", 3), _entry("c3", 4), _entry("c4", 6)], 0))
+        journal = logs.read_journal(cursor="c1")
+
+        cmd = popen.commands[0]
+        self.assertEqual(cmd[cmd.index("--after-cursor") + 1], "c1")
+        self.assertNotIn("--since", cmd)
+        # O cursor avança até a última entrada lida, mesmo de prioridade ignorada
+        self.assertEqual(journal["cursor"], "c4")
+        self.assertEqual((len(journal["errors"]), len(journal["warnings"])), (1, 1))
+
+    def test_sem_cursor_usa_janela_de_tempo(self):
+        popen = self._popen(([_entry("c1", 3)], 0))
+        journal = logs.read_journal(hours=6)
+        self.assertIn("--since", popen.commands[0])
+        self.assertNotIn("--after-cursor", popen.commands[0])
+        self.assertEqual(journal["cursor"], "c1")
+
+    def test_cursor_invalido_volta_para_a_janela(self):
+        popen = self._popen(([], 1), ([_entry("n1", 2), _entry("n2", 4)], 0))
+        journal = logs.read_journal(hours=6, cursor="rotacionado")
+
+        self.assertEqual(len(popen.commands), 2)
+        self.assertIn("--after-cursor", popen.commands[0])
+        self.assertIn("--since", popen.commands[1])
+        self.assertEqual(journal["cursor"], "n2")
+        self.assertEqual(journal["counts"]["errors_total"], 1)
+
+    def test_erro_depois_de_ler_entradas_nao_relê(self):
+        popen = self._popen(([_entry("c2", 3)], 1))
+        journal = logs.read_journal(cursor="c1")
+        self.assertEqual(len(popen.commands), 1)
+        self.assertEqual(journal["cursor"], "c2")
+
+    def test_get_journal_entries_salva_o_cursor(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        config = {"state_dir": tmp.name}
+
+        popen = self._popen(([_entry("c1", 3)], 0), ([_entry("c2", 4)], 0))
+        first = logs.get_journal_entries(config, 24, incremental=True)
+        self.assertEqual(first["mode"], "window")
+        self.assertEqual(state.load_state(config, "journal"), {"cursor": "c1"})
+
+        second = logs.get_journal_entries(config, 24, incremental=True)
+        self.assertEqual(second["mode"], "incremental")
+        self.assertIn("c1", popen.commands[1])
+        self.assertEqual(state.load_state(config, "journal"), {"cursor": "c2"})
+
+    def test_modo_janela_nao_usa_estado(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        config = {"state_dir": tmp.name}
+        state.save_state(config, "journal", {"cursor": "antigo"})
+
+        popen = self._popen(([_entry("c1", 3)], 0))
+        logs.get_journal_entries(config, 24, incremental=False)
+        self.assertNotIn("--after-cursor", popen.commands[0])
+        self.assertEqual(state.load_state(config, "journal"), {"cursor": "antigo"})
+
+
+class TestStreaming(_JournalTestCase):
+
+    def test_guarda_as_mais_recentes_e_conta_todas(self):
+        lines = [_entry(f"e{i}", i % 4, unit=f"unit{i % 25}", message=f"erro {i}") for i in range(120)]
+        lines += [_entry(f"w{i}", 4, unit="web.service", message=f"aviso {i}") for i in range(40)]
+        self._popen((lines, 0))
+
+        journal = logs.read_journal(max_errors=10, max_warnings=5)
+
+        self.assertEqual([e["message"] for e in journal["errors"]], [f"erro {i}" for i in range(110, 120)])
+        self.assertEqual([w["message"] for w in journal["warnings"]], [f"aviso {i}" for i in range(35, 40)])
+        counts = journal["counts"]
+        self.assertEqual((counts["errors_total"], counts["warnings_total"]), (120, 40))
+        self.assertEqual(counts["by_priority"], {"0": 30, "1": 30, "2": 30, "3": 30, "4": 40})
+        self.assertEqual(counts["units_total"], 26)
+        self.assertEqual(len(counts["by_unit"]), 20)
+        self.assertEqual(next(iter(counts["by_unit"])), "web.service")
+        self.assertFalse(counts["truncated"])
+
+    def test_formato_das_entradas(self):
+        self._popen(([_entry("c1", 2, message="x" * 500), _entry("c2", 4, unit="y.service")], 0))
+        journal = logs.read_journal()
+        error, warning = journal["errors"][0], journal["warnings"][0]
+        self.assertEqual(len(error["message"]), 200)
+        self.assertEqual((error["priority"], error["unit"], error["timestamp"]),
+                         ("2", "app.service", "1761587832000000"))
+        self.assertNotIn("priority", warning)
+
+    def test_linhas_invalidas_sao_ignoradas(self):
+        lines = ["não é json\n", '{"PRIORITY": "abc"}\n', "[1, 2]\n", "\n", _entry("c1", 3)]
+        self._popen((lines, 0))
+        journal = logs.read_journal()
+        self.assertEqual(journal["counts"]["errors_total"], 1)
+        self.assertEqual(journal["cursor"], "c1")
+
+    def test_codigo_de_saida_real_apos_o_fim_da_saida(self):
+        # O processo ainda não foi colhido quando a saída termina: não pode ser morto
+        self._popen(([_entry("c1", 3)], 0))
+        self.assertEqual(logs._stream_command(["journalctl"], 5, lambda line: None), (0, False))
+
+    def test_cursor_valido_sem_entradas_novas_nao_volta_para_a_janela(self):
+        popen = self._popen(([], 0))
+        self.assertEqual(logs.read_journal(cursor="c9")["cursor"], "c9")
+        self.assertEqual(len(popen.commands), 1)
+
+
+class TestStreamCommand(unittest.TestCase):
+
+    def test_linha_a_linha(self):
+        lines = []
+        returncode, timed_out = logs._stream_command(
+            [sys.executable, "-c", "import sys; print('a'); print('b'); sys.exit(3)"], 10, lines.append)
+        self.assertEqual((lines, returncode, timed_out), (["a\n", "b\n"], 3, False))
+
+    def test_tempo_limite_mata_o_processo(self):
+        lines = []
+        returncode, timed_out = logs._stream_command(
+            [sys.executable, "-c", "import time; print('a', flush=True); time.sleep(30)"], 0.5, lines.append)
+        self.assertTrue(timed_out)
+        self.assertNotEqual(returncode, 0)
+        self.assertEqual(lines, ["a\n"])
+
+    def test_timeout_com_saida_parcial_marca_truncated(self):
+        with mock.patch.object(logs, "_stream_command", return_value=(-9, True)):
+            journal = logs.read_journal(cursor="c1")
+        # Sem nova tentativa pela janela de tempo: o cursor continua o mesmo
+        self.assertEqual(journal["cursor"], "c1")
+        self.assertTrue(journal["counts"]["truncated"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,115 @@
+"""
+Testes da amostragem de processos (system.get_process_info) com processos falsos
+"""
+import sys
+import unittest
+from pathlib import Path
+from types import SimpleNamespace
+from unittest import mock
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from modules import system  # noqa: E402
+
+
+MB = 1024 ** 2
+
+
+def _proc(pid, name, cpu, rss_mb, io=None, fds=None, create_time=100.0):
+    """Processo como devolvido por psutil.process_iter(attrs, ad_value=None)"""
+    return SimpleNamespace(info={
+        "pid": pid,
+        "name": name,
+        "create_time": create_time,
+        "cpu_times": SimpleNamespace(user=cpu * 0.75, system=cpu * 0.25) if cpu is not None else None,
+        "memory_info": SimpleNamespace(rss=rss_mb * MB) if rss_mb is not None else None,
+        "io_counters": SimpleNamespace(read_bytes=io, write_bytes=0) if io is not None else None,
+        "num_fds": fds
+    })
+
+
+class TestGetProcessInfo(unittest.TestCase):
+
+    def setUp(self):
+        system._last_process_sample = None
+        self.addCleanup(setattr, system, "_last_process_sample", None)
+
+        self.snapshots = []
+        fake_psutil = mock.Mock()
+        fake_psutil.process_iter.side_effect = lambda attrs, ad_value: self.snapshots.pop(0)
+        fake_psutil.virtual_memory.return_value = SimpleNamespace(total=1000 * MB)
+        self.clock = mock.Mock()
+        for name, fake in (("psutil", fake_psutil), ("time", self.clock)):
+            patcher = mock.patch.object(system, name, fake)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def test_top_n_pelo_delta_entre_amostras(self):
+        before = [_proc(1, "init", 50.0, 10, io=0, fds=10),
+                  _proc(2, "worker", 10.0, 300, io=1000, fds=500),
+                  _proc(3, "idle", 5.0, 20, io=0, fds=3),
+                  _proc(4, "db", 100.0, 600, io=0, fds=None)]
+        # Dois segundos depois: worker usou 1,5 s de CPU; db, 0,5 s; init e idle nada
+        after = [_proc(1, "init", 50.0, 10, io=0, fds=10),
+                 _proc(2, "worker", 11.5, 300, io=41000, fds=500),
+                 _proc(3, "idle", 5.0, 20, io=0, fds=3),
+                 _proc(4, "db", 100.5, 600, io=2000, fds=None)]
+        self.snapshots = [before, after]
+        self.clock.monotonic.side_effect = [10.0, 12.0]
+
+        info = system.get_process_info({"monitoring": {"top_processes": 2, "process_sample_interval": 0.1}})
+
+        self.clock.sleep.assert_called_once_with(0.1)
+        self.assertEqual((info["total_processes"], info["sample_window_seconds"]), (4, 2.0))
+        self.assertEqual(info["top_cpu_usage"], [{"pid": 2, "name": "worker", "cpu_percent": 75.0},
+                                                 {"pid": 4, "name": "db", "cpu_percent": 25.0}])
+        self.assertEqual(info["top_memory_usage"], [
+            {"pid": 4, "name": "db", "memory_percent": 60.0, "rss_mb": 600.0},
+            {"pid": 2, "name": "worker", "memory_percent": 30.0, "rss_mb": 300.0}
+        ])
+        self.assertEqual(info["top_io_usage"], [{"pid": 2, "name": "worker", "io_bytes_per_sec": 20000.0},
+                                                {"pid": 4, "name": "db", "io_bytes_per_sec": 1000.0}])
+        # Sem acesso a num_fds (None) o processo conta como zero
+        self.assertEqual([p["pid"] for p in info["top_open_files"]], [2, 1])
+
+    def test_pid_reutilizado_nao_herda_contadores(self):
+        self.snapshots = [[_proc(7, "old", 1000.0, 10, create_time=100.0)],
+                          [_proc(7, "new", 1.0, 10, create_time=500.0)]]
+        self.clock.monotonic.side_effect = [0.0, 1.0]
+        info = system.get_process_info({})
+        self.assertEqual(info["top_cpu_usage"], [{"pid": 7, "name": "new", "cpu_percent": 0.0}])
+
+    def test_processo_sem_permissao(self):
+        self.snapshots = [[_proc(9, None, None, None)], [_proc(9, None, None, None)]]
+        self.clock.monotonic.side_effect = [0.0, 1.0]
+        info = system.get_process_info({})
+        self.assertEqual(info["top_cpu_usage"], [{"pid": 9, "name": "unknown", "cpu_percent": 0.0}])
+        self.assertEqual(info["top_memory_usage"][0]["rss_mb"], 0.0)
+        self.assertEqual(info["top_io_usage"][0]["io_bytes_per_sec"], 0.0)
+
+    def test_ciclo_seguinte_usa_amostra_anterior(self):
+        self.snapshots = [[_proc(1, "a", 1.0, 10)], [_proc(1, "a", 2.0, 10)], [_proc(1, "a", 6.0, 10)]]
+        self.clock.monotonic.side_effect = [0.0, 1.0, 5.0]
+        system.get_process_info({})
+        info = system.get_process_info({})
+        self.clock.sleep.assert_called_once()
+        self.assertEqual(info["sample_window_seconds"], 4.0)
+        self.assertEqual(info["top_cpu_usage"][0]["cpu_percent"], 100.0)
+
+    def test_top_n_com_muitos_processos(self):
+        before = [_proc(pid, f"p{pid}", 0.0, pid % 97) for pid in range(1, 501)]
+        after = [_proc(pid, f"p{pid}", (pid * 37 % 500) / 1000, pid % 97) for pid in range(1, 501)]
+        self.snapshots = [before, after]
+        self.clock.monotonic.side_effect = [0.0, 1.0]
+
+        info = system.get_process_info({"monitoring": {"top_processes": 5}})
+
+        expected = sorted(after, key=lambda p: p.info["cpu_times"].user + p.info["cpu_times"].system,
+                          reverse=True)[:5]
+        self.assertEqual([p["pid"] for p in info["top_cpu_usage"]], [p.info["pid"] for p in expected])
+        self.assertEqual(len(info["top_memory_usage"]), 5)
+        self.assertEqual(info["top_memory_usage"][0]["rss_mb"], 96.0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,104 @@
+"""
+Testes das taxas por segundo de contadores cumulativos (rates.compute_rates)
+"""
+import os
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from modules import rates, state  # noqa: E402
+
+
+class TestComputeRates(unittest.TestCase):
+
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.state_dir = Path(tmp.name)
+        self.config = {"state_dir": tmp.name}
+        self.state_file = self.state_dir / "rates_net.json"
+
+        rates._last_samples.clear()
+        self.addCleanup(rates._last_samples.clear)
+        patcher = mock.patch.object(rates, "_boot_time", return_value=1000)
+        self.boot_time = patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def _compute(self, counters, now, identities=None):
+        return rates.compute_rates(self.config, "net", counters, identities, now=now)
+
+    def _new_process(self):
+        """Simula uma nova execução pontual: sem amostra em memória"""
+        rates._last_samples.clear()
+
+    def test_primeira_amostra_e_delta(self):
+        result, sampling = self._compute({"eth0": {"rx": 100}}, now=10)
+        self.assertEqual(result, {"eth0": {"rx": None}})
+        self.assertEqual(sampling, {"sampling": "first_sample", "interval_seconds": None})
+
+        result, sampling = self._compute({"eth0": {"rx": 600}}, now=20)
+        self.assertEqual(result, {"eth0": {"rx": 50.0}})
+        self.assertEqual(sampling, {"sampling": "delta", "interval_seconds": 10})
+
+    def test_contador_reiniciado_nao_gera_taxa(self):
+        self._compute({"eth0": {"rx": 500, "tx": 10}}, now=10)
+        result, sampling = self._compute({"eth0": {"rx": 20, "tx": 30}}, now=20)
+        self.assertEqual(result, {"eth0": {"rx": None, "tx": 2.0}})
+        self.assertEqual(sampling["counter_resets"], 1)
+
+    def test_outro_boot_descarta_a_amostra_anterior(self):
+        self._compute({"eth0": {"rx": 100}}, now=10)
+        self.boot_time.return_value = 2000
+        result, sampling = self._compute({"eth0": {"rx": 50}}, now=20)
+        self.assertEqual(result, {"eth0": {"rx": None}})
+        self.assertEqual(sampling["sampling"], "first_sample")
+        self.assertNotIn("counter_resets", sampling)
+
+    def test_instancia_recriada_pelo_ifindex(self):
+        self._compute({"eth0": {"rx": 100}, "eth1": {"rx": 100}}, now=10, identities={"eth0": 2, "eth1": 3})
+        result, sampling = self._compute({"eth0": {"rx": 400}, "eth1": {"rx": 400}}, now=20,
+                                         identities={"eth0": 7, "eth1": 3})
+        self.assertEqual(result, {"eth0": {"rx": None}, "eth1": {"rx": 30.0}})
+        self.assertEqual(sampling["counter_resets"], 1)
+
+    def test_relogio_sem_avanco_nao_gera_taxa(self):
+        self._compute({"eth0": {"rx": 100}}, now=10)
+        result, sampling = self._compute({"eth0": {"rx": 200}}, now=10)
+        self.assertEqual(result, {"eth0": {"rx": None}})
+        self.assertEqual(sampling["sampling"], "first_sample")
+
+    def test_execucoes_pontuais_usam_o_estado_em_disco(self):
+        self._compute({"eth0": {"rx": 100}}, now=10)
+        self.assertEqual(state.load_state(self.config, "rates_net")["counters"], {"eth0": {"rx": 100}})
+
+        self._new_process()
+        result, _ = self._compute({"eth0": {"rx": 300}}, now=30)
+        self.assertEqual(result, {"eth0": {"rx": 10.0}})
+        self.assertEqual(state.load_state(self.config, "rates_net")["counters"], {"eth0": {"rx": 300}})
+
+    def test_amostra_em_memoria_nao_grava_em_disco(self):
+        self._compute({"eth0": {"rx": 100}}, now=10)
+        gravado = self.state_file.read_bytes()
+        os.utime(self.state_file, ns=(0, 0))
+
+        with mock.patch.object(rates.state, "save_state") as save_state:
+            for now in (20, 30, 40):
+                result, _ = self._compute({"eth0": {"rx": 100 + now}}, now=now)
+        save_state.assert_not_called()
+        self.assertEqual(result, {"eth0": {"rx": 1.0}})
+        self.assertEqual(self.state_file.read_bytes(), gravado)
+        self.assertEqual(self.state_file.stat().st_mtime_ns, 0)
+
+    def test_estado_ilegivel_conta_como_primeira_amostra(self):
+        self.state_file.write_text("{corrompido")
+        result, sampling = self._compute({"eth0": {"rx": 100}}, now=10)
+        self.assertEqual(result, {"eth0": {"rx": None}})
+        self.assertEqual(sampling["sampling"], "first_sample")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,163 @@
+"""
+Testes do compilador de expressões de regras (rule_expr)
+"""
+import sys
+import unittest
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from modules import alert_engine, rule_expr  # noqa: E402
+
+
+METRICS = {
+    "disk": {"partitions": [
+        {"mountpoint": "/", "percent_used": 95.0},
+        {"mountpoint": "/boot", "percent_used": 97.0},
+        {"mountpoint": "/data", "percent_used": 40.0},
+        {"mountpoint": "/tmp"}
+    ]},
+    "memory": {"ram": {"percent_used": 60.0}},
+    "network": {"interfaces": [
+        {"name": "eth0", "errors_in": 3, "errors_out": 9, "is_up": True},
+        {"name": "eth1", "errors_in": 50, "errors_out": 0, "is_up": False}
+    ]},
+    "cpu": {
+        "load_average": {"normalized_5min": 2.5},
+        "temperature": {"coretemp": [{"label": "Core 0", "current": 91.0}, {"label": "Core 1", "current": 60.0}]}
+    }
+}
+
+
+def _instances(text):
+    return [instance for instance, _ in rule_expr.CompiledExpression(text).evaluate(METRICS)]
+
+
+class TestConstrucoesRejeitadas(unittest.TestCase):
+
+    REJEITADAS = {
+        "atributo de constante": '"abc".__class__',
+        "atributo dunder em caminho": "disk.__class__ == 1",
+        "atributo privado em caminho": "disk.partitions[*]._x > 1",
+        "nome dunder": "__builtins__ > 0",
+        "subscrito com nome dunder": 'disk["__class__"]',
+        "subscrito de caminho": "disk.partitions[0].percent_used > 1",
+        "chamada não permitida": '__import__("os")',
+        "chamada open": 'open("/etc/passwd")',
+        "chamada getattr": 'getattr(disk, "partitions")',
+        "chamada com argumento nomeado": "round(cpu.load_average.normalized_5min, ndigits=1) > 1",
+        "chamada de método": "disk.partitions[*].mountpoint.startswith('/')",
+        "lambda": "(lambda: 1)() > 0",
+        "lambda solta": "lambda: disk",
+        "list comprehension": "[p for p in disk.partitions] == []",
+        "generator": "max(p for p in disk.partitions) > 0",
+        "dict comprehension": "{k: 1 for k in disk} == {}",
+        "potência": "2 ** 100000 > 1",
+        "condicional": "1 if disk else 0",
+        "bytes": 'b"x" == 1',
+        "walrus": "(x := 1) > 0",
+        "sintaxe inválida": "disk.partitions[*].percent_used >",
+        "campo sem origem iterada": "percent_used > 90",
+        "duas origens iteradas": "disk.partitions[*].percent_used > 1 and network.interfaces[*].errors_in > 1",
+    }
+
+    def test_construcoes_rejeitadas(self):
+        for descricao, texto in self.REJEITADAS.items():
+            with self.subTest(descricao):
+                with self.assertRaises(ValueError):
+                    rule_expr.CompiledExpression(texto)
+
+    def test_regra_sem_metrica(self):
+        for texto in ("1 > 0", "True", "abs(-3) == 3"):
+            with self.subTest(texto):
+                with self.assertRaises(ValueError) as contexto:
+                    alert_engine.ExpressionRule({"name": "constante", "expr": texto})
+                self.assertIn("sem métrica", str(contexto.exception))
+
+    def test_funcao_compilada_sem_builtins(self):
+        expression = rule_expr.CompiledExpression("cpu.load_average.normalized_5min > 1")
+        self.assertEqual(expression.function.__globals__["__builtins__"], {})
+
+
+class TestAvaliacao(unittest.TestCase):
+
+    def test_caminho_iterado_com_campos_do_item(self):
+        self.assertEqual(_instances('disk.partitions[*].percent_used > 90 and mountpoint != "/boot"'), ["/"])
+
+    def test_campo_ausente_nao_casa(self):
+        self.assertEqual(_instances("disk.partitions[*].percent_used < 50"), ["/data"])
+
+    def test_escalar_absoluto(self):
+        self.assertEqual(_instances("cpu.load_average.normalized_5min > 2"), [""])
+        self.assertEqual(_instances("cpu.load_average.normalized_5min > 3"), [])
+
+    def test_item_comparado_com_escalar(self):
+        self.assertEqual(_instances("disk.partitions[*].percent_used > memory.ram.percent_used"), ["/", "/boot"])
+
+    def test_funcoes_e_aritmetica(self):
+        self.assertEqual(_instances("network.interfaces[*].errors_in + errors_out > 10 and is_up"), ["eth0"])
+        self.assertEqual(_instances("network.interfaces[*].errors_in > 0 and max(errors_in, errors_out) > 20"), ["eth1"])
+        self.assertEqual(_instances("len(disk.partitions) == 4"), [""])
+
+    def test_chaves_de_dicionario_e_itens_de_lista(self):
+        self.assertEqual(_instances("cpu.temperature.*[*].current > 85"), ["coretemp[Core 0]"])
+
+    def test_marcadores_dentro_de_strings_sao_literais(self):
+        metrics = {"disk": {"partitions": [{"mountpoint": "[*]", "percent_used": 1}]}}
+        expression = rule_expr.CompiledExpression('disk.partitions[*].mountpoint == "[*]"')
+        self.assertEqual([i for i, _ in expression.evaluate(metrics)], ["[*]"])
+
+    def test_compute_retorna_none_em_erro(self):
+        expression = rule_expr.CompiledExpression("disk.partitions[*].percent_used / 0")
+        self.assertIsNone(expression.compute({"percent_used": 5}, ()))
+
+    def test_metadados_da_compilacao(self):
+        expression = rule_expr.CompiledExpression("disk.partitions[*].percent_used > memory.ram.percent_used")
+        self.assertEqual(expression.source, "disk.partitions[*]")
+        self.assertEqual(expression.roots, ["disk", "memory"])
+        self.assertEqual(expression.scalar_paths, [("memory", "ram", "percent_used")])
+        self.assertEqual(expression.fields, [("percent_used",)])
+
+    def test_compilacao_em_cache(self):
+        texto = "cpu.load_average.normalized_5min > 1.5"
+        self.assertIs(rule_expr.compile_expression(texto), rule_expr.compile_expression(texto))
+
+
+class TestRegraDeclarativaComEstado(unittest.TestCase):
+
+    def test_niveis_com_liberacao_no_motor(self):
+        spec = {
+            "name": "disco_cheio",
+            "category": "disk",
+            "key": "mountpoint",
+            "levels": [
+                {"severity": "critical", "expr": "disk.partitions[*].percent_used > 96",
+                 "clear": "percent_used < 90"},
+                {"severity": "warning", "expr": "disk.partitions[*].percent_used > 90",
+                 "clear": "percent_used < 85"}
+            ],
+            "message": "{mountpoint}: {value}%"
+        }
+        engine = alert_engine.AlertEngine([alert_engine.ExpressionRule(spec)])
+
+        def disk(value):
+            return {"disk": {"partitions": [{"mountpoint": "/", "percent_used": value}]}}
+
+        _, events = engine.evaluate(disk(97.0), [], now=1)
+        self.assertEqual([(e["event"], e["severity"]) for e in events], [("fired", "critical")])
+        self.assertEqual(events[0]["message"], "/: 97.0%")
+
+        # Entre a liberação do crítico (90) e o disparo (96): permanece crítico
+        _, events = engine.evaluate(disk(93.0), [], now=2)
+        self.assertEqual(events, [])
+
+        _, events = engine.evaluate(disk(88.0), [], now=3)
+        self.assertEqual([(e["event"], e["severity"]) for e in events], [("fired", "warning")])
+
+        active, events = engine.evaluate(disk(80.0), [], now=4)
+        self.assertEqual([(e["event"], e["severity"]) for e in events], [("resolved", "warning")])
+        self.assertEqual(active, [])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,109 @@
+"""
+Testes do cache de SMART (disk.get_smart_status) com o probe do smartctl substituído
+"""
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from modules import disk, state  # noqa: E402
+
+
+class TestSmartCache(unittest.TestCase):
+
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.config = {"state_dir": tmp.name, "monitoring": {"smart_cache_ttl_seconds": 600}}
+        self.state_file = Path(tmp.name) / "smart.json"
+        self.now = 10000.0
+        self.probes = []
+
+        self.list_disks = self._patch("_list_disks")
+        self.get_device_smart = self._patch("_get_device_smart")
+        # Relógio controlado só dentro do módulo disk
+        self.time = self._patch("time").time
+
+        self.list_disks.return_value = ["/dev/sda", "/dev/sdb"]
+        self.get_device_smart.side_effect = self._probe
+        self.time.side_effect = lambda: self.now
+
+    def _patch(self, name):
+        patcher = mock.patch.object(disk, name)
+        self.addCleanup(patcher.stop)
+        return patcher.start()
+
+    def _probe(self, device):
+        self.probes.append(device)
+        return {"device": device, "available": True, "health_status": "PASSED", "temperature": 35}
+
+    def _status(self):
+        return {entry["device"]: entry for entry in disk.get_smart_status(self.config)}
+
+    def test_primeira_coleta_consulta_todos_e_grava_cache(self):
+        status = self._status()
+        self.assertEqual(sorted(self.probes), ["/dev/sda", "/dev/sdb"])
+        self.assertEqual({d: (e["cached"], e["cache_age_seconds"]) for d, e in status.items()},
+                         {"/dev/sda": (False, 0), "/dev/sdb": (False, 0)})
+        saved = state.load_state(self.config, "smart")["devices"]
+        self.assertEqual(saved["/dev/sda"]["timestamp"], 10000.0)
+        self.assertNotIn("cached", saved["/dev/sda"]["result"])
+
+    def test_dentro_do_ttl_usa_cache_sem_regravar(self):
+        self._status()
+        mtime = self.state_file.stat().st_mtime_ns
+        self.probes.clear()
+
+        self.now += 120
+        with mock.patch.object(disk.state, "save_state") as save_state:
+            status = self._status()
+        self.assertEqual(self.probes, [])
+        save_state.assert_not_called()
+        self.assertEqual(self.state_file.stat().st_mtime_ns, mtime)
+        self.assertEqual({d: (e["cached"], e["cache_age_seconds"]) for d, e in status.items()},
+                         {"/dev/sda": (True, 120), "/dev/sdb": (True, 120)})
+        self.assertEqual(status["/dev/sda"]["temperature"], 35)
+
+    def test_ttl_expirado_consulta_de_novo(self):
+        self._status()
+        self.probes.clear()
+
+        self.now += 600
+        status = self._status()
+        self.assertEqual(sorted(self.probes), ["/dev/sda", "/dev/sdb"])
+        self.assertFalse(status["/dev/sda"]["cached"])
+        self.assertEqual(state.load_state(self.config, "smart")["devices"]["/dev/sda"]["timestamp"], 10600.0)
+
+    def test_disco_novo_consulta_so_ele_e_preserva_os_demais(self):
+        self._status()
+        self.probes.clear()
+
+        self.now += 60
+        self.list_disks.return_value = ["/dev/sda", "/dev/sdb", "/dev/sdc"]
+        status = self._status()
+        self.assertEqual(self.probes, ["/dev/sdc"])
+        self.assertEqual({d: e["cached"] for d, e in status.items()},
+                         {"/dev/sda": True, "/dev/sdb": True, "/dev/sdc": False})
+        saved = state.load_state(self.config, "smart")["devices"]
+        self.assertEqual({d: e["timestamp"] for d, e in saved.items()},
+                         {"/dev/sda": 10000.0, "/dev/sdb": 10000.0, "/dev/sdc": 10060.0})
+
+    def test_erro_nao_entra_no_cache(self):
+        self.get_device_smart.side_effect = lambda device: (
+            {"device": device, "error": "smartctl falhou"} if device == "/dev/sdb" else self._probe(device))
+        self._status()
+        self.assertEqual(list(state.load_state(self.config, "smart")["devices"]), ["/dev/sda"])
+
+        self.now += 60
+        self.get_device_smart.side_effect = self._probe
+        self.probes.clear()
+        status = self._status()
+        self.assertEqual(self.probes, ["/dev/sdb"])
+        self.assertTrue(status["/dev/sda"]["cached"])
+
+
+if __name__ == "__main__":
+    unittest.main()
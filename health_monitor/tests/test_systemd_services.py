@@ -0,0 +1,126 @@
+"""
+Testes da consulta em lote aos serviços systemd (system.get_systemd_services) com saída do systemctl simulada
+"""
+import subprocess
+import sys
+import unittest
+from pathlib import Path
+from unittest import mock
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from modules import system  # noqa: E402
+
+
+SHOW_OUTPUT = """\
+Id=sshd.service
+Names=sshd.service
+LoadState=loaded
+ActiveState=active
+SubState=running
+NRestarts=2
+MemoryCurrent=5242880
+CPUUsageNSec=1500000000
+
+Id=dbus-broker.service
+Names=dbus-broker.service dbus.service
+LoadState=loaded
+ActiveState=active
+SubState=running
+NRestarts=0
+MemoryCurrent=[not set]
+CPUUsageNSec=18446744073709551615
+
+Id=firewalld.service
+Names=firewalld.service
+LoadState=not-found
+ActiveState=inactive
+SubState=dead
+NRestarts=[not set]
+MemoryCurrent=[not set]
+CPUUsageNSec=[not set]
+"""
+
+
+def _unit_block(name):
+    return f"Id={name}\nNames={name}\nLoadState=loaded\nActiveState=active\nSubState=running\n"
+
+
+class TestParseSystemctlShow(unittest.TestCase):
+
+    def test_blocos_separados_por_linha_em_branco(self):
+        units = system._parse_systemctl_show(SHOW_OUTPUT)
+        self.assertEqual([u["Id"] for u in units], ["sshd.service", "dbus-broker.service", "firewalld.service"])
+        self.assertEqual(units[1]["Names"], "dbus-broker.service dbus.service")
+        self.assertEqual(units[2]["MemoryCurrent"], "[not set]")
+
+    def test_linhas_em_branco_extras_e_valor_com_igual(self):
+        units = system._parse_systemctl_show("\n\nId=a.service\nDescription=x=y\n\n\n\nId=b.service")
+        self.assertEqual(units, [{"Id": "a.service", "Description": "x=y"}, {"Id": "b.service"}])
+        self.assertEqual(system._parse_systemctl_show(""), [])
+
+    def test_parse_counter(self):
+        for value, expected in (("42", 42), ("0", 0), ("[not set]", None), ("", None), (None, None),
+                                (str(2**64 - 1), None), (str(2**64 - 2), 2**64 - 2)):
+            with self.subTest(value=value):
+                self.assertEqual(system._parse_counter(value), expected)
+
+
+class TestGetSystemdServices(unittest.TestCase):
+
+    def setUp(self):
+        patcher = mock.patch.object(system.subprocess, "run")
+        self.run = patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def _config(self, services):
+        return {"monitoring": {"systemd_services": services}}
+
+    def test_uma_consulta_com_aliases_e_contadores_ausentes(self):
+        self.run.return_value = mock.Mock(stdout=SHOW_OUTPUT, returncode=0)
+        services = {s["name"]: s for s in system.get_systemd_services(
+            self._config(["sshd", "dbus", "firewalld", "ausente.service"]))}
+
+        self.run.assert_called_once()
+        args = self.run.call_args[0][0]
+        self.assertEqual(args[args.index('--') + 1:],
+                         ["sshd.service", "dbus.service", "firewalld.service", "ausente.service"])
+
+        self.assertEqual(services["sshd"], {
+            "name": "sshd", "status": "active", "active": True, "sub_state": "running",
+            "load_state": "loaded", "restarts": 2, "memory_mb": 5.0, "cpu_seconds": 1.5
+        })
+        # dbus resolvido pelo alias de dbus-broker; UINT64_MAX e [not set] viram None
+        self.assertTrue(services["dbus"]["active"])
+        self.assertEqual((services["dbus"]["memory_mb"], services["dbus"]["cpu_seconds"]), (None, None))
+        self.assertEqual((services["firewalld"]["status"], services["firewalld"]["restarts"]), ("inactive", None))
+        self.assertEqual(services["ausente.service"], {"name": "ausente.service", "status": "unknown",
+                                                       "active": False})
+
+    def test_lotes_de_200_unidades(self):
+        names = [f"svc{i}" for i in range(450)]
+        self.run.side_effect = lambda args, **kwargs: mock.Mock(
+            stdout="\n".join(_unit_block(u) for u in args[args.index('--') + 1:]), returncode=0)
+
+        services = system.get_systemd_services(self._config(names))
+
+        self.assertEqual([len(c[0][0]) - c[0][0].index('--') - 1 for c in self.run.call_args_list], [200, 200, 50])
+        self.assertEqual([s["name"] for s in services], names)
+        self.assertTrue(all(s["active"] for s in services))
+
+    def test_falha_em_um_lote_nao_afeta_os_outros(self):
+        names = [f"svc{i}" for i in range(250)]
+        self.run.side_effect = [subprocess.TimeoutExpired("systemctl", 10),
+                                mock.Mock(stdout="".join(_unit_block(f"svc{i}.service") + "\n"
+                                                         for i in range(200, 250)), returncode=0)]
+        services = system.get_systemd_services(self._config(names))
+        self.assertEqual({s["status"] for s in services[:200]}, {"error"})
+        self.assertEqual({s["status"] for s in services[200:]}, {"active"})
+
+    def test_desativado(self):
+        self.assertEqual(system.get_systemd_services({"monitoring": {"check_systemd_services": False}}), [])
+        self.run.assert_not_called()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,365 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Análise local baseada em regras, sem uso da IA
+Preenche o mesmo schema JSON da análise do Gemini a partir das métricas e dos alertas do relatório
+"""
+
+
+PRIORIDADE_POR_SEVERIDADE = {"critical": "alta", "warning": "media"}
+
+# Categoria -> (título, impacto, solução) usados nos alertas
+_DETALHES_ALERTA = {
+    "disk": (
+        "Armazenamento",
+        "Disco cheio impede gravação de logs, atualizações e arquivos temporários, podendo derrubar serviços.",
+        "Identifique o que ocupa espaço com `sudo du -xh --max-depth=1 <ponto de montagem> | sort -h` e limpe logs antigos com `sudo journalctl --vacuum-time=7d`."
+    ),
+    "disk_io": (
+        "I/O de Disco",
+        "Disco saturado ou lento faz aplicações e o próprio sistema travarem esperando leituras e gravações.",
+        "Identifique os processos com mais I/O com `sudo iotop -o` e acompanhe o dispositivo com `iostat -x 1`."
+    ),
+    "memory": (
+        "Memória",
+        "Com pouca memória livre o sistema passa a usar swap e fica lento; no limite, o kernel encerra processos (OOM).",
+        "Veja os maiores consumidores com `ps aux --sort=-%mem | head` e reinicie ou ajuste os processos responsáveis."
+    ),
+    "cpu": (
+        "Processamento",
+        "Carga ou temperatura elevadas aumentam o tempo de resposta e podem reduzir a vida útil do hardware.",
+        "Acompanhe com `top` ou `htop` e verifique ventilação e processos travados em loop."
+    ),
+    "system": (
+        "Serviços do Sistema",
+        "Serviços parados podem deixar funcionalidades do sistema indisponíveis.",
+        "Liste as falhas com `systemctl --failed` e consulte os logs com `journalctl -u <serviço> -b`."
+    ),
+    "network": (
+        "Rede",
+        "Problemas de conectividade ou DNS afetam atualizações, sincronização de horário e acesso a serviços externos.",
+        "Verifique rotas e resolução com `ip route`, `resolvectl status` e `ping -c 3 <host>`."
+    ),
+}
+
+_SEM_DADOS = "Não há dados desta categoria no relatório."
+
+
+def _valido(dados):
+    """Verifica se a categoria foi coletada sem erro"""
+    return isinstance(dados, dict) and bool(dados) and "error" not in dados
+
+
+def _nivel(percentual, atencao=70, critico=90):
+    """Classifica um percentual em linguagem simples"""
+    if percentual >= critico:
+        return "em nível crítico"
+    if percentual >= atencao:
+        return "elevado, merece atenção"
+    return "tranquilo"
+
+
+def _alertas_da_categoria(alertas, categoria):
+    return [a for a in alertas if a.get("category") == categoria]
+
+
+def _gerar_cards(metricas, alertas, resumo):
+    """Cards principais do topo do relatório"""
+    cards = []
+
+    disco = metricas.get("disk", {})
+    particoes = disco.get("partitions", []) if _valido(disco) else []
+    if particoes:
+        maior = max(particoes, key=lambda p: p.get("percent_used", 0))
+        cards.append({
+            "icon": "💾",
+            "label": "Disco mais cheio",
+            "value": f"{maior.get('percent_used', 0)}%",
+            "subtext": f"{maior.get('mountpoint')} ({maior.get('free_gb', 0)} GB livres)"
+        })
+
+    memoria = metricas.get("memory", {})
+    if _valido(memoria):
+        ram = memoria.get("ram", {})
+        cards.append({
+            "icon": "🧠",
+            "label": "Memória RAM",
+            "value": f"{ram.get('percent_used', 0)}%",
+            "subtext": f"{ram.get('used_gb', 0)} GB de {ram.get('total_gb', 0)} GB"
+        })
+
+    cpu = metricas.get("cpu", {})
+    if _valido(cpu):
+        carga = cpu.get("load_average", {})
+        cards.append({
+            "icon": "⚡",
+            "label": "Carga da CPU (5 min)",
+            "value": f"{carga.get('5_min', 0)}",
+            "subtext": f"{carga.get('cpu_count', '?')} núcleo(s), {round(carga.get('normalized_5min', 0) * 100)}% da capacidade"
+        })
+
+    sistema = metricas.get("system", {})
+    if _valido(sistema):
+        info = sistema.get("info", {})
+        cards.append({
+            "icon": "⏱️",
+            "label": "Uptime",
+            "value": info.get("uptime_human", "N/A"),
+            "subtext": info.get("distribution", "")
+        })
+
+    cards.append({
+        "icon": "🚨",
+        "label": "Alertas",
+        "value": str(resumo.get("total_alerts", len(alertas))),
+        "subtext": f"{resumo.get('critical_alerts', 0)} crítico(s), {resumo.get('warning_alerts', 0)} aviso(s)"
+    })
+    return cards
+
+
+def _gerar_alertas(alertas):
+    """Converte os alertas do health_monitor no formato do template (críticos primeiro)"""
+    ordenados = sorted(alertas, key=lambda a: a.get("severity") != "critical")
+    resultado = []
+    for alerta in ordenados:
+        titulo, impacto, solucao = _DETALHES_ALERTA.get(
+            alerta.get("category"), ("Alerta", "Pode afetar a estabilidade do sistema.", "")
+        )
+        resultado.append({
+            "tipo": "critical" if alerta.get("severity") == "critical" else "warning",
+            "titulo": f"{titulo}: {alerta.get('message', '')}",
+            "descricao": alerta.get("message", ""),
+            "impacto": impacto,
+            "solucao": solucao,
+            "prioridade": PRIORIDADE_POR_SEVERIDADE.get(alerta.get("severity"), "baixa")
+        })
+    return resultado
+
+
+def _analisar_discos(disco, io=None):
+    if not _valido(disco):
+        return _SEM_DADOS
+    particoes = disco.get("partitions", [])
+    partes = []
+    if particoes:
+        maior = max(particoes, key=lambda p: p.get("percent_used", 0))
+        partes.append(
+            f"Foram verificadas {len(particoes)} partição(ões). A mais ocupada é {maior.get('mountpoint')}, "
+            f"com {maior.get('percent_used', 0)}% de uso ({maior.get('used_gb', 0)} GB de {maior.get('total_gb', 0)} GB), "
+            f"o que está {_nivel(maior.get('percent_used', 0), 80, 90)}."
+        )
+
+    inodes_altos = [i for i in disco.get("inodes", []) if i.get("percent_used", 0) >= 80]
+    if inodes_altos:
+        nomes = ", ".join(f"{i.get('mountpoint')} ({i.get('percent_used')}%)" for i in inodes_altos)
+        partes.append(f"Os inodes estão se esgotando em {nomes}: muitos arquivos pequenos podem impedir novas gravações mesmo com espaço livre.")
+    elif disco.get("inodes"):
+        partes.append("O uso de inodes está folgado em todas as partições.")
+
+    smart = [s for s in disco.get("smart_status", []) if "health_status" in s]
+    falhas = [s.get("device") for s in smart if s.get("health_status") == "FAILED"]
+    if falhas:
+        partes.append(f"O SMART reporta FALHA em {', '.join(falhas)}: faça backup imediatamente e planeje a troca do disco.")
+    elif smart:
+        partes.append(f"O SMART não aponta problemas nos {len(smart)} disco(s) verificados.")
+
+    dispositivos = [d for d in (io or {}).get("devices", []) if d.get("util_percent") is not None]
+    if _valido(io) and dispositivos:
+        mais_ocupado = max(dispositivos, key=lambda d: d["util_percent"])
+        partes.append(
+            f"No I/O, o dispositivo mais ocupado é {mais_ocupado.get('device')}, com {mais_ocupado['util_percent']}% "
+            f"de utilização e latência média de {mais_ocupado.get('await_ms')} ms, "
+            f"o que está {_nivel(mais_ocupado['util_percent'], 80, 95)}."
+        )
+    return "\n\n".join(partes) or _SEM_DADOS
+
+
+def _analisar_memoria(memoria):
+    if not _valido(memoria):
+        return _SEM_DADOS
+    ram = memoria.get("ram", {})
+    swap = memoria.get("swap", {})
+    texto = (
+        f"A RAM está com {ram.get('percent_used', 0)}% de uso ({ram.get('used_gb', 0)} GB de {ram.get('total_gb', 0)} GB), "
+        f"o que está {_nivel(ram.get('percent_used', 0), 80, 95)}. Há {ram.get('available_gb', 0)} GB disponíveis, "
+        f"contando {ram.get('cached_gb', 0)} GB de cache que o Linux libera automaticamente quando necessário."
+    )
+    if swap.get("total_gb"):
+        texto += (
+            f"\n\nA swap está com {swap.get('percent_used', 0)}% de uso ({swap.get('used_gb', 0)} GB de {swap.get('total_gb', 0)} GB), "
+            f"{_nivel(swap.get('percent_used', 0), 50, 80)}."
+        )
+    else:
+        texto += "\n\nNão há swap configurada."
+    return texto
+
+
+def _analisar_cpu(cpu):
+    if not _valido(cpu):
+        return _SEM_DADOS
+    carga = cpu.get("load_average", {})
+    uso = cpu.get("usage", {})
+    normalizada = carga.get("normalized_5min", 0)
+    partes = [
+        f"O load average dos últimos 5 minutos é {carga.get('5_min', 0)} para {carga.get('cpu_count', '?')} núcleo(s), "
+        f"ou seja, cerca de {round(normalizada * 100)}% da capacidade, o que está {_nivel(normalizada * 100, 100, 200)}."
+    ]
+    if "percent_total" in uso:
+        detalhes = f"O uso medido da CPU é de {uso['percent_total']}%"
+        if uso.get("iowait_percent", 0) >= 10:
+            detalhes += f", com {uso['iowait_percent']}% aguardando disco (I/O lento pode ser o gargalo)"
+        if uso.get("steal_percent", 0) >= 10:
+            detalhes += f", e {uso['steal_percent']}% de steal (a máquina virtual está disputando CPU com outras)"
+        partes.append(detalhes + ".")
+
+    temperatura = cpu.get("temperature", {})
+    leituras = [
+        leitura.get("current") for sensor in temperatura.values() if isinstance(sensor, list)
+        for leitura in sensor if leitura.get("current")
+    ] if isinstance(temperatura, dict) else []
+    if leituras:
+        partes.append(f"A temperatura máxima registrada é {max(leituras)}°C.")
+    return "\n\n".join(partes)
+
+
+def _analisar_sistema(sistema):
+    if not _valido(sistema):
+        return _SEM_DADOS
+    info = sistema.get("info", {})
+    processos = sistema.get("processes", {})
+    partes = [
+        f"O sistema {info.get('distribution', 'Linux')} (kernel {info.get('kernel', '?')}) está ligado há "
+        f"{info.get('uptime_human', '?')} e executa {processos.get('total_processes', '?')} processos."
+    ]
+
+    servicos = sistema.get("systemd_services", [])
+    inativos = [s.get("name") for s in servicos if not s.get("active")]
+    falhos = sistema.get("failed_services", [])
+    if falhos:
+        nomes = ", ".join(s.get("name", str(s)) if isinstance(s, dict) else str(s) for s in falhos)
+        partes.append(f"Há serviço(s) systemd com falha: {nomes}.")
+    if inativos:
+        partes.append(f"Dos {len(servicos)} serviços monitorados, não estão ativos: {', '.join(inativos)}.")
+    elif servicos:
+        partes.append(f"Todos os {len(servicos)} serviços monitorados estão ativos.")
+    return "\n\n".join(partes)
+
+
+def _analisar_rede(rede):
+    if not _valido(rede):
+        return _SEM_DADOS
+    partes = []
+    conectividade = rede.get("connectivity", [])
+    if conectividade:
+        alcancaveis = [c for c in conectividade if c.get("reachable")]
+        texto = f"{len(alcancaveis)} de {len(conectividade)} destino(s) testados responderam"
+        latencias = [c["latency_ms"] for c in alcancaveis if c.get("latency_ms") is not None]
+        if latencias:
+            texto += f", com latência média de {round(sum(latencias) / len(latencias), 1)} ms"
+        partes.append(texto + ".")
+
+    dns = rede.get("dns", {})
+    if dns:
+        if dns.get("can_resolve"):
+            partes.append("A resolução DNS está funcionando.")
+        else:
+            partes.append(f"A resolução DNS falhou (servidores: {', '.join(dns.get('nameservers', [])) or 'nenhum'}).")
+
+    interfaces = rede.get("interfaces", [])
+    if interfaces:
+        ativas = [i.get("name") for i in interfaces if i.get("is_up")]
+        partes.append(f"Interfaces ativas: {', '.join(ativas) or 'nenhuma'}.")
+    return "\n\n".join(partes) or _SEM_DADOS
+
+
+def _analisar_logs(logs):
+    if not _valido(logs):
+        return _SEM_DADOS
+    contagens = logs.get("journal_counts", {})
+    erros = contagens.get("errors_total", len(logs.get("errors", [])))
+    avisos = contagens.get("warnings_total", len(logs.get("warnings", [])))
+    partes = [
+        f"Nas últimas {logs.get('collection_period_hours', '?')} horas o journal registrou {erros} erro(s) e {avisos} aviso(s)."
+    ]
+    por_unidade = contagens.get("by_unit", {})
+    if por_unidade:
+        principais = ", ".join(f"{unidade} ({total})" for unidade, total in list(por_unidade.items())[:3])
+        partes.append(f"As unidades que mais geraram mensagens foram: {principais}.")
+    return "\n\n".join(partes)
+
+
+def _gerar_recomendacoes(alertas):
+    """Recomendações por categoria de alerta; sem alertas, apenas manutenção de rotina"""
+    comandos = {
+        "disk": ["sudo du -xh --max-depth=1 / | sort -h | tail", "sudo journalctl --vacuum-time=7d", "sudo dnf clean all"],
+        "memory": ["ps aux --sort=-%mem | head", "free -h"],
+        "cpu": ["top -o %CPU", "sensors"],
+        "system": ["systemctl --failed", "journalctl -p 3 -b"],
+        "network": ["ip route", "resolvectl status"],
+    }
+    recomendacoes = []
+    for categoria in ("disk", "memory", "cpu", "system", "network"):
+        da_categoria = _alertas_da_categoria(alertas, categoria)
+        if not da_categoria:
+            continue
+        critico = any(a.get("severity") == "critical" for a in da_categoria)
+        titulo, _, solucao = _DETALHES_ALERTA[categoria]
+        recomendacoes.append({
+            "prioridade": "alta" if critico else "media",
+            "titulo": f"Revisar {titulo.lower()}",
+            "descricao": f"{len(da_categoria)} alerta(s) nesta área. {solucao}",
+            "comandos": comandos[categoria]
+        })
+
+    recomendacoes.append({
+        "prioridade": "baixa",
+        "titulo": "Manutenção de rotina",
+        "descricao": "Mantenha o sistema atualizado e continue acompanhando os relatórios periódicos.",
+        "comandos": ["sudo dnf upgrade --refresh"]
+    })
+    return recomendacoes
+
+
+def gerar_analise_local(dados):
+    """Gera a análise completa a partir do relatório, sem chamar a IA"""
+    metricas = dados.get("metrics", {})
+    alertas = dados.get("alerts", [])
+    resumo = dados.get("summary", {})
+    status = resumo.get("health_status", "unknown")
+
+    estado = {
+        "healthy": "está saudável",
+        "warning": "precisa de atenção",
+        "critical": "está em estado crítico"
+    }.get(status, "está em estado desconhecido")
+
+    resumo_executivo = f"O sistema {dados.get('hostname', '')} {estado}, com {len(alertas)} alerta(s) ativo(s)."
+    if alertas:
+        categorias = sorted({a.get("category", "?") for a in alertas})
+        titulos = ", ".join(_DETALHES_ALERTA.get(c, (c,))[0].lower() for c in categorias)
+        resumo_executivo += f" Os problemas estão concentrados em: {titulos}."
+    else:
+        resumo_executivo += " Nenhuma métrica ultrapassou os limites configurados."
+    resumo_executivo += "\n\nEsta análise foi gerada localmente por regras, sem uso de IA."
+
+    if status == "critical":
+        conclusao = "Há problemas críticos que devem ser tratados imediatamente; comece pelos alertas de prioridade alta."
+    elif status == "warning":
+        conclusao = "O sistema funciona, mas alguns indicadores estão acima do ideal; trate os avisos antes que se agravem."
+    else:
+        conclusao = "Tudo dentro do esperado. Continue acompanhando os relatórios periódicos."
+
+    return {
+        "resumo_executivo": resumo_executivo,
+        "metricas_cards": _gerar_cards(metricas, alertas, resumo),
+        "alertas": _gerar_alertas(alertas),
+        "analise_discos": _analisar_discos(metricas.get("disk"), metricas.get("disk_io")),
+        "analise_memoria": _analisar_memoria(metricas.get("memory")),
+        "analise_cpu": _analisar_cpu(metricas.get("cpu")),
+        "analise_sistema": _analisar_sistema(metricas.get("system")),
+        "analise_rede": _analisar_rede(metricas.get("network")),
+        "analise_logs": _analisar_logs(metricas.get("logs")),
+        "recomendacoes": _gerar_recomendacoes(alertas),
+        "conclusao": conclusao
+    }
@@ -0,0 +1,154 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Cache local das análises da IA, endereçado pelo conteúdo do relatório
+Relatórios equivalentes (mesmos alertas e faixas de uso) reutilizam a análise anterior
+"""
+
+import hashlib
+import json
+import os
+import tempfile
+import time
+from pathlib import Path
+
+
+CACHE_DIR = Path(__file__).parent / "cache"
+
+# Campos que identificam o objeto de um alerta (o valor medido e a mensagem ficam de fora)
+_CAMPOS_IDENTIDADE = ("mountpoint", "device", "host", "service", "interface", "sensor", "rule")
+
+# Largura das faixas de percentual: uso de disco e memória muda devagar; CPU oscila mais
+_FAIXA_PERCENTUAL = 10
+_FAIXA_CPU = 25
+_FAIXA_CARGA = 0.5
+
+
+def _faixa(valor, largura):
+    """Agrupa o valor na faixa de largura fixa que o contém (ou None se ausente)"""
+    if isinstance(valor, bool) or not isinstance(valor, (int, float)):
+        return None
+    return round(valor // largura * largura, 2)
+
+
+def _assinatura_alertas(alertas):
+    """Severidade, categoria e identidade de cada alerta, em ordem estável"""
+    assinatura = []
+    for alerta in alertas or []:
+        identidade = [alerta.get(campo) for campo in _CAMPOS_IDENTIDADE]
+        assinatura.append([alerta.get("severity"), alerta.get("category")] + identidade)
+    return sorted(assinatura, key=lambda a: json.dumps(a))
+
+
+def _assinatura_metricas(metricas):
+    """Faixas grossas de percentual e estados discretos que orientam a análise"""
+    disco = metricas.get("disk") or {}
+    memoria = metricas.get("memory") or {}
+    cpu = metricas.get("cpu") or {}
+    sistema = metricas.get("system") or {}
+    rede = metricas.get("network") or {}
+    io = metricas.get("disk_io") or {}
+
+    return {
+        "erros": sorted(c for c, m in metricas.items() if isinstance(m, dict) and "error" in m),
+        "disco": {
+            p.get("mountpoint"): _faixa(p.get("percent_used"), _FAIXA_PERCENTUAL)
+            for p in disco.get("partitions", [])
+        },
+        "inodes": {
+            i.get("mountpoint"): _faixa(i.get("percent_used"), _FAIXA_PERCENTUAL)
+            for i in disco.get("inodes", [])
+        },
+        "smart": {
+            s.get("device"): s.get("health_status") or ("erro" if "error" in s else None)
+            for s in disco.get("smart_status", [])
+        },
+        "io": {
+            d.get("device"): _faixa(d.get("util_percent"), _FAIXA_PERCENTUAL)
+            for d in io.get("devices", [])
+        },
+        "ram": _faixa((memoria.get("ram") or {}).get("percent_used"), _FAIXA_PERCENTUAL),
+        "swap": _faixa((memoria.get("swap") or {}).get("percent_used"), _FAIXA_PERCENTUAL),
+        "cpu": _faixa((cpu.get("usage") or {}).get("percent_total"), _FAIXA_CPU),
+        "carga": _faixa((cpu.get("load_average") or {}).get("normalized_5min"), _FAIXA_CARGA),
+        "servicos_inativos": sorted(
+            s.get("name") or "" for s in sistema.get("systemd_services", []) if not s.get("active")
+        ),
+        "dns": (rede.get("dns") or {}).get("can_resolve"),
+        "conectividade": {
+            c.get("host"): c.get("reachable") for c in rede.get("connectivity", [])
+        },
+    }
+
+
+def assinatura_relatorio(dados):
+    """Resumo do relatório que define se uma análise anterior ainda vale.
+
+    Contém só o que guia a análise: status de saúde, alertas (severidade, categoria
+    e identidade) e faixas grossas de percentual. Contadores, taxas, latências,
+    conexões, contagem de processos e de logs ficam de fora, pois mudam a cada coleta.
+    """
+    return {
+        "hostname": dados.get("hostname"),
+        "status": (dados.get("summary") or {}).get("health_status"),
+        "alertas": _assinatura_alertas(dados.get("alerts")),
+        "metricas": _assinatura_metricas(dados.get("metrics") or {}),
+    }
+
+
+def chave_relatorio(dados):
+    """Calcula a chave de cache (hash da assinatura do relatório)"""
+    conteudo = json.dumps(assinatura_relatorio(dados), ensure_ascii=False, sort_keys=True,
+                          separators=(',', ':'), default=str)
+    return hashlib.sha256(conteudo.encode('utf-8')).hexdigest()
+
+
+def obter_analise(chave, ttl_segundos):
+    """Retorna (análise, idade em segundos) do cache, ou (None, None) se ausente/expirada"""
+    arquivo = CACHE_DIR / f"{chave}.json"
+    try:
+        with open(arquivo, 'r', encoding='utf-8') as f:
+            entrada = json.load(f)
+    except (OSError, ValueError):
+        return None, None
+
+    idade = time.time() - entrada.get("criado_em", 0)
+    if idade > ttl_segundos:
+        try:
+            arquivo.unlink()
+        except OSError:
+            pass
+        return None, None
+
+    # Marcar como usado recentemente (LRU pelo mtime)
+    try:
+        os.utime(arquivo)
+    except OSError:
+        pass
+
+    return entrada.get("analise"), int(idade)
+
+
+def salvar_analise(chave, analise, limite_entradas):
+    """Grava a análise no cache e remove as entradas menos usadas além do limite"""
+    CACHE_DIR.mkdir(parents=True, exist_ok=True)
+
+    fd, tmp_path = tempfile.mkstemp(prefix=".cache.", suffix=".tmp", dir=str(CACHE_DIR))
+    try:
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            json.dump({"criado_em": time.time(), "analise": analise}, f, ensure_ascii=False)
+        os.replace(tmp_path, CACHE_DIR / f"{chave}.json")
+    except Exception:
+        try:
+            os.unlink(tmp_path)
+        except OSError:
+            pass
+        raise
+
+    entradas = sorted(CACHE_DIR.glob("*.json"), key=lambda p: p.stat().st_mtime, reverse=True)
+    for antiga in entradas[limite_entradas:]:
+        try:
+            antiga.unlink()
+        except OSError:
+            pass
@@ -0,0 +1,222 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Compactação do relatório de saúde antes do envio à IA
+Resume logs repetidos, remove campos saudáveis ou estáticos e controla o orçamento de tokens
+"""
+
+import json
+import re
+
+
+# Heurística: ~4 caracteres por token para texto misto (JSON + português)
+CARACTERES_POR_TOKEN = 4
+
+_PADRAO_NUMEROS = re.compile(r'0x[0-9a-fA-F]+|\d+')
+_PADRAO_TIMESTAMP_KERNEL = re.compile(r'^\[[^\]]*\]\s*')
+
+# Campos estáticos que não ajudam a análise
+_CAMPOS_ESTATICOS = {"os_version", "architecture", "boot_time", "uptime_seconds", "os"}
+
+# Níveis de compactação aplicados em sequência até caber no orçamento:
+# (grupos de log por lista, incluir detalhes por núcleo/interface, itens por ranking)
+NIVEIS = (
+    (15, True, 5),
+    (8, True, 3),
+    (5, False, 3),
+    (3, False, 1),
+)
+
+
+def estimar_tokens(texto):
+    """Estima a quantidade de tokens de um texto"""
+    return max(1, len(texto) // CARACTERES_POR_TOKEN)
+
+
+def serializar(dados):
+    """Serializa em JSON compacto"""
+    return json.dumps(dados, ensure_ascii=False, separators=(',', ':'))
+
+
+def _limpar(valor):
+    """Arredonda números e remove campos vazios recursivamente"""
+    if isinstance(valor, float):
+        return round(valor, 1)
+    if isinstance(valor, dict):
+        limpo = {}
+        for chave, item in valor.items():
+            item = _limpar(item)
+            if item is None or item == [] or item == {} or item == "":
+                continue
+            limpo[chave] = item
+        return limpo
+    if isinstance(valor, list):
+        return [_limpar(item) for item in valor]
+    return valor
+
+
+def agrupar_mensagens(entradas, limite):
+    """Agrupa mensagens repetidas (ignorando números) e conta as ocorrências"""
+    grupos = {}
+
+    for entrada in entradas or []:
+        if isinstance(entrada, dict):
+            unidade = entrada.get('unit')
+            mensagem = entrada.get('message') or entrada.get('error', '')
+        else:
+            unidade = None
+            mensagem = _PADRAO_TIMESTAMP_KERNEL.sub('', str(entrada))
+
+        chave = (unidade, _PADRAO_NUMEROS.sub('#', mensagem))
+        grupo = grupos.get(chave)
+        if grupo is None:
+            grupo = grupos[chave] = {"unit": unidade, "message": mensagem, "count": 0}
+        grupo["count"] += 1
+
+    ordenados = sorted(grupos.values(), key=lambda g: g["count"], reverse=True)
+    return [{k: v for k, v in g.items() if v is not None} for g in ordenados[:limite]]
+
+
+def _compactar_rede(rede, detalhado):
+    """Remove endereços e detalhes de interfaces sem problemas"""
+    interfaces = []
+    for interface in rede.get("interfaces", []):
+        resumo = {"name": interface.get("name"), "is_up": interface.get("is_up")}
+        stats = interface.get("statistics", {})
+        # Com taxas, problemas são erros/descartes recentes (por segundo), não totais desde o boot
+        contadores = interface.get("rates") or stats
+        problemas = {k: v for k, v in contadores.items() if k.startswith(("errors", "drops")) and v}
+        if problemas:
+            resumo["problems"] = problemas
+        if detalhado:
+            resumo["speed_mbps"] = interface.get("speed_mbps")
+            resumo["traffic_mb"] = {k: v for k, v in stats.items() if k.startswith("bytes")}
+            if interface.get("rates"):
+                resumo["rates"] = interface["rates"]
+        interfaces.append(resumo)
+
+    dns = dict(rede.get("dns", {}))
+    dns.pop("queries", None)
+
+    compacto = dict(rede)
+    compacto["interfaces"] = interfaces
+    compacto["dns"] = dns
+    return compacto
+
+
+def _compactar_sistema(sistema, itens_ranking):
+    """Mantém só serviços com problema e reduz rankings de processos"""
+    compacto = dict(sistema)
+    compacto["info"] = {k: v for k, v in sistema.get("info", {}).items() if k not in _CAMPOS_ESTATICOS}
+
+    servicos = sistema.get("systemd_services", [])
+    compacto["systemd_services"] = [s for s in servicos if not s.get("active")]
+    compacto["services_active"] = sum(1 for s in servicos if s.get("active"))
+
+    processos = dict(sistema.get("processes", {}))
+    for chave, valor in processos.items():
+        if chave.startswith("top_") and isinstance(valor, list):
+            processos[chave] = valor[:itens_ranking]
+    compacto["processes"] = processos
+    return compacto
+
+
+def _compactar_disco(disco):
+    """Remove inodes folgados e metadados de cache SMART"""
+    compacto = dict(disco)
+    compacto["inodes"] = [i for i in disco.get("inodes", []) if i.get("percent_used", 0) >= 50 or "error" in i]
+    compacto["smart_status"] = [
+        {k: v for k, v in s.items() if k not in ("cached", "cache_age_seconds")}
+        for s in disco.get("smart_status", [])
+    ]
+    return compacto
+
+
+def _compactar_io(io, detalhado):
+    """Mantém só dispositivos com I/O no intervalo, com menos campos quando resumido"""
+    compacto = dict(io)
+    dispositivos = [d for d in io.get("devices", []) if d.get("util_percent") or d.get("in_flight")]
+    if not detalhado:
+        campos = ("device", "util_percent", "await_ms", "queue_depth")
+        dispositivos = [{k: v for k, v in d.items() if k in campos} for d in dispositivos]
+    compacto["devices"] = dispositivos
+    return compacto
+
+
+def _compactar_cpu(cpu, detalhado):
+    """Resume o uso por núcleo quando os detalhes não cabem"""
+    compacto = dict(cpu)
+    uso = dict(cpu.get("usage", {}))
+    por_nucleo = uso.pop("percent_per_core", None)
+    if por_nucleo:
+        if detalhado:
+            uso["percent_per_core"] = por_nucleo
+        else:
+            uso["percent_core_max"] = max(por_nucleo)
+    uso.pop("frequency_mhz", None)
+    compacto["usage"] = uso
+    return compacto
+
+
+def _compactar_logs(logs, limite_logs):
+    """Agrupa mensagens repetidas de cada lista de logs"""
+    compacto = {k: v for k, v in logs.items() if not isinstance(v, list)}
+    for chave in ("errors", "warnings", "boot_errors", "kernel_messages"):
+        if chave in logs:
+            compacto[chave] = agrupar_mensagens(logs[chave], limite_logs)
+
+    contagens = logs.get("journal_counts")
+    if contagens:
+        contagens = dict(contagens)
+        contagens["by_unit"] = dict(list(contagens.get("by_unit", {}).items())[:5])
+        compacto["journal_counts"] = contagens
+    return compacto
+
+
+def compactar_relatorio(dados, nivel=0):
+    """Gera uma versão resumida do relatório para o prompt"""
+    limite_logs, detalhado, itens_ranking = NIVEIS[min(nivel, len(NIVEIS) - 1)]
+    metricas = dados.get("metrics", {})
+
+    compactadores = {
+        "network": lambda m: _compactar_rede(m, detalhado),
+        "system": lambda m: _compactar_sistema(m, itens_ranking),
+        "disk": _compactar_disco,
+        "disk_io": lambda m: _compactar_io(m, detalhado),
+        "cpu": lambda m: _compactar_cpu(m, detalhado),
+        "logs": lambda m: _compactar_logs(m, limite_logs),
+    }
+
+    metricas_compactas = {}
+    for categoria, valores in metricas.items():
+        compactador = compactadores.get(categoria)
+        if compactador and isinstance(valores, dict) and "error" not in valores:
+            valores = compactador(valores)
+        metricas_compactas[categoria] = valores
+
+    return _limpar({
+        "hostname": dados.get("hostname"),
+        "timestamp": dados.get("timestamp"),
+        "summary": dados.get("summary"),
+        "alerts": [
+            {k: v for k, v in a.items() if k in ("severity", "category", "message")}
+            for a in dados.get("alerts", [])
+        ],
+        "metrics": metricas_compactas
+    })
+
+
+def compactar_com_orcamento(dados, orcamento_tokens):
+    """Compacta o relatório no menor nível que caiba no orçamento de tokens.
+
+    Retorna (texto JSON compacto, tokens estimados).
+    """
+    for nivel in range(len(NIVEIS)):
+        texto = serializar(compactar_relatorio(dados, nivel))
+        tokens = estimar_tokens(texto)
+        if tokens <= orcamento_tokens:
+            return texto, tokens
+
+    print(f"⚠️ Relatório compactado ainda excede o orçamento ({tokens} > {orcamento_tokens} tokens)")
+    return texto, tokens
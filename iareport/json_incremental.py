@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Leitura incremental do JSON retornado pela IA via streaming
+Entrega cada chave de primeiro nível assim que o valor correspondente termina de chegar
+"""
+
+import json
+import re
+
+
+# Texto aceito antes do objeto: espaços e uma cerca de markdown (```json), mesmo que parcial
+_PREFIXO_VALIDO = re.compile(r'\s*(`{1,3}(j(s(o(n)?)?)?)?\s*)?')
+
+
+class ErroJsonIncremental(ValueError):
+    """Resposta malformada detectada durante o streaming"""
+
+
+class LeitorJsonIncremental:
+    """Varre os trechos recebidos uma única vez, acompanhando strings e aninhamento.
+
+    Um membro de primeiro nível ("chave": valor) está completo quando aparece uma
+    vírgula ou o fechamento do objeto na profundidade 1; só então ele é parseado.
+    """
+
+    def __init__(self):
+        self.texto = ""
+        self.concluido = False
+        self._posicao = 0
+        self._profundidade = 0
+        self._em_string = False
+        self._escape = False
+        self._inicio_objeto = None
+        self._inicio_membro = None
+
+    def alimentar(self, trecho):
+        """Processa um novo trecho; retorna a lista de (chave, valor) completados por ele"""
+        self.texto += trecho
+        completos = []
+
+        while self._posicao < len(self.texto) and not self.concluido:
+            caractere = self.texto[self._posicao]
+
+            if self._inicio_objeto is None:
+                if caractere == '{':
+                    self._inicio_objeto = self._posicao
+                    self._inicio_membro = self._posicao + 1
+                    self._profundidade = 1
+            elif self._em_string:
+                if self._escape:
+                    self._escape = False
+                elif caractere == '\\':
+                    self._escape = True
+                elif caractere == '"':
+                    self._em_string = False
+            elif caractere == '"':
+                self._em_string = True
+            elif caractere in '{[':
+                self._profundidade += 1
+            elif caractere in '}]':
+                self._profundidade -= 1
+                if self._profundidade == 0:
+                    self._fechar_membro(self._posicao, completos)
+                    self.concluido = True
+            elif caractere == ',' and self._profundidade == 1:
+                self._fechar_membro(self._posicao, completos)
+                self._inicio_membro = self._posicao + 1
+
+            self._posicao += 1
+
+        if self._inicio_objeto is None and not _PREFIXO_VALIDO.fullmatch(self.texto):
+            raise ErroJsonIncremental(f"Resposta não começa com um objeto JSON: {self.texto[:80]!r}")
+
+        return completos
+
+    def _fechar_membro(self, fim, completos):
+        """Parseia o membro entre o início registrado e `fim`"""
+        membro = self.texto[self._inicio_membro:fim].strip()
+        if not membro:
+            return
+        try:
+            completos.extend(json.loads("{" + membro + "}").items())
+        except json.JSONDecodeError as e:
+            raise ErroJsonIncremental(f"Membro JSON inválido ({e.msg}): {membro[:80]!r}")
+
+    def finalizar(self):
+        """Confirma que o objeto foi fechado ao final do stream"""
+        if not self.concluido:
+            raise ErroJsonIncremental("Resposta terminou antes do fim do objeto JSON")
@@ -0,0 +1,257 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Modo em lote do AI Health Reporter
+Gera relatórios HTML para vários relatórios/hosts em paralelo, sem interação,
+com limite de concorrência, controle de taxa e retry com backoff na API
+"""
+
+import argparse
+import glob
+import html
+import random
+import re
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime
+from pathlib import Path
+
+import reportia
+
+
+# Códigos HTTP que justificam nova tentativa (limite de taxa e erros do servidor)
+CODIGOS_RETRY = {429, 500, 502, 503, 504}
+
+INDICE_FROTA = "indice_frota.html"
+
+# Ordem de exibição no índice: problemas primeiro
+_ORDEM_STATUS = {"critical": 0, "warning": 1, "unknown": 2, "healthy": 3}
+
+
+class LimitadorTaxa:
+    """Limita as requisições a N por minuto, distribuídas uniformemente entre as threads"""
+
+    def __init__(self, por_minuto):
+        self.intervalo = 60.0 / por_minuto if por_minuto > 0 else 0.0
+        self._proximo = 0.0
+        self._lock = threading.Lock()
+
+    def aguardar(self):
+        """Bloqueia até o próximo horário livre"""
+        with self._lock:
+            agora = time.monotonic()
+            horario = max(agora, self._proximo)
+            self._proximo = horario + self.intervalo
+        espera = horario - agora
+        if espera > 0:
+            time.sleep(espera)
+
+
+def _codigo_erro(erro):
+    """Obtém o código HTTP de uma exceção da API, se houver"""
+    for atributo in ("code", "status_code"):
+        codigo = getattr(erro, atributo, None)
+        if isinstance(codigo, int):
+            return codigo
+    return None
+
+
+def chamar_com_retry(funcao, limitador, tentativas=4, espera_base=2.0):
+    """Executa `funcao` respeitando o limitador; repete com backoff exponencial em 429/5xx"""
+    for tentativa in range(1, tentativas + 1):
+        limitador.aguardar()
+        try:
+            return funcao()
+        except Exception as e:
+            codigo = _codigo_erro(e)
+            if codigo not in CODIGOS_RETRY or tentativa == tentativas:
+                raise
+            espera = espera_base * 2 ** (tentativa - 1) * (1 + random.random())
+            print(f"⏳ API respondeu {codigo}, nova tentativa {tentativa + 1}/{tentativas} em {espera:.1f}s")
+            time.sleep(espera)
+
+
+def expandir_entradas(entradas):
+    """Converte diretórios, globs e arquivos em uma lista ordenada de relatórios"""
+    arquivos = []
+    for entrada in entradas:
+        caminho = Path(entrada)
+        if caminho.is_dir():
+            for extensao in reportia.EXTENSOES_RELATORIO:
+                arquivos.extend(caminho.glob(f"health_*{extensao}"))
+        elif any(c in entrada for c in "*?["):
+            arquivos.extend(Path(p) for p in glob.glob(entrada))
+        else:
+            arquivos.append(caminho)
+    return sorted(set(arquivos))
+
+
+def carregar_relatorios(arquivos, ultimo_por_host=False):
+    """Lê os relatórios; opcionalmente mantém só o mais recente de cada host"""
+    relatorios = []
+    for arquivo in arquivos:
+        dados = reportia.ler_json(arquivo)
+        if dados:
+            relatorios.append((arquivo, dados))
+
+    if ultimo_por_host:
+        por_host = {}
+        for arquivo, dados in relatorios:
+            host = dados.get("hostname", "N/A")
+            atual = por_host.get(host)
+            if atual is None or dados.get("timestamp_unix", 0) >= atual[1].get("timestamp_unix", 0):
+                por_host[host] = (arquivo, dados)
+        relatorios = list(por_host.values())
+
+    return relatorios
+
+
+def _nome_html(dados, arquivo):
+    """Nome do HTML de um relatório (host + relatório de origem)"""
+    host = re.sub(r'[^\w.-]', '_', str(dados.get("hostname", "host")))
+    return f"{host}_{reportia.nome_base_relatorio(arquivo)}.html"
+
+
+def processar_relatorio(arquivo, dados, diretorio_saida, limitador, tentativas, cliente=None, modo=None):
+    """Gera o HTML de um relatório; retorna o resumo usado no índice da frota"""
+    resumo = {
+        "arquivo": str(arquivo),
+        "hostname": dados.get("hostname", "N/A"),
+        "timestamp": dados.get("timestamp", "N/A"),
+        "health_status": dados.get("summary", {}).get("health_status", "unknown"),
+        "total_alerts": dados.get("summary", {}).get("total_alerts", 0),
+        "html": None,
+        "origem": None,
+        "erro": None
+    }
+
+    def gerar(prompt):
+        return chamar_com_retry(lambda: reportia.gerar_analise(prompt, cliente), limitador, tentativas)
+
+    try:
+        analise, origem, _ = reportia.analisar_relatorio(dados, gerar, modo, usar_ia=True if cliente else None)
+        if not analise:
+            resumo["erro"] = "resposta da IA inválida"
+            return resumo
+
+        html_content = reportia.preencher_template(analise, dados)
+        html_file = html_content and reportia.salvar_html(html_content, arquivo, diretorio_saida, _nome_html(dados, arquivo))
+        if not html_file:
+            resumo["erro"] = "falha ao gerar HTML"
+            return resumo
+
+        resumo["html"] = html_file.name
+        resumo["origem"] = origem
+    except Exception as e:
+        resumo["erro"] = str(e)
+
+    return resumo
+
+
+def gerar_indice_frota(resultados, diretorio_saida):
+    """Gera a página índice com o status de todos os hosts do lote"""
+    linhas = []
+    ordenados = sorted(resultados, key=lambda r: (_ORDEM_STATUS.get(r["health_status"], 2), r["hostname"]))
+    for r in ordenados:
+        _, icone, texto = reportia.STATUS_MAP.get(r["health_status"], reportia.STATUS_MAP["unknown"])
+        if r["html"]:
+            relatorio = f'<a href="{html.escape(r["html"])}">abrir</a> ({r["origem"]})'
+        else:
+            relatorio = f'❌ {html.escape(r["erro"] or "erro")}'
+        linhas.append(
+            f'<tr class="{html.escape(r["health_status"])}">'
+            f'<td>{html.escape(str(r["hostname"]))}</td>'
+            f'<td>{html.escape(str(r["timestamp"]))}</td>'
+            f'<td>{icone} {texto}</td>'
+            f'<td>{r["total_alerts"]}</td>'
+            f'<td>{relatorio}</td></tr>'
+        )
+
+    pagina = f"""<!DOCTYPE html>
+<html lang="pt-BR">
+<head>
+<meta charset="UTF-8">
+<title>Saúde da Frota</title>
+<style>
+body {{ font-family: sans-serif; margin: 2em; background: #f5f5f5; }}
+table {{ border-collapse: collapse; width: 100%; background: #fff; }}
+th, td {{ padding: 8px 12px; border-bottom: 1px solid #ddd; text-align: left; }}
+tr.critical td {{ background: #fde8e8; }}
+tr.warning td {{ background: #fff6db; }}
+</style>
+</head>
+<body>
+<h1>🏥 Saúde da Frota</h1>
+<p>Gerado em {datetime.now().strftime("%Y-%m-%d %H:%M:%S")} — {len(resultados)} relatório(s)</p>
+<table>
+<tr><th>Host</th><th>Coleta</th><th>Status</th><th>Alertas</th><th>Relatório</th></tr>
+{chr(10).join(linhas)}
+</table>
+</body>
+</html>
+"""
+    caminho = Path(diretorio_saida) / INDICE_FROTA
+    with open(caminho, 'w', encoding='utf-8') as f:
+        f.write(pagina)
+    return caminho
+
+
+def executar_lote(entradas, diretorio_saida=None, concorrencia=4, por_minuto=30,
+                  tentativas=4, ultimo_por_host=False, cliente=None, modo=None):
+    """Processa todos os relatórios das entradas e gera o índice da frota"""
+    diretorio_saida = Path(diretorio_saida or reportia.OUTPUT_DIR)
+    diretorio_saida.mkdir(parents=True, exist_ok=True)
+
+    relatorios = carregar_relatorios(expandir_entradas(entradas), ultimo_por_host)
+    if not relatorios:
+        print("❌ Nenhum relatório válido encontrado nas entradas")
+        return []
+
+    print(f"📂 {len(relatorios)} relatório(s) para analisar (concorrência: {concorrencia}, {por_minuto} req/min)")
+
+    limitador = LimitadorTaxa(por_minuto)
+    resultados = []
+    with ThreadPoolExecutor(max_workers=max(1, concorrencia)) as executor:
+        futures = [
+            executor.submit(processar_relatorio, arquivo, dados, diretorio_saida, limitador, tentativas, cliente, modo)
+            for arquivo, dados in relatorios
+        ]
+        for future in as_completed(futures):
+            resultado = future.result()
+            resultados.append(resultado)
+            if resultado["erro"]:
+                print(f"❌ {resultado['hostname']} ({resultado['arquivo']}): {resultado['erro']}")
+            else:
+                print(f"✅ {resultado['hostname']}: {resultado['html']} ({resultado['origem']})")
+
+    indice = gerar_indice_frota(resultados, diretorio_saida)
+    print(f"\n📋 Índice da frota: {indice}")
+    return resultados
+
+
+def main(argv=None):
+    """Ponto de entrada do modo em lote"""
+    parser = argparse.ArgumentParser(description="Gera relatórios HTML com IA para vários relatórios de saúde")
+    parser.add_argument("entradas", nargs="+", help="Arquivos, diretórios ou globs de relatórios")
+    parser.add_argument("-o", "--saida", help="Diretório dos HTMLs (padrão: exemplosdesaida/saidascomia)")
+    parser.add_argument("-c", "--concorrencia", type=int, default=4, help="Requisições simultâneas à API")
+    parser.add_argument("-r", "--por-minuto", type=int, default=30, help="Limite de requisições por minuto (0 = sem limite)")
+    parser.add_argument("-t", "--tentativas", type=int, default=4, help="Tentativas por relatório em erros 429/5xx")
+    parser.add_argument("--ultimo-por-host", action="store_true", help="Analisar só o relatório mais recente de cada host")
+    parser.add_argument("--modo", choices=reportia.MODOS_ANALISE, default=reportia.MODO_ANALISE,
+                        help="auto: IA só para estados degradados e novos; ia: sempre IA; local: só regras")
+    args = parser.parse_args(argv)
+
+    resultados = executar_lote(args.entradas, args.saida, args.concorrencia, args.por_minuto,
+                               args.tentativas, args.ultimo_por_host, modo=args.modo)
+    falhas = sum(1 for r in resultados if r["erro"])
+    if falhas:
+        print(f"⚠️ {falhas} relatório(s) com falha")
+    return 1 if not resultados or falhas else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Renderização do template HTML em uma única passada
+O template é compilado uma vez em trechos fixos e placeholders e mantido em cache pelo mtime
+"""
+
+import html
+import os
+import re
+import threading
+
+
+_PADRAO_PLACEHOLDER = re.compile(r'\{\{([A-Z_]+)\}\}')
+
+_cache = {}
+_cache_lock = threading.Lock()
+
+
+class Seguro(str):
+    """HTML confiável, inserido no template sem escape"""
+
+
+def escapar(valor):
+    """Escapa o valor para HTML, exceto se já for HTML confiável"""
+    if isinstance(valor, Seguro):
+        return valor
+    return html.escape(str(valor))
+
+
+def formatar_texto(texto):
+    """Converte texto simples em parágrafos HTML (linha em branco separa parágrafos)"""
+    if isinstance(texto, Seguro):
+        return texto
+    paragrafos = [p.strip() for p in re.split(r'\n\s*\n', str(texto)) if p.strip()]
+    return Seguro(''.join(
+        f"<p>{escapar(p).replace(chr(10), '<br>')}</p>" for p in paragrafos
+    ))
+
+
+class TemplateCompilado:
+    """Template dividido em trechos literais intercalados com nomes de placeholders"""
+
+    def __init__(self, texto):
+        partes = _PADRAO_PLACEHOLDER.split(texto)
+        self.literais = partes[0::2]
+        self.nomes = partes[1::2]
+
+    def renderizar(self, valores):
+        """Monta o documento; placeholders sem valor são mantidos como estão"""
+        saida = [self.literais[0]]
+        for nome, literal in zip(self.nomes, self.literais[1:]):
+            valor = valores.get(nome)
+            saida.append(f"{{{{{nome}}}}}" if valor is None else escapar(valor))
+            saida.append(literal)
+        return ''.join(saida)
+
+
+def carregar_template(caminho):
+    """Retorna o template compilado, recompilando apenas se o arquivo mudar"""
+    caminho = str(caminho)
+    mtime = os.stat(caminho).st_mtime_ns
+
+    with _cache_lock:
+        em_cache = _cache.get(caminho)
+        if em_cache and em_cache[0] == mtime:
+            return em_cache[1]
+
+    with open(caminho, 'r', encoding='utf-8') as f:
+        template = TemplateCompilado(f.read())
+
+    with _cache_lock:
+        _cache[caminho] = (mtime, template)
+    return template
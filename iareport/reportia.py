@@ -18,47 +18,207 @@ Analisa JSONs do health_monitor e gera relatórios HTML humanizados
 
 import os
 import sys
+import argparse
 import json
 import glob
+import gzip
+import time
 from pathlib import Path
 from datetime import datetime
-from google import genai
-from google.genai import types
 
-# Verificar se a chave da API está configurada
-api_key = os.getenv('GEMINI_API_KEY')
-if not api_key:
-    print("❌ ERRO: Variável GEMINI_API_KEY não encontrada!")
-    print("Configure com: export GEMINI_API_KEY='sua_chave_aqui'")
-    sys.exit(1)
+try:
+    from google import genai
+    from google.genai import types
+except ImportError:
+    genai = None
+    types = None
+
+from compactacao import compactar_com_orcamento, estimar_tokens
+from json_incremental import LeitorJsonIncremental
+from renderizador import Seguro, carregar_template, escapar, formatar_texto
+from analise_local import gerar_analise_local
+import cache_ia
 
-# Configurar cliente Gemini
-client = genai.Client(api_key=api_key)
+# Cliente Gemini (criado sob demanda; a análise local não depende dele)
+api_key = os.getenv('GEMINI_API_KEY')
+client = None
 model = "gemini-2.5-flash"
 
+# Origem da análise: auto (cache/local/IA conforme o estado), ia ou local
+MODOS_ANALISE = ("auto", "ia", "local")
+MODO_ANALISE = os.getenv('REPORTIA_MODO', 'auto')
+
 # Configurar caminhos relativos ao projeto
 SCRIPT_DIR = Path(__file__).parent
 PROJECT_ROOT = SCRIPT_DIR.parent
 REPORTS_DIR = PROJECT_ROOT / "exemplosdesaida" / "saidasraw"
 OUTPUT_DIR = PROJECT_ROOT / "exemplosdesaida" / "saidascomia"
 
+# Orçamento de tokens para os dados do relatório enviados no prompt
+TOKEN_BUDGET = int(os.getenv('REPORTIA_TOKEN_BUDGET', '6000'))
+
+# Cache de análises (0 desativa): validade em segundos e número máximo de entradas
+CACHE_TTL = int(os.getenv('REPORTIA_CACHE_TTL', '21600'))
+CACHE_MAX_ENTRADAS = int(os.getenv('REPORTIA_CACHE_MAX', '200'))
+
+
+# Extensões de relatório geradas pelo health_monitor (output_format)
+EXTENSOES_RELATORIO = (".json", ".ndjson", ".json.gz", ".json.zst", ".msgpack")
+
+
+# Índice mantido pelo health_monitor no diretório de relatórios
+INDEX_FILE = REPORTS_DIR / "index.ndjson"
+LATEST_FILE = REPORTS_DIR / "latest.json"
+
+# Status de saúde -> (classe CSS, ícone, texto)
+STATUS_MAP = {
+    'healthy': ('healthy', '🟢', 'Saudável'),
+    'warning': ('warning', '🟡', 'Atenção Necessária'),
+    'critical': ('critical', '🔴', 'Crítico'),
+    'unknown': ('warning', '❓', 'Desconhecido')
+}
+
 
 def obter_ultimo_json():
-    """Obtém o arquivo JSON mais recente do diretório de relatórios"""
-    json_files = glob.glob(str(REPORTS_DIR / "health_*.json"))
+    """Obtém o arquivo de relatório mais recente do diretório de relatórios"""
+    # Caminho rápido: ponteiro 'latest' gravado pelo health_monitor
+    try:
+        with open(LATEST_FILE, 'r', encoding='utf-8') as f:
+            latest_file = REPORTS_DIR / json.load(f)["file"]
+        if latest_file.exists():
+            return latest_file
+    except (OSError, ValueError, KeyError, TypeError):
+        pass
+    
+    # Sem índice: procurar no diretório
+    json_files = []
+    for extensao in EXTENSOES_RELATORIO:
+        json_files.extend(glob.glob(str(REPORTS_DIR / f"health_*{extensao}")))
     
     if not json_files:
         print(f"❌ Nenhum relatório encontrado em {REPORTS_DIR}")
         return None
     
-    # Pegar o arquivo mais recente
-    latest_file = max(json_files, key=os.path.getctime)
+    # Pegar o arquivo mais recente (arquivos NDJSON recebem novas linhas ao longo do dia)
+    latest_file = max(json_files, key=os.path.getmtime)
     return Path(latest_file)
 
 
-def ler_json(filepath):
-    """Lê e retorna o conteúdo do arquivo JSON"""
+def nome_base_relatorio(filepath):
+    """Nome do relatório sem a extensão (health_20251024_143000)"""
+    nome = Path(filepath).name
+    for extensao in sorted(EXTENSOES_RELATORIO, key=len, reverse=True):
+        if nome.endswith(extensao):
+            return nome[:-len(extensao)]
+    return Path(filepath).stem
+
+
+def _ultima_linha(filepath):
+    """Lê a última linha não vazia de um arquivo sem carregá-lo inteiro"""
+    with open(filepath, 'rb') as f:
+        f.seek(0, os.SEEK_END)
+        posicao = f.tell()
+        bloco = b''
+        while posicao > 0:
+            tamanho = min(8192, posicao)
+            posicao -= tamanho
+            f.seek(posicao)
+            bloco = f.read(tamanho) + bloco
+            linhas = bloco.rstrip(b'\n').split(b'\n')
+            if len(linhas) > 1 or posicao == 0:
+                return linhas[-1]
+    return b''
+
+
+def _entrada_a_partir_de(f, posicao):
+    """Retorna (entrada, próxima posição) da primeira linha que começa em `posicao` ou depois"""
+    if posicao > 0:
+        f.seek(posicao - 1)
+        f.readline()  # descartar o restante da linha parcial
+    else:
+        f.seek(0)
+    linha = f.readline()
+    # Linha sem '\n' ainda está sendo gravada pelo health_monitor: tratada como fim do índice
+    if not linha.strip() or not linha.endswith(b'\n'):
+        return None, f.tell()
+    return json.loads(linha), f.tell()
+
+
+def buscar_relatorios(inicio=None, fim=None, status=None, host=None):
+    """Lista entradas do índice em uma janela de tempo (timestamps unix), sem listar o diretório.
+    
+    O manifesto é ordenado por tempo, então o início da janela é localizado por busca
+    binária nas posições do arquivo (O(log N)) e só as entradas da janela são lidas.
+    """
+    entradas = []
+    try:
+        with open(INDEX_FILE, 'rb') as f:
+            f.seek(0, os.SEEK_END)
+            baixo, alto = 0, f.tell()
+            
+            if inicio is not None:
+                while baixo < alto:
+                    meio = (baixo + alto) // 2
+                    entrada, _ = _entrada_a_partir_de(f, meio)
+                    if entrada is None or entrada.get("ts", 0) >= inicio:
+                        alto = meio
+                    else:
+                        baixo = meio + 1
+            
+            posicao = baixo
+            while True:
+                entrada, posicao = _entrada_a_partir_de(f, posicao)
+                if entrada is None or (fim is not None and entrada.get("ts", 0) > fim):
+                    break
+                # Relógio ajustado para trás pode deixar entradas antigas depois do início da janela
+                if inicio is not None and entrada.get("ts", 0) < inicio:
+                    continue
+                if status is not None and entrada.get("health_status") != status:
+                    continue
+                if host is not None and entrada.get("host") != host:
+                    continue
+                entradas.append(entrada)
+    except FileNotFoundError:
+        print(f"⚠️ Índice não encontrado: {INDEX_FILE}")
+    except (OSError, ValueError) as e:
+        print(f"⚠️ Erro ao ler índice {INDEX_FILE}: {e}")
+    
+    return entradas
+
+
+def ler_entrada_indice(entrada):
+    """Lê o relatório apontado por uma entrada do índice"""
+    return ler_json(REPORTS_DIR / entrada["file"], entrada.get("offset"))
+
+
+def ler_json(filepath, offset=None):
+    """Lê e retorna o conteúdo do relatório, em qualquer formato de saída do health_monitor.
+    
+    Para NDJSON, lê a linha iniciada em `offset` ou, sem offset, a última (mais recente).
+    """
+    nome = str(filepath)
     try:
+        if nome.endswith(".ndjson"):
+            if offset is None:
+                return json.loads(_ultima_linha(filepath))
+            with open(filepath, 'rb') as f:
+                f.seek(offset)
+                return json.loads(f.readline())
+        
+        if nome.endswith(".json.gz"):
+            with gzip.open(filepath, 'rb') as f:
+                return json.loads(f.read())
+        
+        if nome.endswith(".json.zst"):
+            import zstandard
+            with open(filepath, 'rb') as f:
+                return json.loads(zstandard.ZstdDecompressor().stream_reader(f).read())
+        
+        if nome.endswith(".msgpack"):
+            import msgpack
+            with open(filepath, 'rb') as f:
+                return msgpack.unpackb(f.read(), raw=False)
+        
         with open(filepath, 'r', encoding='utf-8') as f:
             return json.load(f)
     except Exception as e:
@@ -69,13 +229,18 @@ def ler_json(filepath):
 def criar_prompt_analise(dados_json):
     """Cria o prompt para a IA analisar o relatório de saúde"""
     
+    # Resumir o relatório antes de enviá-lo, respeitando o orçamento de tokens
+    tokens_originais = estimar_tokens(json.dumps(dados_json, indent=2, ensure_ascii=False))
+    dados_compactos, tokens_compactos = compactar_com_orcamento(dados_json, TOKEN_BUDGET)
+    print(f"📏 Dados no prompt: ~{tokens_originais} → ~{tokens_compactos} tokens (orçamento: {TOKEN_BUDGET})")
+    
     prompt = f"""Você é um administrador de sistemas Linux sênior com 15 anos de experiência em Fedora/RHEL.
 
 Analise este relatório de saúde do sistema e crie uma análise INTERPRETATIVA e HUMANIZADA em formato JSON.
 
-DADOS BRUTOS DO SISTEMA:
+DADOS DO SISTEMA (resumidos: logs repetidos agrupados com contagem, campos saudáveis omitidos):
 ```json
-{json.dumps(dados_json, indent=2, ensure_ascii=False)}
+{dados_compactos}
 ```
 
 IMPORTANTE: Retorne um JSON estruturado que será usado para preencher um template HTML.
@@ -156,203 +321,329 @@ MISSÃO: NÃO APENAS MOSTRE OS DADOS - INTERPRETE, EXPLIQUE E TRADUZA PARA LINGU
     return prompt
 
 
-def chamar_gemini(prompt):
-    """Chama a API do Gemini para gerar a análise em JSON"""
+# Schema da análise: chave -> tipo esperado
+ESQUEMA_ANALISE = {
+    "resumo_executivo": str,
+    "metricas_cards": list,
+    "alertas": list,
+    "analise_discos": str,
+    "analise_memoria": str,
+    "analise_cpu": str,
+    "analise_sistema": str,
+    "analise_rede": str,
+    "analise_logs": str,
+    "recomendacoes": list,
+    "conclusao": str
+}
+
+# Campos obrigatórios dos itens de cada lista
+CAMPOS_ITENS = {
+    "metricas_cards": ("label", "value"),
+    "alertas": ("titulo", "descricao"),
+    "recomendacoes": ("titulo", "descricao")
+}
+
+
+def validar_campo(chave, valor):
+    """Valida uma chave da análise contra o schema (chaves extras são ignoradas)"""
+    tipo = ESQUEMA_ANALISE.get(chave)
+    if tipo is None:
+        return
+    if not isinstance(valor, tipo):
+        raise ValueError(f"Campo '{chave}' deveria ser {tipo.__name__}, recebido {type(valor).__name__}")
+    for indice, item in enumerate(valor if tipo is list else []):
+        if not isinstance(item, dict):
+            raise ValueError(f"Item {indice} de '{chave}' deveria ser um objeto")
+        faltando = [campo for campo in CAMPOS_ITENS[chave] if campo not in item]
+        if faltando:
+            raise ValueError(f"Item {indice} de '{chave}' sem os campos: {', '.join(faltando)}")
+
+
+def ia_disponivel():
+    """Verifica se o SDK do Gemini está instalado e a chave configurada"""
+    return genai is not None and bool(api_key)
+
+
+def obter_cliente():
+    """Cria o cliente Gemini na primeira chamada"""
+    global client
+    if client is None:
+        if genai is None:
+            raise RuntimeError("Pacote google-genai não instalado (pip install google-genai)")
+        if not api_key:
+            raise RuntimeError("Variável GEMINI_API_KEY não encontrada! Configure com: export GEMINI_API_KEY='sua_chave_aqui'")
+        client = genai.Client(api_key=api_key)
+    return client
+
+
+# Parâmetros de geração; sem o SDK instalado (cliente injetado) vão como dicionário
+CONFIG_GERACAO = {"temperature": 0.7, "top_p": 0.95, "max_output_tokens": 8192}
+
+
+def gerar_analise(prompt, cliente=None, ao_receber=None):
+    """Gera a análise via streaming, validando cada seção assim que ela chega.
+    
+    `ao_receber(chave, valor)` é chamado para cada seção completa. Levanta ValueError
+    assim que a resposta sai do formato esperado, sem aguardar o restante do stream.
+    """
+    cliente = cliente or obter_cliente()
+    leitor = LeitorJsonIncremental()
+    analise = {}
+    
+    stream = cliente.models.generate_content_stream(
+        model=model,
+        contents=prompt,
+        config=types.GenerateContentConfig(**CONFIG_GERACAO) if types is not None else dict(CONFIG_GERACAO)
+    )
+    try:
+        for chunk in stream:
+            for chave, valor in leitor.alimentar(chunk.text or ""):
+                validar_campo(chave, valor)
+                analise[chave] = valor
+                if ao_receber:
+                    ao_receber(chave, valor)
+            if leitor.concluido:
+                break
+    finally:
+        fechar = getattr(stream, "close", None)
+        if fechar:
+            fechar()
+    
+    leitor.finalizar()
+    faltando = [chave for chave in ESQUEMA_ANALISE if chave not in analise]
+    if faltando:
+        raise ValueError(f"Análise sem as seções: {', '.join(faltando)}")
+    return analise
+
+
+def chamar_gemini(prompt, cliente=None, secoes=None):
+    """Chama a API do Gemini para gerar a análise em JSON.
+    
+    Se `secoes` for um dicionário, cada seção é renderizada nele assim que chega.
+    """
+    inicio = time.monotonic()
+    
+    def ao_receber(chave, valor):
+        print(f"   🧩 Seção recebida: {chave} ({time.monotonic() - inicio:.1f}s)")
+        if secoes is not None and chave in SECOES_ANALISE:
+            secoes[chave] = renderizar_secao(chave, valor)
+    
     try:
         print("⏳ Enviando dados para análise do Gemini...")
-        
-        response = client.models.generate_content(
-            model=model,
-            contents=prompt,
-            config=types.GenerateContentConfig(
-                temperature=0.7,
-                top_p=0.95,
-                max_output_tokens=8192
-            )
-        )
-        
-        resultado = response.text.strip()
-        
-        # Limpar markdown se houver
-        json_text = resultado
-        if "```json" in resultado:
-            json_start = resultado.find("```json") + 7
-            json_end = resultado.find("```", json_start)
-            if json_end > json_start:
-                json_text = resultado[json_start:json_end].strip()
-        elif "```" in resultado:
-            json_start = resultado.find("```") + 3
-            json_end = resultado.rfind("```")
-            if json_end > json_start:
-                json_text = resultado[json_start:json_end].strip()
-        
-        # Extrair apenas o JSON
-        first_brace = json_text.find('{')
-        last_brace = json_text.rfind('}')
-        if first_brace != -1 and last_brace != -1:
-            json_text = json_text[first_brace:last_brace+1]
-        
-        # Parsear JSON
-        try:
-            return json.loads(json_text)
-        except json.JSONDecodeError as e:
-            print(f"⚠️ Erro ao parsear JSON: {e}")
-            print("Primeiros 500 caracteres da resposta:")
-            print(resultado[:500])
-            return None
-        
+        return gerar_analise(prompt, cliente, ao_receber)
+    except ValueError as e:
+        print(f"⚠️ Resposta inválida da IA: {e}")
+        return None
     except Exception as e:
         print(f"❌ Erro ao chamar Gemini API: {e}")
         return None
 
 
+def analisar_relatorio(dados, gerar=chamar_gemini, modo=None, usar_ia=None):
+    """Obtém a análise do relatório conforme o modo.
+    
+    - local: sempre a análise por regras
+    - ia: cache ou IA (sem fallback)
+    - auto: cache; relatório saudável -> análise local; estado degradado -> IA,
+      recorrendo à análise local se a IA estiver indisponível ou falhar
+    
+    Retorna (análise, origem, idade do cache em segundos), com origem "cache", "ia" ou "local".
+    """
+    modo = modo or MODO_ANALISE
+    if modo not in MODOS_ANALISE:
+        raise ValueError(f"Modo de análise inválido: {modo} (use {', '.join(MODOS_ANALISE)})")
+    
+    if modo == "local":
+        return gerar_analise_local(dados), "local", None
+    
+    chave_cache = cache_ia.chave_relatorio(dados)
+    if CACHE_TTL > 0:
+        analise, idade = cache_ia.obter_analise(chave_cache, CACHE_TTL)
+        if analise:
+            return analise, "cache", idade
+    
+    if modo == "auto":
+        if dados.get('summary', {}).get('health_status') == 'healthy':
+            return gerar_analise_local(dados), "local", None
+        if not (ia_disponivel() if usar_ia is None else usar_ia):
+            print("💡 IA indisponível (sem google-genai ou GEMINI_API_KEY), usando análise local")
+            return gerar_analise_local(dados), "local", None
+    
+    try:
+        analise = gerar(criar_prompt_analise(dados))
+    except Exception as e:
+        if modo != "auto":
+            raise
+        print(f"⚠️ Falha na IA ({e}), usando análise local")
+        analise = None
+    
+    if not analise:
+        if modo == "auto":
+            return gerar_analise_local(dados), "local", None
+        return None, "ia", None
+    
+    if CACHE_TTL > 0:
+        try:
+            cache_ia.salvar_analise(chave_cache, analise, CACHE_MAX_ENTRADAS)
+        except OSError as e:
+            print(f"⚠️ Não foi possível gravar o cache: {e}")
+    
+    return analise, "ia", None
+
+
 def gerar_metrics_cards(metricas):
     """Gera HTML dos cards de métricas"""
-    cards_html = ""
+    partes = []
     for metrica in metricas:
-        cards_html += f"""
+        partes.append(f"""
                     <div class="metric-card">
-                        <div class="icon">{metrica.get('icon', '📊')}</div>
-                        <div class="label">{metrica.get('label', 'Métrica')}</div>
-                        <div class="value">{metrica.get('value', 'N/A')}</div>
-                        <div class="subtext">{metrica.get('subtext', '')}</div>
+                        <div class="icon">{escapar(metrica.get('icon', '📊'))}</div>
+                        <div class="label">{escapar(metrica.get('label', 'Métrica'))}</div>
+                        <div class="value">{escapar(metrica.get('value', 'N/A'))}</div>
+                        <div class="subtext">{escapar(metrica.get('subtext', ''))}</div>
                     </div>
-"""
-    return cards_html
+""")
+    return Seguro(''.join(partes))
 
 
 def gerar_alertas_section(alertas):
     """Gera HTML da seção de alertas"""
     if not alertas:
-        return ""
+        return Seguro("")
     
-    html = """
+    partes = ["""
             <div class="section">
                 <h2 class="section-title">🚨 Alertas e Problemas</h2>
-"""
+"""]
     
     for alerta in alertas:
         tipo_class = "alert-critical" if alerta.get('tipo') == 'critical' else "alert-warning"
         
-        html += f"""
+        partes.append(f"""
                 <div class="alert-box {tipo_class}">
-                    <h4>{alerta.get('titulo', 'Alerta')}</h4>
-                    <p><strong>Situação:</strong> {alerta.get('descricao', '')}</p>
-                    <p><strong>Por que isso importa:</strong> {alerta.get('impacto', '')}</p>
-"""
+                    <h4>{escapar(alerta.get('titulo', 'Alerta'))}</h4>
+                    <p><strong>Situação:</strong> {escapar(alerta.get('descricao', ''))}</p>
+                    <p><strong>Por que isso importa:</strong> {escapar(alerta.get('impacto', ''))}</p>
+""")
         
         if alerta.get('solucao'):
-            html += f"""
+            partes.append(f"""
                     <div class="solution">
                         <strong>O que fazer:</strong><br>
-                        {alerta.get('solucao', '')}
+                        {escapar(alerta['solucao']).replace(chr(10), '<br>')}
                     </div>
-"""
+""")
         
-        html += """
+        partes.append("""
                 </div>
-"""
+""")
     
-    html += """
+    partes.append("""
             </div>
-"""
-    return html
+""")
+    return Seguro(''.join(partes))
 
 
 def gerar_recomendacoes(recomendacoes):
     """Gera HTML das recomendações"""
-    html = '<ul class="recommendation-list">\n'
+    partes = ['<ul class="recommendation-list">\n']
     
     for rec in recomendacoes:
         prioridade = rec.get('prioridade', 'media')
-        priority_class = f"priority-{prioridade}"
+        priority_class = escapar(f"priority-{prioridade}")
         
-        html += f'<li class="{priority_class}">\n'
-        html += f'<strong>{rec.get("titulo", "Recomendação")}</strong><br>\n'
-        html += f'{rec.get("descricao", "")}<br>\n'
+        partes.append(f'<li class="{priority_class}">\n')
+        partes.append(f'<strong>{escapar(rec.get("titulo", "Recomendação"))}</strong><br>\n')
+        partes.append(f'{escapar(rec.get("descricao", ""))}<br>\n')
         
         if rec.get('comandos'):
-            html += '<pre><code>'
-            for cmd in rec['comandos']:
-                html += f'{cmd}\n'
-            html += '</code></pre>\n'
+            partes.append('<pre><code>')
+            partes.extend(f'{escapar(cmd)}\n' for cmd in rec['comandos'])
+            partes.append('</code></pre>\n')
         
-        html += '</li>\n'
+        partes.append('</li>\n')
     
-    html += '</ul>'
-    return html
+    partes.append('</ul>')
+    return Seguro(''.join(partes))
 
 
-def preencher_template(analise_json, dados_originais):
-    """Preenche o template HTML com os dados da análise"""
+_SEM_ANALISE = Seguro('<p>Análise não disponível.</p>')
+
+# Chave da análise -> (placeholder no template, função de renderização, valor padrão)
+SECOES_ANALISE = {
+    "metricas_cards": ("METRICS_CARDS", gerar_metrics_cards, []),
+    "resumo_executivo": ("RESUMO_EXECUTIVO", formatar_texto, _SEM_ANALISE),
+    "alertas": ("ALERTAS_SECTION", gerar_alertas_section, []),
+    "analise_discos": ("ANALISE_DISCOS", formatar_texto, _SEM_ANALISE),
+    "analise_memoria": ("ANALISE_MEMORIA", formatar_texto, _SEM_ANALISE),
+    "analise_cpu": ("ANALISE_CPU", formatar_texto, _SEM_ANALISE),
+    "analise_sistema": ("ANALISE_SISTEMA", formatar_texto, _SEM_ANALISE),
+    "analise_rede": ("ANALISE_REDE", formatar_texto, _SEM_ANALISE),
+    "analise_logs": ("ANALISE_LOGS", formatar_texto, _SEM_ANALISE),
+    "recomendacoes": ("RECOMENDACOES", gerar_recomendacoes, []),
+    "conclusao": ("CONCLUSAO", formatar_texto, Seguro('<p>Conclusão não disponível.</p>'))
+}
+
+TEMPLATE_PATH = Path(__file__).parent / "template.html"
+
+
+def renderizar_secao(chave, valor):
+    """Gera o HTML de uma seção da análise"""
+    _, renderizar, padrao = SECOES_ANALISE[chave]
+    if valor is None:
+        valor = padrao
+    return renderizar(valor)
+
+
+def preencher_template(analise_json, dados_originais, secoes=None):
+    """Preenche o template HTML com os dados da análise (em uma única passada).
     
-    # Carregar template
-    template_path = Path(__file__).parent / "template.html"
+    `secoes` pode trazer seções já renderizadas durante o streaming.
+    """
+    
+    # Carregar template (compilado uma vez e recompilado só se o arquivo mudar)
     try:
-        with open(template_path, 'r', encoding='utf-8') as f:
-            template = f.read()
+        template = carregar_template(TEMPLATE_PATH)
     except Exception as e:
         print(f"❌ Erro ao ler template: {e}")
         return None
     
     # Determinar status e classe
     health_status = dados_originais.get('summary', {}).get('health_status', 'unknown')
-    status_map = {
-        'healthy': ('healthy', '🟢', 'Saudável'),
-        'warning': ('warning', '🟡', 'Atenção Necessária'),
-        'critical': ('critical', '🔴', 'Crítico'),
-        'unknown': ('warning', '❓', 'Desconhecido')
+    status_class, status_icon, status_text = STATUS_MAP.get(health_status, STATUS_MAP['unknown'])
+    
+    valores = {
+        'HOSTNAME': dados_originais.get('hostname', 'N/A'),
+        'TIMESTAMP': dados_originais.get('timestamp', 'N/A'),
+        'STATUS_CLASS': status_class,
+        'STATUS_ICON': status_icon,
+        'STATUS_TEXT': status_text
     }
     
-    status_class, status_icon, status_text = status_map.get(health_status, status_map['unknown'])
-    
-    # Substituir placeholders
-    template = template.replace('{{HOSTNAME}}', dados_originais.get('hostname', 'N/A'))
-    template = template.replace('{{TIMESTAMP}}', dados_originais.get('timestamp', 'N/A'))
-    template = template.replace('{{STATUS_CLASS}}', status_class)
-    template = template.replace('{{STATUS_ICON}}', status_icon)
-    template = template.replace('{{STATUS_TEXT}}', status_text)
+    # Seções da análise (reaproveitando as já renderizadas)
+    secoes = secoes or {}
+    for chave, (placeholder, _, _) in SECOES_ANALISE.items():
+        html_secao = secoes.get(chave)
+        if html_secao is None:
+            html_secao = renderizar_secao(chave, analise_json.get(chave))
+        valores[placeholder] = html_secao
     
-    # Métricas cards
-    metrics_html = gerar_metrics_cards(analise_json.get('metricas_cards', []))
-    template = template.replace('{{METRICS_CARDS}}', metrics_html)
-    
-    # Resumo executivo
-    template = template.replace('{{RESUMO_EXECUTIVO}}', analise_json.get('resumo_executivo', '<p>Análise não disponível.</p>'))
-    
-    # Alertas
-    alertas_html = gerar_alertas_section(analise_json.get('alertas', []))
-    template = template.replace('{{ALERTAS_SECTION}}', alertas_html)
-    
-    # Análises
-    template = template.replace('{{ANALISE_DISCOS}}', analise_json.get('analise_discos', '<p>Análise não disponível.</p>'))
-    template = template.replace('{{ANALISE_MEMORIA}}', analise_json.get('analise_memoria', '<p>Análise não disponível.</p>'))
-    template = template.replace('{{ANALISE_CPU}}', analise_json.get('analise_cpu', '<p>Análise não disponível.</p>'))
-    template = template.replace('{{ANALISE_SISTEMA}}', analise_json.get('analise_sistema', '<p>Análise não disponível.</p>'))
-    template = template.replace('{{ANALISE_REDE}}', analise_json.get('analise_rede', '<p>Análise não disponível.</p>'))
-    template = template.replace('{{ANALISE_LOGS}}', analise_json.get('analise_logs', '<p>Análise não disponível.</p>'))
-    
-    # Recomendações
-    recomendacoes_html = gerar_recomendacoes(analise_json.get('recomendacoes', []))
-    template = template.replace('{{RECOMENDACOES}}', recomendacoes_html)
-    
-    # Conclusão
-    template = template.replace('{{CONCLUSAO}}', analise_json.get('conclusao', '<p>Conclusão não disponível.</p>'))
-    
-    return template
+    return template.renderizar(valores)
 
 
-def salvar_html(html_content, json_filepath):
+def salvar_html(html_content, json_filepath, diretorio_saida=None, html_filename=None):
     """Salva o relatório HTML no diretório de saída"""
     
     # Criar diretório de saída se não existir
-    OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
+    diretorio_saida = Path(diretorio_saida or OUTPUT_DIR)
+    diretorio_saida.mkdir(parents=True, exist_ok=True)
     
     # Nome do arquivo baseado no JSON original
-    json_filename = json_filepath.stem  # health_20251024_143000
-    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-    html_filename = f"{json_filename}_report_{timestamp}.html"
-    html_filepath = OUTPUT_DIR / html_filename
+    if not html_filename:
+        json_filename = nome_base_relatorio(json_filepath)  # health_20251024_143000
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        html_filename = f"{json_filename}_report_{timestamp}.html"
+    html_filepath = diretorio_saida / html_filename
     
     try:
         with open(html_filepath, 'w', encoding='utf-8') as f:
@@ -376,6 +667,11 @@ def abrir_no_navegador(filepath):
 
 def main():
     """Função principal"""
+    parser = argparse.ArgumentParser(description="Gera o relatório HTML do último relatório de saúde")
+    parser.add_argument("--modo", choices=MODOS_ANALISE, default=MODO_ANALISE,
+                        help="auto: IA só para estados degradados e novos; ia: sempre IA; local: só regras")
+    args = parser.parse_args()
+    
     print("🏥 AI Health Reporter - Análise Inteligente de Saúde do Sistema")
     print("🤖 Powered by Google Gemini")
     print()
@@ -412,22 +708,25 @@ def main():
         print(f"   💚 Status: {health_status}")
         print(f"   🚨 Alertas: {total_alerts}")
         
-        # 3. Criar prompt
-        print("\n🧠 Preparando análise para IA...")
-        prompt = criar_prompt_analise(dados)
-        
-        # 4. Chamar IA para gerar análise em JSON
-        analise_json = chamar_gemini(prompt)
+        # 3. Reutilizar análise de relatório equivalente ou gerar com a IA
+        print(f"\n🧠 Preparando análise (modo: {args.modo})...")
+        secoes = {}
+        analise_json, origem, idade_cache = analisar_relatorio(dados, lambda p: chamar_gemini(p, secoes=secoes), args.modo)
         
         if not analise_json:
             print("❌ Falha ao gerar análise")
             sys.exit(1)
         
-        print("✅ Análise JSON gerada pela IA!")
+        if origem == "cache":
+            print(f"♻️  Análise reutilizada do cache (gerada há {idade_cache // 60} min)")
+        elif origem == "local":
+            print("📐 Análise gerada localmente por regras (sem IA)")
+        else:
+            print("✅ Análise JSON gerada pela IA (nova)!")
         
-        # 5. Preencher template HTML com a análise
+        # 4. Preencher template HTML com a análise
         print("🎨 Preenchendo template HTML...")
-        html_content = preencher_template(analise_json, dados)
+        html_content = preencher_template(analise_json, dados, secoes)
         
         if not html_content:
             print("❌ Falha ao gerar HTML do template")
@@ -435,7 +734,7 @@ def main():
         
         print("✅ HTML gerado a partir do template!")
         
-        # 6. Salvar HTML
+        # 5. Salvar HTML
         print("\n💾 Salvando relatório HTML...")
         html_file = salvar_html(html_content, json_file)
         
@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Dublês compartilhados pelos testes do iareport: cliente Gemini falso e dados de exemplo
+"""
+
+import json
+import sys
+from pathlib import Path
+
+RAIZ = Path(__file__).resolve().parents[2]
+if str(RAIZ / "iareport") not in sys.path:
+    sys.path.insert(0, str(RAIZ / "iareport"))
+
+
+class ErroApi(Exception):
+    """Exceção no formato das do SDK (código HTTP em `code`)"""
+
+    def __init__(self, code, mensagem="erro da API"):
+        super().__init__(f"{code} {mensagem}")
+        self.code = code
+
+
+class _Trecho:
+    def __init__(self, texto):
+        self.text = texto
+
+
+class ClienteFalso:
+    """Imita `client.models.generate_content_stream`, devolvendo o texto em trechos.
+
+    `falhar_se` mapeia um trecho do prompt para a exceção levantada quando ele aparece.
+    """
+
+    def __init__(self, resposta=None, tamanho_trecho=7, falhar_se=None):
+        self.models = self
+        self.resposta = resposta if resposta is not None else json.dumps(analise_valida(), ensure_ascii=False)
+        self.tamanho_trecho = tamanho_trecho
+        self.falhar_se = falhar_se or {}
+        self.chamadas = []
+
+    def generate_content_stream(self, model, contents, config):
+        self.chamadas.append({"model": model, "contents": contents, "config": config})
+        for trecho, erro in self.falhar_se.items():
+            if trecho in contents:
+                raise erro
+        texto = self.resposta
+        return iter([_Trecho(texto[i:i + self.tamanho_trecho]) for i in range(0, len(texto), self.tamanho_trecho)])
+
+
+def analise_valida():
+    """Análise completa no formato pedido à IA"""
+    return {
+        "resumo_executivo": "Sistema estável, com \"atenção\" ao disco.",
+        "metricas_cards": [{"label": "Disco", "value": "84%", "status": "warning"}],
+        "alertas": [{"titulo": "Disco cheio", "descricao": "Partição / acima de 80%", "severidade": "warning"}],
+        "analise_discos": "Uso alto em /.",
+        "analise_memoria": "Memória folgada.",
+        "analise_cpu": "CPU ociosa.",
+        "analise_sistema": "Serviços ativos.",
+        "analise_rede": "Rede sem erros.",
+        "analise_logs": "Poucos erros.",
+        "recomendacoes": [{"titulo": "Limpar /var/log", "descricao": "Remover logs antigos", "comandos": ["du -sh /var/log"]}],
+        "conclusao": "Nenhuma ação urgente."
+    }
+
+
+def relatorio(hostname="srv01", status="warning", timestamp_unix=1761587832, **extras):
+    """Relatório mínimo do health_monitor"""
+    dados = {
+        "hostname": hostname,
+        "timestamp": "2025-10-27T14:57:12",
+        "timestamp_unix": timestamp_unix,
+        "summary": {"total_alerts": 1, "critical_alerts": 0, "warning_alerts": 1, "health_status": status},
+        "alerts": [{"severity": "warning", "category": "disk", "message": "Uso alto de disco em /: 84.1%",
+                    "mountpoint": "/"}],
+        "metrics": {
+            "disk": {"partitions": [{"device": "/dev/sda1", "mountpoint": "/", "percent_used": 84.1,
+                                     "total_gb": 100.0, "used_gb": 84.1, "free_gb": 15.9}]},
+            "memory": {"ram": {"percent_used": 35.2, "total_gb": 16.0}, "swap": {"percent_used": 0.0}},
+            "cpu": {"usage": {"percent_total": 6.5}, "load_average": {"normalized_5min": 0.12}},
+        }
+    }
+    dados.update(extras)
+    return dados
@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Testes da análise local por regras (analise_local.gerar_analise_local)
+"""
+
+import json
+import sys
+import unittest
+from pathlib import Path
+from unittest import mock
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from falsos import relatorio  # noqa: E402
+
+import reportia  # noqa: E402
+from analise_local import gerar_analise_local  # noqa: E402
+
+
+def _relatorio_critico():
+    alertas = [
+        {"severity": "warning", "category": "memory", "message": "Uso alto de RAM: 85%"},
+        {"severity": "critical", "category": "disk", "message": "Uso crítico de disco em /: 97%", "mountpoint": "/"},
+        {"severity": "warning", "category": "disk_io", "message": "Latência alta de I/O em sda: 60 ms"}
+    ]
+    metricas = {
+        "disk": {"partitions": [{"mountpoint": "/", "percent_used": 97.0, "used_gb": 97, "total_gb": 100}],
+                 "inodes": [{"mountpoint": "/", "percent_used": 91.0}],
+                 "smart_status": [{"device": "/dev/sda", "health_status": "FAILED"}]},
+        "disk_io": {"devices": [{"device": "sda", "util_percent": 88.0, "await_ms": 60.0}]},
+        "memory": {"ram": {"percent_used": 85.0}, "swap": {"total_gb": 4, "percent_used": 60.0}},
+        "cpu": {"load_average": {"5_min": 9.0, "cpu_count": 4, "normalized_5min": 2.25},
+                "usage": {"percent_total": 99.0, "iowait_percent": 30.0},
+                "temperature": {"coretemp": [{"label": "Core 0", "current": 88.0}]}},
+        "system": {"info": {"distribution": "Fedora 42"}, "failed_services": ["nginx.service"],
+                   "systemd_services": [{"name": "nginx", "active": False}, {"name": "sshd", "active": True}]},
+        "network": {"dns": {"can_resolve": False, "nameservers": ["10.0.0.53"]},
+                    "connectivity": [{"host": "1.1.1.1", "reachable": False}]},
+        "logs": {"collection_period_hours": 24,
+                 "journal_counts": {"errors_total": 120, "warnings_total": 8, "by_unit": {"nginx.service": 100}}}
+    }
+    return relatorio(status="critical", alerts=alertas, metrics=metricas,
+                     summary={"total_alerts": 3, "critical_alerts": 1, "warning_alerts": 2,
+                              "health_status": "critical"})
+
+
+# Relatórios de entrada: completo, crítico, sem métricas e com todos os coletores falhando
+CASOS = {
+    "padrao": relatorio,
+    "critico": _relatorio_critico,
+    "sem_metricas": lambda: {"hostname": "srv01", "summary": {}, "metrics": {}},
+    "coletores_com_erro": lambda: relatorio(alerts=[], metrics={
+        categoria: {"error": "falhou"}
+        for categoria in ("disk", "disk_io", "memory", "cpu", "system", "network", "logs")
+    }),
+}
+
+
+class TestSecoes(unittest.TestCase):
+
+    def test_todas_as_secoes_no_formato_do_esquema(self):
+        for nome, fabrica in CASOS.items():
+            with self.subTest(caso=nome):
+                analise = gerar_analise_local(fabrica())
+                self.assertEqual(set(analise), set(reportia.SECOES_ANALISE))
+                self.assertEqual(set(analise), set(reportia.ESQUEMA_ANALISE))
+                for chave, valor in analise.items():
+                    reportia.validar_campo(chave, valor)
+                    # Sem alertas no relatório, a lista de alertas fica vazia
+                    if chave != "alertas":
+                        self.assertTrue(valor, f"seção vazia: {chave}")
+
+    def test_html_sem_secoes_no_valor_padrao(self):
+        for nome, fabrica in CASOS.items():
+            with self.subTest(caso=nome), mock.patch("builtins.print"):
+                dados = fabrica()
+                html = reportia.preencher_template(gerar_analise_local(dados), dados)
+                self.assertNotIn("Análise não disponível.", html)
+                self.assertNotIn("Conclusão não disponível.", html)
+                self.assertNotRegex(html, r"\{\{[A-Z_]+\}\}")
+
+    def test_deterministica_e_serializavel(self):
+        dados = _relatorio_critico()
+        primeira = gerar_analise_local(dados)
+        self.assertEqual(gerar_analise_local(json.loads(json.dumps(dados))), primeira)
+        self.assertEqual(json.loads(json.dumps(primeira, ensure_ascii=False)), primeira)
+
+
+class TestConteudo(unittest.TestCase):
+
+    def setUp(self):
+        self.analise = gerar_analise_local(_relatorio_critico())
+
+    def test_alertas_criticos_primeiro(self):
+        alertas = self.analise["alertas"]
+        self.assertEqual([a["tipo"] for a in alertas], ["critical", "warning", "warning"])
+        self.assertEqual(alertas[0]["prioridade"], "alta")
+        self.assertTrue(alertas[0]["titulo"].startswith("Armazenamento: "))
+
+    def test_recomendacoes_por_categoria(self):
+        prioridades = {r["titulo"]: r["prioridade"] for r in self.analise["recomendacoes"]}
+        self.assertEqual(prioridades["Revisar armazenamento"], "alta")
+        self.assertEqual(prioridades["Revisar memória"], "media")
+        self.assertEqual(prioridades["Manutenção de rotina"], "baixa")
+
+    def test_textos_citam_os_problemas(self):
+        self.assertIn("FALHA em /dev/sda", self.analise["analise_discos"])
+        self.assertIn("inodes estão se esgotando", self.analise["analise_discos"])
+        self.assertIn("aguardando disco", self.analise["analise_cpu"])
+        self.assertIn("88.0°C", self.analise["analise_cpu"])
+        self.assertIn("nginx.service", self.analise["analise_sistema"])
+        self.assertIn("DNS falhou (servidores: 10.0.0.53)", self.analise["analise_rede"])
+        self.assertIn("120 erro(s)", self.analise["analise_logs"])
+        self.assertIn("crítico", self.analise["resumo_executivo"])
+
+    def test_sem_dados_da_categoria(self):
+        analise = gerar_analise_local(CASOS["coletores_com_erro"]())
+        for chave in ("analise_discos", "analise_memoria", "analise_cpu", "analise_sistema",
+                      "analise_rede", "analise_logs"):
+            self.assertEqual(analise[chave], "Não há dados desta categoria no relatório.")
+        self.assertEqual([c["label"] for c in analise["metricas_cards"]], ["Alertas"])
+
+
+if __name__ == "__main__":
+    unittest.main()
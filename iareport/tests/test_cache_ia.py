@@ -0,0 +1,158 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Testes da chave de cache das análises (cache_ia.chave_relatorio)
+"""
+
+import copy
+import random
+import sys
+import unittest
+from datetime import datetime, timedelta
+from pathlib import Path
+
+RAIZ = Path(__file__).resolve().parents[2]
+sys.path.insert(0, str(RAIZ / "iareport"))
+
+import cache_ia  # noqa: E402
+
+
+def _relatorio_sintetico():
+    return {
+        "hostname": "srv01",
+        "timestamp": "2025-10-27T14:57:12",
+        "summary": {"total_alerts": 2, "critical_alerts": 0, "warning_alerts": 2, "health_status": "warning"},
+        "alerts": [
+            {"severity": "warning", "category": "disk", "message": "Disco / com 84.1% de uso",
+             "value": 84.1, "threshold": 80, "mountpoint": "/"},
+            {"severity": "warning", "category": "system", "message": "3 serviço(s) systemd falharam",
+             "service": "nginx", "status": "failed"},
+        ],
+        "metrics": {
+            "disk": {
+                "partitions": [{"device": "/dev/sda1", "mountpoint": "/", "total_gb": 100.0,
+                                "used_gb": 84.1, "free_gb": 15.9, "percent_used": 84.1}],
+                "inodes": [{"mountpoint": "/", "inodes_used": 120000, "percent_used": 12.3}],
+                "smart_status": [{"device": "/dev/sda", "health_status": "PASSED", "cache_age_seconds": 40}],
+            },
+            "disk_io": {"devices": [{"device": "sda", "read_iops": 12.4, "write_iops": 30.1,
+                                     "await_ms": 1.82, "util_percent": 3.2}],
+                        "sample_window_seconds": 5.01},
+            "memory": {"ram": {"free_gb": 80.4, "used_gb": 43.6, "percent_used": 35.2},
+                       "swap": {"used_gb": 0.0, "percent_used": 0.0, "rates": {"swap_out_per_sec": 0.0}}},
+            "cpu": {"usage": {"percent_total": 6.5, "iowait_percent": 0.4},
+                    "load_average": {"1_min": 0.31, "normalized_5min": 0.12}},
+            "system": {"info": {"uptime_seconds": 86400, "uptime_human": "1 dia, 0:00:00"},
+                       "processes": {"total_processes": 212},
+                       "systemd_services": [{"name": "nginx", "status": "failed", "active": False},
+                                            {"name": "sshd", "status": "active", "active": True}]},
+            "network": {"connections": {"total": 143},
+                        "dns": {"can_resolve": True, "queries": [{"latency_ms": 7.35}]},
+                        "connectivity": [{"host": "8.8.8.8", "reachable": True, "latency_ms": 11.2}],
+                        "interfaces": [{"name": "eth0", "rates": {"bytes_recv_per_sec": 5120.7}}]},
+            "logs": {"journal_counts": {"errors": 17, "warnings": 88}},
+        },
+    }
+
+
+def _variar(valor, sorteio, chave=""):
+    """Aplica ±2% de ruído a números que não são percentuais"""
+    if isinstance(valor, dict):
+        return {k: _variar(v, sorteio, k) for k, v in valor.items()}
+    if isinstance(valor, list):
+        return [_variar(item, sorteio, chave) for item in valor]
+    if isinstance(valor, bool) or not isinstance(valor, (int, float)) or "percent" in chave:
+        return valor
+    ruido = valor * sorteio.uniform(-0.02, 0.02)
+    return round(valor + ruido) if isinstance(valor, int) else round(valor + ruido, 2)
+
+
+def _proxima_coleta(anterior, sorteio, segundos):
+    """Simula a coleta seguinte de um sistema estável: relógio e contadores avançam,
+    CPU, memória e disco oscilam um pouco"""
+    relatorio = copy.deepcopy(anterior)
+    metricas = relatorio["metrics"]
+
+    instante = datetime.fromisoformat(relatorio["timestamp"]) + timedelta(seconds=segundos)
+    relatorio["timestamp"] = instante.isoformat()
+    info = metricas["system"]["info"]
+    info["uptime_seconds"] += segundos
+    info["uptime_human"] = str(timedelta(seconds=info["uptime_seconds"]))
+
+    metricas["cpu"]["usage"]["percent_total"] = round(sorteio.uniform(2.0, 15.0), 1)
+    metricas["cpu"]["usage"]["iowait_percent"] = round(sorteio.uniform(0.0, 2.0), 1)
+    metricas["cpu"]["load_average"]["normalized_5min"] = round(sorteio.uniform(0.05, 0.4), 2)
+    metricas["memory"]["ram"]["percent_used"] = round(sorteio.uniform(33.0, 38.0), 1)
+    metricas["memory"]["ram"]["free_gb"] = round(sorteio.uniform(78.0, 82.0), 2)
+    metricas["disk"]["partitions"][0]["percent_used"] = round(sorteio.uniform(84.0, 85.0), 1)
+    metricas["disk"]["smart_status"][0]["cache_age_seconds"] += segundos
+
+    io = metricas["disk_io"]["devices"][0]
+    io.update(read_iops=round(sorteio.uniform(0, 50), 1), write_iops=round(sorteio.uniform(0, 80), 1),
+              await_ms=round(sorteio.uniform(0.5, 4.0), 2), util_percent=round(sorteio.uniform(0.0, 9.0), 1))
+    metricas["disk_io"]["sample_window_seconds"] = round(sorteio.uniform(4.9, 5.1), 2)
+
+    metricas["system"]["processes"]["total_processes"] += sorteio.randint(-5, 5)
+    metricas["network"]["connections"]["total"] += sorteio.randint(-20, 20)
+    metricas["network"]["dns"]["queries"][0]["latency_ms"] = round(sorteio.uniform(2.0, 40.0), 2)
+    metricas["network"]["connectivity"][0]["latency_ms"] = round(sorteio.uniform(5.0, 30.0), 1)
+    metricas["network"]["interfaces"][0]["rates"]["bytes_recv_per_sec"] = round(sorteio.uniform(0, 1e6), 1)
+    contagens = metricas["logs"]["journal_counts"]
+    contagens["errors"] += sorteio.randint(0, 3)
+    contagens["warnings"] += sorteio.randint(0, 10)
+
+    uso = metricas["disk"]["partitions"][0]["percent_used"]
+    relatorio["alerts"][0].update(value=uso, message=f"Disco / com {uso}% de uso")
+    return relatorio
+
+
+class TestChaveRelatorio(unittest.TestCase):
+
+    def test_ruido_em_contadores_nao_muda_a_chave(self):
+        base = _relatorio_sintetico()
+        chave = cache_ia.chave_relatorio(base)
+        sorteio = random.Random(42)
+        for _ in range(50):
+            self.assertEqual(cache_ia.chave_relatorio(_variar(base, sorteio)), chave)
+
+    def test_mensagem_e_valor_do_alerta_nao_mudam_a_chave(self):
+        base = _relatorio_sintetico()
+        variado = copy.deepcopy(base)
+        variado["alerts"][0].update(value=85.9, message="Disco / com 85.9% de uso")
+        variado["alerts"][1]["message"] = "4 serviço(s) systemd falharam"
+        variado["metrics"]["disk"]["partitions"][0]["percent_used"] = 85.9
+        self.assertEqual(cache_ia.chave_relatorio(variado), cache_ia.chave_relatorio(base))
+
+    def test_mudanca_de_estado_muda_a_chave(self):
+        base = _relatorio_sintetico()
+        chave = cache_ia.chave_relatorio(base)
+
+        critico = copy.deepcopy(base)
+        critico["alerts"][0]["severity"] = "critical"
+        self.assertNotEqual(cache_ia.chave_relatorio(critico), chave)
+
+        cheio = copy.deepcopy(base)
+        cheio["metrics"]["disk"]["partitions"][0]["percent_used"] = 93.0
+        self.assertNotEqual(cache_ia.chave_relatorio(cheio), chave)
+
+        sem_dns = copy.deepcopy(base)
+        sem_dns["metrics"]["network"]["dns"]["can_resolve"] = False
+        self.assertNotEqual(cache_ia.chave_relatorio(sem_dns), chave)
+
+    def test_duas_coletas_consecutivas_geram_a_mesma_chave(self):
+        primeira = _relatorio_sintetico()
+        segunda = _proxima_coleta(primeira, random.Random(7), segundos=60)
+        self.assertEqual(cache_ia.chave_relatorio(segunda), cache_ia.chave_relatorio(primeira))
+
+    def test_coletas_ao_longo_de_uma_hora_geram_a_mesma_chave(self):
+        sorteio = random.Random(11)
+        relatorio = _relatorio_sintetico()
+        chave = cache_ia.chave_relatorio(relatorio)
+        for _ in range(60):
+            relatorio = _proxima_coleta(relatorio, sorteio, segundos=60)
+            self.assertEqual(cache_ia.chave_relatorio(relatorio), chave)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Testes da compactação do relatório e do orçamento de tokens do prompt
+"""
+
+import json
+import sys
+import unittest
+from pathlib import Path
+from unittest import mock
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from falsos import relatorio  # noqa: E402
+
+import compactacao  # noqa: E402
+import reportia  # noqa: E402
+
+
+def _relatorio_grande():
+    """Relatório com logs repetitivos, muitos processos, núcleos e interfaces"""
+    erros = [{"unit": f"app{i % 12}.service", "message": f"Falha na conexão {i} com 10.0.0.{i % 250}"}
+             for i in range(400)]
+    erros += [{"unit": f"u{i}.service", "message": f"Erro único {chr(65 + i % 26)} {'x' * (i % 7)}"}
+              for i in range(40)]
+    processos = [{"pid": i, "name": f"proc{i}", "cpu_percent": 100 - i} for i in range(30)]
+    metricas = {
+        "cpu": {"usage": {"percent_total": 42.123, "percent_per_core": [float(i) for i in range(64)],
+                          "frequency_mhz": 3200}},
+        "system": {
+            "info": {"hostname": "srv01", "architecture": "x86_64", "boot_time": "2025-10-01"},
+            "processes": {"top_cpu_usage": processos, "top_memory_usage": processos},
+            "systemd_services": [{"name": f"s{i}", "active": i % 10 != 0} for i in range(50)]
+        },
+        "network": {"interfaces": [
+            {"name": f"eth{i}", "is_up": True, "speed_mbps": 1000,
+             "statistics": {"bytes_sent_mb": 1.5 * i, "bytes_recv_mb": 2.5 * i, "errors_in": i % 3},
+             "addresses": [{"address": f"10.0.{i}.1"}]}
+            for i in range(16)
+        ], "dns": {"can_resolve": True, "queries": [{"name": "a"}] * 20}},
+        "logs": {"errors": erros, "warnings": erros[:200], "kernel_messages": [
+            f"[{i}.{i:06d}] usb 1-1: reset high-speed USB device number {i}" for i in range(100)
+        ]}
+    }
+    return relatorio(metrics=metricas)
+
+
+class TestOrcamento(unittest.TestCase):
+
+    def setUp(self):
+        self.dados = _relatorio_grande()
+        self.tokens_por_nivel = [
+            compactacao.estimar_tokens(compactacao.serializar(compactacao.compactar_relatorio(self.dados, n)))
+            for n in range(len(compactacao.NIVEIS))
+        ]
+
+    def test_niveis_reduzem_o_tamanho(self):
+        self.assertEqual(self.tokens_por_nivel, sorted(self.tokens_por_nivel, reverse=True))
+        self.assertEqual(len(set(self.tokens_por_nivel)), len(self.tokens_por_nivel))
+        original = compactacao.estimar_tokens(json.dumps(self.dados, indent=2, ensure_ascii=False))
+        self.assertLess(self.tokens_por_nivel[0], original / 3)
+
+    def test_menor_compactacao_que_cabe_no_orcamento(self):
+        for nivel, tokens in enumerate(self.tokens_por_nivel):
+            for orcamento in (tokens, tokens + 1):
+                with self.subTest(nivel=nivel, orcamento=orcamento):
+                    texto, estimado = compactacao.compactar_com_orcamento(self.dados, orcamento)
+                    self.assertLessEqual(estimado, orcamento)
+                    self.assertEqual(texto, compactacao.serializar(compactacao.compactar_relatorio(self.dados, nivel)))
+
+    def test_orcamento_entre_niveis_nao_estoura(self):
+        orcamento = self.tokens_por_nivel[1] - 1
+        texto, estimado = compactacao.compactar_com_orcamento(self.dados, orcamento)
+        self.assertLessEqual(estimado, orcamento)
+        self.assertEqual(estimado, self.tokens_por_nivel[2])
+
+    def test_orcamento_impossivel_devolve_o_nivel_mais_compacto(self):
+        with mock.patch("builtins.print") as saida:
+            texto, estimado = compactacao.compactar_com_orcamento(self.dados, 10)
+        self.assertEqual(estimado, self.tokens_por_nivel[-1])
+        self.assertGreater(estimado, 10)
+        self.assertIn("excede o orçamento", saida.call_args[0][0])
+        json.loads(texto)
+
+    def test_prompt_respeita_o_orcamento_configurado(self):
+        orcamento = self.tokens_por_nivel[2]
+        with mock.patch.object(reportia, "TOKEN_BUDGET", orcamento), mock.patch("builtins.print"):
+            prompt = reportia.criar_prompt_analise(self.dados)
+        dados_no_prompt = prompt.split("```json\n", 1)[1].split("\n```", 1)[0]
+        self.assertLessEqual(compactacao.estimar_tokens(dados_no_prompt), orcamento)
+        self.assertEqual(json.loads(dados_no_prompt)["hostname"], "srv01")
+
+
+class TestCompactarRelatorio(unittest.TestCase):
+
+    def test_conteudo_resumido(self):
+        compacto = compactacao.compactar_relatorio(_relatorio_grande())
+        metricas = compacto["metrics"]
+
+        self.assertNotIn("queries", metricas["network"]["dns"])
+        self.assertNotIn("addresses", metricas["network"]["interfaces"][0])
+        self.assertEqual(metricas["network"]["interfaces"][1]["problems"], {"errors_in": 1})
+        self.assertEqual(len(metricas["system"]["systemd_services"]), 5)
+        self.assertEqual(metricas["system"]["services_active"], 45)
+        self.assertNotIn("architecture", metricas["system"]["info"])
+        self.assertEqual(len(metricas["system"]["processes"]["top_cpu_usage"]), 5)
+        self.assertEqual(metricas["cpu"]["usage"]["percent_total"], 42.1)
+        # Alertas só com severidade, categoria e mensagem
+        self.assertEqual(set(compacto["alerts"][0]), {"severity", "category", "message"})
+
+    def test_nivel_resumido_troca_nucleos_pelo_maximo(self):
+        compacto = compactacao.compactar_relatorio(_relatorio_grande(), nivel=3)
+        uso = compacto["metrics"]["cpu"]["usage"]
+        self.assertNotIn("percent_per_core", uso)
+        self.assertEqual(uso["percent_core_max"], 63.0)
+        self.assertEqual(len(compacto["metrics"]["logs"]["errors"]), 3)
+
+    def test_categoria_com_erro_fica_como_esta(self):
+        dados = relatorio(metrics={"logs": {"error": "journalctl não encontrado"}})
+        self.assertEqual(compactacao.compactar_relatorio(dados)["metrics"]["logs"],
+                         {"error": "journalctl não encontrado"})
+
+
+class TestAgruparMensagens(unittest.TestCase):
+
+    def test_numeros_e_timestamps_do_kernel_sao_ignorados(self):
+        grupos = compactacao.agrupar_mensagens(
+            ["[12.5] usb 1-1: reset 3", "[99.1] usb 1-1: reset 7", {"unit": "a", "message": "x 0x1f"},
+             {"unit": "a", "message": "x 0x20"}, {"unit": "b", "message": "x 1"}], limite=10)
+        self.assertEqual(grupos, [
+            {"message": "usb 1-1: reset 3", "count": 2},
+            {"unit": "a", "message": "x 0x1f", "count": 2},
+            {"unit": "b", "message": "x 1", "count": 1}
+        ])
+
+    def test_limite_mantem_os_mais_frequentes(self):
+        entradas = ["a"] * 3 + ["b"] + ["c"] * 5
+        self.assertEqual([(g["message"], g["count"]) for g in compactacao.agrupar_mensagens(entradas, 2)],
+                         [("c", 5), ("a", 3)])
+
+
+if __name__ == "__main__":
+    unittest.main()
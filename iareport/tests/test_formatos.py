@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Testes de ida e volta dos formatos de saída: gravação (health_monitor/modules/output.py)
+e leitura (reportia.ler_json)
+"""
+
+import importlib.util
+import json
+import os
+import sys
+import tempfile
+import unittest
+from datetime import datetime
+from pathlib import Path
+from unittest import mock
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from falsos import RAIZ, relatorio  # noqa: E402
+
+sys.path.insert(0, str(RAIZ / "health_monitor"))
+
+import reportia  # noqa: E402
+from modules import output  # noqa: E402
+
+
+def _modulo_presente(nome):
+    return importlib.util.find_spec(nome) is not None
+
+
+# Formato -> pacote opcional exigido
+OPCIONAIS = {"json.zst": "zstandard", "msgpack": "msgpack"}
+
+
+class TestIdaEVolta(unittest.TestCase):
+
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.dir = Path(tmp.name)
+        # Acentos, emoji e aninhamento precisam sobreviver a todos os formatos
+        self.dados = relatorio(mensagem="Serviço crítico ⚠️", valores=[1, 2.5, None, True],
+                               aninhado={"lista": [{"nome": "sda", "uso": 97.3}]})
+
+    def _formatos(self):
+        """Formatos cujo pacote opcional está instalado (zst/msgpack ficam de fora sem ele)"""
+        return [fmt for fmt in output.FORMATS if _modulo_presente(OPCIONAIS.get(fmt, "json"))]
+
+    def test_write_report_e_ler_json(self):
+        for fmt in self._formatos():
+            with self.subTest(fmt=fmt):
+                caminho = output.write_report(self.dados, self.dir, fmt, datetime(2025, 10, 27, 14, 30), index=False)
+                self.assertTrue(caminho.name.endswith(output.FORMATS[fmt]))
+                self.assertEqual(reportia.ler_json(caminho), self.dados)
+
+    def test_serialize_e_write_atomic(self):
+        for fmt in self._formatos():
+            with self.subTest(fmt=fmt):
+                caminho = self.dir / f"direto{output.FORMATS[fmt]}"
+                output.write_atomic(caminho, output.serialize(self.dados, fmt))
+                self.assertEqual(reportia.ler_json(caminho), self.dados)
+        # Nenhum temporário esquecido no diretório
+        self.assertEqual([p.name for p in self.dir.iterdir() if p.name.startswith(".")], [])
+
+    def test_ndjson_por_offset_e_ultima_linha(self):
+        offsets = []
+        for i in range(3):
+            dados = relatorio(timestamp_unix=1000 + i, mensagem="ação")
+            offsets.append(output.append_line(self.dir / "dia.ndjson", output.serialize(dados, "ndjson")))
+
+        caminho = self.dir / "dia.ndjson"
+        self.assertEqual([reportia.ler_json(caminho, o)["timestamp_unix"] for o in offsets], [1000, 1001, 1002])
+        self.assertEqual(reportia.ler_json(caminho)["timestamp_unix"], 1002)
+
+    @unittest.skipUnless(_modulo_presente("zstandard"), "zstandard não instalado")
+    def test_zst_compacto(self):
+        caminho = output.write_report(self.dados, self.dir, "json.zst", index=False)
+        self.assertLess(caminho.stat().st_size, len(output.serialize(self.dados, "ndjson")))
+        self.assertEqual(reportia.ler_json(caminho), self.dados)
+
+    @unittest.skipUnless(_modulo_presente("msgpack"), "msgpack não instalado")
+    def test_msgpack_binario(self):
+        caminho = output.write_report(self.dados, self.dir, "msgpack", index=False)
+        with self.assertRaises(ValueError):
+            json.loads(caminho.read_bytes())
+        self.assertEqual(reportia.ler_json(caminho), self.dados)
+
+    def test_json_legivel_e_compacto(self):
+        self.assertIn(b'\n  "hostname"', output.serialize(self.dados, "json"))
+        ndjson = output.serialize(self.dados, "ndjson")
+        self.assertEqual(ndjson.count(b'\n'), 1)
+        self.assertTrue(ndjson.endswith(b'\n'))
+        self.assertIn("crítico".encode("utf-8"), ndjson)
+
+
+class TestErros(unittest.TestCase):
+
+    def test_formato_desconhecido(self):
+        with self.assertRaises(ValueError):
+            output.serialize({}, "xml")
+        with self.assertRaises(ValueError):
+            output.write_report({}, Path("."), "xml")
+
+    def test_pacote_opcional_ausente(self):
+        for fmt, modulo in OPCIONAIS.items():
+            with self.subTest(fmt=fmt), mock.patch.dict(sys.modules, {modulo: None}):
+                with self.assertRaisesRegex(RuntimeError, modulo):
+                    output.serialize({}, fmt)
+
+    def test_write_atomic_preserva_o_arquivo_anterior(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            caminho = Path(tmp) / "r.json"
+            output.write_atomic(caminho, b'{"v":1}')
+            with mock.patch.object(output.os, "replace", side_effect=OSError("disco cheio")):
+                with self.assertRaises(OSError):
+                    output.write_atomic(caminho, b'{"v":2}')
+            self.assertEqual(json.loads(caminho.read_bytes()), {"v": 1})
+            self.assertEqual(os.listdir(tmp), ["r.json"])
+
+    def test_ler_json_corrompido(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            caminho = Path(tmp) / "r.json.gz"
+            caminho.write_bytes(b"nao e gzip")
+            with mock.patch("builtins.print"):
+                self.assertIsNone(reportia.ler_json(caminho))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,151 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Testes do índice de relatórios: gravação (health_monitor/modules/output.py) e
+busca por janela de tempo e ponteiro 'latest' (reportia)
+"""
+
+import json
+import os
+import sys
+import tempfile
+import unittest
+from datetime import datetime
+from pathlib import Path
+from unittest import mock
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from falsos import RAIZ, relatorio  # noqa: E402
+
+sys.path.insert(0, str(RAIZ / "health_monitor"))
+
+import reportia  # noqa: E402
+from modules import output  # noqa: E402
+
+
+class _DiretorioRelatorios(unittest.TestCase):
+    """Diretório temporário apontado por reportia e preenchido via output.write_report"""
+
+    FORMATO = "json"
+
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.dir = Path(tmp.name)
+        for nome, valor in (("REPORTS_DIR", self.dir), ("INDEX_FILE", self.dir / output.INDEX_FILE),
+                            ("LATEST_FILE", self.dir / output.LATEST_FILE)):
+            patcher = mock.patch.object(reportia, nome, valor)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def _gravar(self, ts, host="srv01", status="healthy"):
+        dados = relatorio(host, status=status, timestamp_unix=ts)
+        return output.write_report(dados, self.dir, self.FORMATO, datetime.fromtimestamp(ts))
+
+    def _buscar(self, *args, **kwargs):
+        with mock.patch("builtins.print"):
+            return [e["ts"] for e in reportia.buscar_relatorios(*args, **kwargs)]
+
+
+class TestBuscarRelatorios(_DiretorioRelatorios):
+
+    def setUp(self):
+        super().setUp()
+        self.horarios = [1000 + 60 * i for i in range(20)]
+        for i, ts in enumerate(self.horarios):
+            self._gravar(ts, host=f"srv{i % 2}", status="warning" if i % 5 == 0 else "healthy")
+
+    def test_janela_com_limites_exatos_inclusivos(self):
+        self.assertEqual(self._buscar(1180, 1300), [1180, 1240, 1300])
+
+    def test_limites_entre_entradas(self):
+        self.assertEqual(self._buscar(1181, 1299), [1240])
+
+    def test_sem_limites_retorna_tudo_em_ordem(self):
+        self.assertEqual(self._buscar(), self.horarios)
+        self.assertEqual(self._buscar(inicio=self.horarios[0]), self.horarios)
+        self.assertEqual(self._buscar(fim=self.horarios[-1]), self.horarios)
+
+    def test_janelas_vazias(self):
+        self.assertEqual(self._buscar(5000), [])
+        self.assertEqual(self._buscar(fim=999), [])
+        self.assertEqual(self._buscar(1001, 1059), [])
+        self.assertEqual(self._buscar(1300, 1200), [])
+
+    def test_primeira_e_ultima_entrada(self):
+        self.assertEqual(self._buscar(0, 1000), [1000])
+        self.assertEqual(self._buscar(self.horarios[-1]), [self.horarios[-1]])
+
+    def test_filtros_de_status_e_host(self):
+        self.assertEqual(self._buscar(status="warning"), [1000, 1300, 1600, 1900])
+        self.assertEqual(self._buscar(1000, 1240, host="srv1"), [1060, 1180])
+
+    def test_ultima_linha_parcial_e_ignorada(self):
+        with open(self.dir / output.INDEX_FILE, "ab") as f:
+            f.write(b'{"ts":9999,"file":"health_x.json","hea')
+        self.assertEqual(self._buscar(2080), [2080, 2140])
+        self.assertEqual(self._buscar(5000), [])
+        self.assertEqual(len(self._buscar()), 20)
+
+    def test_indice_fora_de_ordem_nao_traz_entradas_fora_da_janela(self):
+        # Relógio ajustado para trás: entrada antiga gravada depois das recentes
+        self._gravar(1100)
+        self._gravar(2200)
+        resultado = self._buscar(1500)
+        self.assertTrue(all(ts >= 1500 for ts in resultado))
+        self.assertEqual(resultado[-1], 2200)
+
+    def test_indice_ausente(self):
+        os.unlink(self.dir / output.INDEX_FILE)
+        self.assertEqual(self._buscar(), [])
+
+
+class TestIndiceNdjson(_DiretorioRelatorios):
+
+    FORMATO = "ndjson"
+
+    def test_offset_aponta_para_o_relatorio_certo(self):
+        for ts in (1000, 1060, 1120):
+            self._gravar(ts)
+
+        with mock.patch("builtins.print"):
+            entradas = reportia.buscar_relatorios(1060)
+        self.assertEqual(len({e["file"] for e in entradas}), 1)
+        lidos = [reportia.ler_entrada_indice(e)["timestamp_unix"] for e in entradas]
+        self.assertEqual(lidos, [1060, 1120])
+        # Sem offset, o NDJSON devolve o relatório mais recente
+        self.assertEqual(reportia.ler_json(self.dir / entradas[0]["file"])["timestamp_unix"], 1120)
+
+
+class TestPonteiroLatest(_DiretorioRelatorios):
+
+    def test_latest_aponta_para_o_ultimo_relatorio(self):
+        self._gravar(1000)
+        ultimo = self._gravar(2000)
+
+        ponteiro = json.loads((self.dir / output.LATEST_FILE).read_text())
+        self.assertEqual(ponteiro["file"], ultimo.name)
+        self.assertEqual(ponteiro["ts"], 2000)
+        self.assertEqual(reportia.obter_ultimo_json(), ultimo)
+
+    def test_ponteiro_invalido_recorre_ao_mtime(self):
+        antigo = self._gravar(1000)
+        novo = self._gravar(2000)
+        os.utime(antigo, (1, 1))
+        os.utime(novo, (2, 2))
+
+        (self.dir / output.LATEST_FILE).write_text("{quebrado")
+        self.assertEqual(reportia.obter_ultimo_json(), novo)
+
+        (self.dir / output.LATEST_FILE).write_text(json.dumps({"file": "health_apagado.json"}))
+        self.assertEqual(reportia.obter_ultimo_json(), novo)
+
+    def test_diretorio_vazio(self):
+        with mock.patch("builtins.print"):
+            self.assertIsNone(reportia.obter_ultimo_json())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,165 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Testes da leitura incremental do JSON da IA (json_incremental) e da validação em reportia
+"""
+
+import json
+import sys
+import unittest
+from pathlib import Path
+from unittest import mock
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from falsos import ClienteFalso, analise_valida  # noqa: E402
+
+import reportia  # noqa: E402
+from json_incremental import ErroJsonIncremental, LeitorJsonIncremental  # noqa: E402
+
+
+def _alimentar_em_trechos(texto, cortes):
+    """Alimenta o leitor cortando o texto nas posições dadas; retorna (leitor, membros por trecho)"""
+    leitor = LeitorJsonIncremental()
+    por_trecho = []
+    inicio = 0
+    for fim in list(cortes) + [len(texto)]:
+        por_trecho.append(leitor.alimentar(texto[inicio:fim]))
+        inicio = fim
+    return leitor, por_trecho
+
+
+class _Trecho:
+    def __init__(self, texto):
+        self.text = texto
+
+
+class _ClienteContado:
+    """Cliente cujo stream registra quantos trechos foram consumidos e se foi fechado"""
+
+    def __init__(self, trechos):
+        self.models = self
+        self.trechos = trechos
+        self.consumidos = 0
+        self.fechado = False
+
+    def generate_content_stream(self, model, contents, config):
+        def stream():
+            try:
+                for trecho in self.trechos:
+                    self.consumidos += 1
+                    yield _Trecho(trecho)
+            finally:
+                self.fechado = True
+        return stream()
+
+
+class TestLeitorJsonIncremental(unittest.TestCase):
+
+    def test_corte_no_meio_de_string(self):
+        texto = '{"a": "texto, com {chaves} e [colchetes]", "b": 1}'
+        leitor, por_trecho = _alimentar_em_trechos(texto, [12, 20])
+        self.assertEqual(por_trecho, [[], [], [("a", "texto, com {chaves} e [colchetes]"), ("b", 1)]])
+        self.assertTrue(leitor.concluido)
+
+    def test_corte_no_meio_de_escape(self):
+        texto = '{"a": "aspas \\" e barra \\\\", "b": "fim"}'
+        corte = texto.index('\\"') + 1  # entre a barra e a aspa escapada
+        leitor, por_trecho = _alimentar_em_trechos(texto, [corte])
+        self.assertEqual(por_trecho[0], [])
+        self.assertEqual(por_trecho[1], [("a", 'aspas " e barra \\'), ("b", "fim")])
+        leitor.finalizar()
+
+    def test_corte_no_meio_de_chave(self):
+        texto = '{"resumo": "ok", "conclusao": "fim"}'
+        corte = texto.index("conclusao") + 4
+        _, por_trecho = _alimentar_em_trechos(texto, [corte])
+        self.assertEqual(por_trecho, [[("resumo", "ok")], [("conclusao", "fim")]])
+
+    def test_um_caractere_por_vez(self):
+        dados = analise_valida()
+        texto = "```json\n" + json.dumps(dados, ensure_ascii=False) + "\n```"
+        leitor, por_trecho = _alimentar_em_trechos(texto, range(1, len(texto)))
+        recebidos = [membro for membros in por_trecho for membro in membros]
+        self.assertEqual(dict(recebidos), dados)
+        self.assertEqual(len(recebidos), len(dados))
+        leitor.finalizar()
+
+    def test_membro_entregue_assim_que_a_virgula_chega(self):
+        leitor = LeitorJsonIncremental()
+        self.assertEqual(leitor.alimentar('{"a": [1, {"x": 2}]'), [])
+        self.assertEqual(leitor.alimentar(','), [("a", [1, {"x": 2}])])
+
+    def test_prefixo_invalido(self):
+        with self.assertRaises(ErroJsonIncremental):
+            LeitorJsonIncremental().alimentar("Claro! Aqui está:")
+
+    def test_stream_truncado(self):
+        leitor = LeitorJsonIncremental()
+        leitor.alimentar('{"a": 1, "b": "incomp')
+        with self.assertRaises(ErroJsonIncremental):
+            leitor.finalizar()
+
+    def test_membro_malformado(self):
+        with self.assertRaises(ValueError):
+            LeitorJsonIncremental().alimentar('{"a": nada,')
+
+
+class TestValidarCampo(unittest.TestCase):
+
+    def test_tipos_e_campos_dos_itens(self):
+        reportia.validar_campo("resumo_executivo", "texto")
+        reportia.validar_campo("chave_extra", 123)
+        with self.assertRaises(ValueError):
+            reportia.validar_campo("resumo_executivo", ["lista"])
+        with self.assertRaises(ValueError):
+            reportia.validar_campo("alertas", ["texto"])
+        with self.assertRaises(ValueError):
+            reportia.validar_campo("recomendacoes", [{"titulo": "sem descrição"}])
+
+
+class TestGerarAnalise(unittest.TestCase):
+
+    def test_ao_receber_uma_vez_por_secao(self):
+        recebidas = []
+        analise = reportia.gerar_analise("prompt", ClienteFalso(tamanho_trecho=5),
+                                         lambda chave, valor: recebidas.append(chave))
+
+        self.assertEqual(analise, analise_valida())
+        self.assertEqual(sorted(recebidas), sorted(reportia.ESQUEMA_ANALISE))
+        self.assertEqual(len(recebidas), len(set(recebidas)))
+
+    def test_violacao_de_schema_interrompe_o_stream(self):
+        corpo = json.dumps(analise_valida(), ensure_ascii=False)[1:]
+        # Primeira seção com o tipo errado, seguida do restante da análise em muitos trechos
+        texto = '{"metricas_cards": "deveria ser lista", ' + corpo
+        trechos = [texto[i:i + 10] for i in range(0, len(texto), 10)]
+        cliente = _ClienteContado(trechos)
+        recebidas = []
+
+        with self.assertRaises(ValueError) as contexto:
+            reportia.gerar_analise("prompt", cliente, lambda chave, valor: recebidas.append(chave))
+
+        self.assertIn("metricas_cards", str(contexto.exception))
+        self.assertLess(cliente.consumidos, len(trechos) // 2)
+        self.assertTrue(cliente.fechado)
+        self.assertEqual(recebidas, [])
+
+    def test_secao_faltando(self):
+        analise = analise_valida()
+        del analise["conclusao"]
+        cliente = ClienteFalso(resposta=json.dumps(analise))
+        with self.assertRaises(ValueError):
+            reportia.gerar_analise("prompt", cliente)
+
+    def test_chamar_gemini_renderiza_secoes_durante_o_stream(self):
+        secoes = {}
+        with mock.patch("builtins.print"):
+            analise = reportia.chamar_gemini("prompt", ClienteFalso(), secoes)
+        self.assertEqual(set(secoes), set(reportia.SECOES_ANALISE))
+        self.assertEqual(analise["conclusao"], "Nenhuma ação urgente.")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,232 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Testes do modo em lote (lote.py) com um cliente Gemini falso
+"""
+
+import gzip
+import json
+import sys
+import tempfile
+import threading
+import time
+import unittest
+from pathlib import Path
+from unittest import mock
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from falsos import ClienteFalso, ErroApi, relatorio  # noqa: E402
+
+import lote  # noqa: E402
+import reportia  # noqa: E402
+
+
+class TestChamarComRetry(unittest.TestCase):
+
+    def setUp(self):
+        self.sem_limite = lote.LimitadorTaxa(0)
+
+    def _sequencia(self, *resultados):
+        """Função que levanta/retorna cada resultado em ordem, contando as chamadas"""
+        chamadas = []
+
+        def funcao():
+            chamadas.append(1)
+            resultado = resultados[len(chamadas) - 1]
+            if isinstance(resultado, Exception):
+                raise resultado
+            return resultado
+        return funcao, chamadas
+
+    def test_repete_em_429_e_5xx_com_backoff_exponencial(self):
+        funcao, chamadas = self._sequencia(ErroApi(429), ErroApi(503), ErroApi(500), "ok")
+        with mock.patch("lote.time.sleep") as dormir, mock.patch("lote.random.random", return_value=0.0):
+            self.assertEqual(lote.chamar_com_retry(funcao, self.sem_limite, tentativas=4, espera_base=2.0), "ok")
+
+        self.assertEqual(len(chamadas), 4)
+        self.assertEqual([c.args[0] for c in dormir.call_args_list], [2.0, 4.0, 8.0])
+
+    def test_nao_repete_em_erro_4xx(self):
+        funcao, chamadas = self._sequencia(ErroApi(400), "ok")
+        with mock.patch("lote.time.sleep") as dormir:
+            with self.assertRaises(ErroApi):
+                lote.chamar_com_retry(funcao, self.sem_limite)
+
+        self.assertEqual(len(chamadas), 1)
+        dormir.assert_not_called()
+
+    def test_nao_repete_erro_sem_codigo(self):
+        funcao, chamadas = self._sequencia(ValueError("resposta inválida"), "ok")
+        with mock.patch("lote.time.sleep"):
+            with self.assertRaises(ValueError):
+                lote.chamar_com_retry(funcao, self.sem_limite)
+        self.assertEqual(len(chamadas), 1)
+
+    def test_desiste_apos_todas_as_tentativas(self):
+        funcao, chamadas = self._sequencia(ErroApi(503), ErroApi(503), ErroApi(503))
+        with mock.patch("lote.time.sleep"):
+            with self.assertRaises(ErroApi):
+                lote.chamar_com_retry(funcao, self.sem_limite, tentativas=3)
+        self.assertEqual(len(chamadas), 3)
+
+
+class TestLimitadorTaxa(unittest.TestCase):
+
+    def test_espaca_as_requisicoes(self):
+        limitador = lote.LimitadorTaxa(600)  # uma a cada 0,1 s
+        inicio = time.monotonic()
+        for _ in range(4):
+            limitador.aguardar()
+        self.assertGreaterEqual(time.monotonic() - inicio, 0.3 - 0.01)
+
+    def test_espaca_requisicoes_de_varias_threads(self):
+        limitador = lote.LimitadorTaxa(1200)  # uma a cada 0,05 s
+        horarios = []
+        trava = threading.Lock()
+
+        def trabalhar():
+            limitador.aguardar()
+            with trava:
+                horarios.append(time.monotonic())
+
+        threads = [threading.Thread(target=trabalhar) for _ in range(6)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        horarios.sort()
+        intervalos = [b - a for a, b in zip(horarios, horarios[1:])]
+        self.assertGreaterEqual(min(intervalos), 0.05 - 0.01)
+
+    def test_sem_limite_nao_espera(self):
+        limitador = lote.LimitadorTaxa(0)
+        inicio = time.monotonic()
+        for _ in range(100):
+            limitador.aguardar()
+        self.assertLess(time.monotonic() - inicio, 0.05)
+
+
+class TestEntradas(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.dir = Path(self.tmp.name)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def _gravar(self, nome, dados):
+        caminho = self.dir / nome
+        if nome.endswith(".gz"):
+            with gzip.open(caminho, "wt", encoding="utf-8") as f:
+                json.dump(dados, f)
+        else:
+            caminho.write_text(json.dumps(dados), encoding="utf-8")
+        return caminho
+
+    def test_expandir_diretorio_glob_e_arquivo(self):
+        a = self._gravar("health_20251027_100000.json", relatorio())
+        b = self._gravar("health_20251027_110000.json.gz", relatorio())
+        self._gravar("outro.json", relatorio())
+        (self.dir / "notas.txt").write_text("x")
+
+        self.assertEqual(lote.expandir_entradas([str(self.dir)]), [a, b])
+        self.assertEqual(lote.expandir_entradas([str(self.dir / "*.gz")]), [b])
+        # Duplicatas entre entradas aparecem uma só vez
+        self.assertEqual(lote.expandir_entradas([str(a), str(self.dir)]), [a, b])
+
+    def test_carregar_ignora_invalidos_e_mantem_ultimo_por_host(self):
+        antigo = self._gravar("health_1.json", relatorio("web1", timestamp_unix=100))
+        novo = self._gravar("health_2.json", relatorio("web1", timestamp_unix=200))
+        outro = self._gravar("health_3.json", relatorio("db1", timestamp_unix=150))
+        quebrado = self.dir / "health_4.json"
+        quebrado.write_text("{nao é json")
+
+        with mock.patch("builtins.print"):
+            todos = lote.carregar_relatorios([antigo, novo, outro, quebrado])
+            ultimos = lote.carregar_relatorios([antigo, novo, outro, quebrado], ultimo_por_host=True)
+
+        self.assertEqual([arquivo for arquivo, _ in todos], [antigo, novo, outro])
+        self.assertEqual(sorted(str(arquivo) for arquivo, _ in ultimos), sorted([str(novo), str(outro)]))
+
+
+class TestIndiceFrota(unittest.TestCase):
+
+    def test_ordena_por_gravidade_e_escapa(self):
+        resultados = [
+            {"arquivo": "a", "hostname": "web-ok", "timestamp": "t1", "health_status": "healthy",
+             "total_alerts": 0, "html": "web-ok.html", "origem": "local", "erro": None},
+            {"arquivo": "b", "hostname": "<b>db</b>", "timestamp": "t2", "health_status": "critical",
+             "total_alerts": 3, "html": None, "origem": None, "erro": "falha <ia>"},
+        ]
+        with tempfile.TemporaryDirectory() as saida:
+            caminho = lote.gerar_indice_frota(resultados, saida)
+            pagina = Path(caminho).read_text(encoding="utf-8")
+
+        self.assertEqual(Path(caminho).name, lote.INDICE_FROTA)
+        self.assertIn("2 relatório(s)", pagina)
+        self.assertLess(pagina.index("&lt;b&gt;db&lt;/b&gt;"), pagina.index("web-ok"))
+        self.assertNotIn("<b>db</b>", pagina)
+        self.assertIn("❌ falha &lt;ia&gt;", pagina)
+        self.assertIn('<a href="web-ok.html">abrir</a> (local)', pagina)
+        self.assertIn('<tr class="critical">', pagina)
+
+
+class TestExecutarLote(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.dir = Path(self.tmp.name)
+        self.saida = self.dir / "saida"
+        # Sem cache em disco durante os testes
+        patcher = mock.patch.object(reportia, "CACHE_TTL", 0)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.addCleanup(self.tmp.cleanup)
+
+    def _gravar(self, nome, dados):
+        caminho = self.dir / nome
+        caminho.write_text(json.dumps(dados), encoding="utf-8")
+        return caminho
+
+    def test_falha_de_um_relatorio_nao_interrompe_o_lote(self):
+        self._gravar("health_1.json", relatorio("web1"))
+        self._gravar("health_2.json", relatorio("host-ruim"))
+        self._gravar("health_3.json", relatorio("db1", status="critical"))
+        cliente = ClienteFalso(falhar_se={"host-ruim": ErroApi(400, "requisição inválida")})
+
+        with mock.patch("builtins.print"):
+            resultados = lote.executar_lote([str(self.dir)], self.saida, concorrencia=2, por_minuto=0,
+                                            tentativas=2, cliente=cliente, modo="ia")
+
+        por_host = {r["hostname"]: r for r in resultados}
+        self.assertEqual(set(por_host), {"web1", "host-ruim", "db1"})
+        self.assertIn("400", por_host["host-ruim"]["erro"])
+        self.assertIsNone(por_host["host-ruim"]["html"])
+        for host in ("web1", "db1"):
+            self.assertIsNone(por_host[host]["erro"])
+            self.assertEqual(por_host[host]["origem"], "ia")
+            self.assertTrue((self.saida / por_host[host]["html"]).exists())
+        self.assertTrue((self.saida / lote.INDICE_FROTA).exists())
+        self.assertEqual(len(cliente.chamadas), 3)
+
+    def test_cliente_injetado_funciona_sem_o_sdk(self):
+        self._gravar("health_1.json", relatorio("web1"))
+        cliente = ClienteFalso()
+
+        with mock.patch.object(reportia, "types", None), mock.patch("builtins.print"):
+            resultados = lote.executar_lote([str(self.dir)], self.saida, por_minuto=0, cliente=cliente, modo="ia")
+
+        self.assertIsNone(resultados[0]["erro"])
+        self.assertEqual(cliente.chamadas[0]["config"], reportia.CONFIG_GERACAO)
+
+    def test_main_retorna_erro_sem_relatorios(self):
+        with mock.patch("builtins.print"):
+            self.assertEqual(lote.main([str(self.dir), "-o", str(self.saida)]), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Testes do renderizador do template HTML e do escape dos dados do relatório e da análise
+"""
+
+import os
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from falsos import analise_valida, relatorio  # noqa: E402
+
+import renderizador  # noqa: E402
+import reportia  # noqa: E402
+from renderizador import Seguro, TemplateCompilado, escapar, formatar_texto  # noqa: E402
+
+
+SCRIPT = '<script>alert("x")</script>'
+
+
+class TestEscape(unittest.TestCase):
+
+    def test_escapar(self):
+        self.assertEqual(escapar(SCRIPT), '&lt;script&gt;alert(&quot;x&quot;)&lt;/script&gt;')
+        self.assertEqual(escapar("a & 'b'"), "a &amp; &#x27;b&#x27;")
+        self.assertEqual(escapar(42), "42")
+
+    def test_seguro_nao_e_escapado(self):
+        self.assertEqual(escapar(Seguro("<b>ok</b>")), "<b>ok</b>")
+        self.assertIs(formatar_texto(Seguro("<p>x</p>")).__class__, Seguro)
+
+    def test_formatar_texto_escapa_e_separa_paragrafos(self):
+        html = formatar_texto(f"Linha 1\nLinha 2\n\n{SCRIPT}")
+        self.assertIsInstance(html, Seguro)
+        self.assertEqual(html, "<p>Linha 1<br>Linha 2</p><p>&lt;script&gt;alert(&quot;x&quot;)&lt;/script&gt;</p>")
+
+
+class TestTemplateCompilado(unittest.TestCase):
+
+    def test_placeholders_em_uma_passada(self):
+        template = TemplateCompilado("<h1>{{TITULO}}</h1>{{CORPO}}<i>{{TITULO}}</i>{{AUSENTE}}")
+        saida = template.renderizar({"TITULO": "{{CORPO}}", "CORPO": Seguro("<p>ok</p>")})
+        # O valor inserido não é reprocessado como placeholder
+        self.assertEqual(saida, "<h1>{{CORPO}}</h1><p>ok</p><i>{{CORPO}}</i>{{AUSENTE}}")
+
+    def test_cache_pelo_mtime(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            caminho = Path(tmp) / "t.html"
+            caminho.write_text("v1 {{X}}", encoding="utf-8")
+            primeiro = renderizador.carregar_template(caminho)
+            self.assertIs(renderizador.carregar_template(caminho), primeiro)
+
+            caminho.write_text("v2 {{X}}", encoding="utf-8")
+            os.utime(caminho, ns=(0, caminho.stat().st_mtime_ns + 10**9))
+            segundo = renderizador.carregar_template(caminho)
+            self.assertIsNot(segundo, primeiro)
+            self.assertEqual(segundo.renderizar({"X": "y"}), "v2 y")
+
+
+class TestPreencherTemplate(unittest.TestCase):
+
+    def _html(self, analise, dados):
+        with mock.patch("builtins.print"):
+            return reportia.preencher_template(analise, dados)
+
+    def test_script_nos_dados_do_relatorio_e_escapado(self):
+        dados = relatorio(hostname=SCRIPT, timestamp=SCRIPT)
+        html = self._html(analise_valida(), dados)
+        self.assertNotIn(SCRIPT, html)
+        self.assertIn("&lt;script&gt;", html)
+
+    def test_script_em_todas_as_secoes_da_analise_e_escapado(self):
+        analise = {
+            "resumo_executivo": SCRIPT,
+            "metricas_cards": [{"label": SCRIPT, "value": SCRIPT, "icon": SCRIPT, "subtext": SCRIPT}],
+            "alertas": [{"titulo": SCRIPT, "descricao": SCRIPT, "impacto": SCRIPT, "solucao": SCRIPT,
+                         "tipo": SCRIPT}],
+            "recomendacoes": [{"titulo": SCRIPT, "descricao": SCRIPT, "prioridade": '"><script>',
+                               "comandos": [SCRIPT]}],
+            "conclusao": SCRIPT
+        }
+        for chave in ("analise_discos", "analise_memoria", "analise_cpu", "analise_sistema",
+                      "analise_rede", "analise_logs"):
+            analise[chave] = SCRIPT
+
+        html = self._html(analise, relatorio())
+        self.assertNotIn(SCRIPT, html)
+        # Nem dentro de atributos: a prioridade vira parte da classe, escapada
+        self.assertIn('class="priority-&quot;&gt;&lt;script&gt;"', html)
+        self.assertGreaterEqual(html.count("&lt;script&gt;"), 20)
+
+    def test_todos_os_placeholders_preenchidos(self):
+        html = self._html(analise_valida(), relatorio())
+        self.assertNotRegex(html, r"\{\{[A-Z_]+\}\}")
+        self.assertIn("Disco cheio", html)
+
+    def test_secoes_ausentes_usam_o_padrao(self):
+        html = self._html({}, relatorio())
+        self.assertIn("Análise não disponível.", html)
+        self.assertIn("Conclusão não disponível.", html)
+
+
+if __name__ == "__main__":
+    unittest.main()